@@ -0,0 +1,163 @@
+"""
+Pico de memória da camada de análise com DataFrames compartilhados.
+
+Cada função de análise e de visualização recebe os mesmos DataFrames
+compartilhados de algodão, clima e cubo climático. O pico de memória de cada
+chamada (``tracemalloc``, com o cache de memoização limpo) mostra as cópias
+feitas. O contrato imutável (nenhuma função altera as entradas e os resultados
+não dependem da ordem das chamadas) é verificado em
+``tests/test_immutability.py``.
+
+Uso::
+
+    python benchmarks/bench_immutability.py [--scale 20] [--stations 100]
+    python benchmarks/bench_immutability.py --src /tmp/revisao-anterior/src \\
+        --label antes --output benchmarks/results/bench_immutability.json
+
+As opções ``--src``, ``--label`` e ``--output`` estão descritas em
+``revisions.py``.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_suite import CALL_ERRORS  # noqa: E402
+from revisions import add_revision_arguments, load_modules, write_report  # noqa: E402
+from synthetic import synthetic_cotton, synthetic_weather  # noqa: E402
+
+# Chamadas: nome -> contexto -> (função, args)
+CALLS = {
+    "analysis.analyze_seasonal_trends": lambda m, c: (
+        m.analysis.analyze_seasonal_trends,
+        (c["cotton"], c["cube"]),
+    ),
+    "analysis.analyze_regional_potential": lambda m, c: (
+        m.analysis.analyze_regional_potential,
+        (c["cotton"], c["weather"]),
+    ),
+    "analysis.analyze_climatic_influences": lambda m, c: (
+        m.analysis.analyze_climatic_influences,
+        (c["cotton"], c["cube"]),
+    ),
+    "analysis.analyze_variable_correlations": lambda m, c: (
+        m.analysis.analyze_variable_correlations,
+        (c["cotton"], c["cube"]),
+    ),
+    "analysis.analyze_lagged_influences": lambda m, c: (
+        m.analysis.analyze_lagged_influences,
+        (c["cotton"], c["cube"]),
+    ),
+    "analysis.analyze_historical_trends": lambda m, c: (
+        m.analysis.analyze_historical_trends,
+        (c["cotton"],),
+    ),
+    "analysis.predict_planted_area": lambda m, c: (
+        m.analysis.predict_planted_area,
+        (c["cotton"],),
+    ),
+    "analysis.predict_planted_area_by_state": lambda m, c: (
+        m.analysis.predict_planted_area_by_state,
+        (c["cotton"],),
+    ),
+    "visualization.prepare_combined_data": lambda m, c: (
+        m.visualization.prepare_combined_data,
+        (c["cotton"], c["weather"]),
+    ),
+    "visualization.plot_scatter": lambda m, c: (
+        m.visualization.plot_scatter,
+        (c["cotton"], c["weather"]),
+    ),
+    "visualization.add_coordinates_to_regions": lambda m, c: (
+        m.visualization.add_coordinates_to_regions,
+        (c["regional"],),
+    ),
+}
+
+
+def frame_mb(data) -> float:
+    return round(data.memory_usage(deep=True).sum() / 2**20, 1)
+
+
+def call(func, args) -> list:
+    # Pré-visualizações impressas e erros não interrompem a medição
+    CALL_ERRORS.clear()
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            func(*args)
+        except Exception as e:
+            CALL_ERRORS.append(f"{type(e).__name__}: {e}")
+    return list(CALL_ERRORS)
+
+
+def measure_functions(modules, context: dict) -> dict:
+    """
+    Mede o tempo e o pico de memória de cada função, com o cache limpo.
+    """
+    functions = {}
+    for name, recipe in CALLS.items():
+        func, args = recipe(modules, context)
+        modules.memo.clear_cache()
+        tracemalloc.start()
+        start = time.perf_counter()
+        errors = call(func, args)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        functions[name] = {
+            "seconds": round(elapsed, 3),
+            "peak_mb": round(peak / 2**20, 1),
+        }
+        if errors:
+            functions[name]["errors"] = errors
+    return functions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=int, default=20)
+    parser.add_argument("--stations", type=int, default=100)
+    add_revision_arguments(parser)
+    args = parser.parse_args()
+
+    modules = load_modules(
+        args.src, "analysis", "memo", "visualization", "climate_cube"
+    )
+
+    weather = synthetic_weather(args.stations)
+    context = {
+        "cotton": synthetic_cotton(scale=args.scale),
+        "weather": weather,
+        "cube": modules.climate_cube.build_climate_cube(weather),
+        "regional": modules.analysis.analyze_regional_potential(
+            synthetic_cotton(), weather
+        ),
+    }
+
+    report = {
+        "inputs": {
+            "cotton_rows": len(context["cotton"]),
+            "cotton_mb": frame_mb(context["cotton"]),
+            "weather_rows": len(weather),
+            "weather_mb": frame_mb(weather),
+            "cube_rows": len(context["cube"]),
+        },
+        "functions": measure_functions(modules, context),
+    }
+    report["total_peak_mb"] = round(
+        sum(entry["peak_mb"] for entry in report["functions"].values()), 1
+    )
+
+    write_report(report, args.output, args.label)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark da junção algodão x clima: junção ingênua por ``Ano`` versus
+redução à granularidade dos dados de algodão antes da junção.
+
+Uso::
+
+    python benchmarks/bench_merge.py [--stations 600] [--naive-limit 20000000]
+        [--sample-stations 20]
+    python benchmarks/bench_merge.py --output benchmarks/results/bench_merge.json
+
+A junção ingênua só é materializada quando a estimativa de linhas fica abaixo
+de ``--naive-limit``; acima disso, o relatório traz a estimativa de linhas e
+de memória (linhas x bytes por linha), ao lado da junção ingênua medida com
+uma amostra de ``--sample-stations`` estações (em ``naive_merge.sample``).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from joins import estimate_merge_rows, merge_at_grain, reduce_to_grain  # noqa: E402
+from synthetic import synthetic_cotton, synthetic_weather  # noqa: E402
+
+
+def measure(func, *args, **kwargs):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def measure_naive(cotton, weather) -> dict:
+    result, elapsed, peak = measure(pd.merge, cotton, weather, on="Ano")
+    return {
+        "rows": len(result),
+        "seconds": round(elapsed, 3),
+        "peak_mb": round(peak / 2**20, 1),
+    }
+
+
+def grain_merge(cotton, weather, keys):
+    return merge_at_grain(cotton, reduce_to_grain(weather, keys), on=["Ano"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--stations", type=int, default=600)
+    parser.add_argument("--first-year", type=int, default=2000)
+    parser.add_argument("--last-year", type=int, default=2024)
+    parser.add_argument("--naive-limit", type=int, default=20_000_000)
+    parser.add_argument("--sample-stations", type=int, default=20)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    cotton = synthetic_cotton()
+    weather = synthetic_weather(args.stations, args.first_year, args.last_year)
+    report = {
+        "cotton_rows": len(cotton),
+        "weather_rows": len(weather),
+        "weather_mb": round(weather.memory_usage(deep=True).sum() / 2**20, 1),
+    }
+
+    # Antes: junção por Ano com as linhas brutas
+    naive_rows = estimate_merge_rows(cotton, weather, ["Ano"])
+    row_bytes = cotton.memory_usage(deep=True, index=False).sum() / len(cotton)
+    row_bytes += weather.memory_usage(deep=True, index=False).sum() / len(weather)
+    naive = {
+        "rows": naive_rows,
+        "estimated_mb": round(naive_rows * row_bytes / 2**20),
+    }
+    if naive_rows <= args.naive_limit:
+        naive.update(measure_naive(cotton, weather))
+    else:
+        # Medição com uma amostra de estações, para comparar com a estimativa
+        sample = synthetic_weather(
+            args.sample_stations, args.first_year, args.last_year
+        )
+        naive["sample"] = {
+            "stations": args.sample_stations,
+            "weather_rows": len(sample),
+            **measure_naive(cotton, sample),
+        }
+        del sample
+    report["naive_merge"] = naive
+
+    # Depois: redução à granularidade (ano e ano-estação) antes da junção
+    for label, keys in (("year_grain", ["Ano"]), ("season_grain", ["Ano", "Estacao"])):
+        result, elapsed, peak = measure(grain_merge, cotton, weather, keys)
+        report[label] = {
+            "rows": len(result),
+            "seconds": round(elapsed, 3),
+            "peak_mb": round(peak / 2**20, 1),
+        }
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Memória e tempo das funções ``plot_*`` ao longo de muitas reexecuções.
+
+Simula centenas de reexecuções do painel chamando cada função de gráfico de
+``visualization`` com as mesmas entradas (o Streamlit é substituído por um
+módulo vazio). Após cada rodada são registrados o número de figuras abertas no
+pyplot e ``RssAnon`` do processo; o relatório traz o tempo da primeira
+renderização e a mediana das seguintes, por função.
+
+Uso::
+
+    python benchmarks/bench_rerender.py [--reruns 300]
+    python benchmarks/bench_rerender.py --src /tmp/revisao-anterior/src \\
+        --label antes --output benchmarks/results/bench_rerender.json
+
+As opções ``--src``, ``--label`` e ``--output`` estão descritas em
+``revisions.py``.
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import os
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_suite import CALL_ERRORS  # noqa: E402
+from revisions import add_revision_arguments, load_modules, write_report  # noqa: E402
+from synthetic import synthetic_cotton, synthetic_weather  # noqa: E402
+
+# Chamadas: nome -> (módulos, contexto) -> (função, args)
+CALLS = {
+    "plot_seasonal_trends": lambda m, c: (
+        m.visualization.plot_seasonal_trends,
+        (c["seasonal"],),
+    ),
+    "plot_correlation_heatmap": lambda m, c: (
+        m.visualization.plot_correlation_heatmap,
+        (c["cotton"], c["cube"]),
+    ),
+    "plot_climatic_influence": lambda m, c: (
+        m.visualization.plot_climatic_influence,
+        (c["influences"],),
+    ),
+    "plot_historical_trends": lambda m, c: (
+        m.visualization.plot_historical_trends,
+        (c["historical"],),
+    ),
+    "plot_scatter": lambda m, c: (
+        m.visualization.plot_scatter,
+        (c["cotton"], c["weather"]),
+    ),
+    "plot_historical_trends_with_prediction": lambda m, c: (
+        m.visualization.plot_historical_trends_with_prediction,
+        (c["historical"], c["forecast"]),
+    ),
+}
+
+
+def rss_anon_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("RssAnon:"):
+                return round(int(line.split()[1]) / 1024, 1)
+    return 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reruns", type=int, default=300)
+    parser.add_argument("--stations", type=int, default=40)
+    add_revision_arguments(parser)
+    args = parser.parse_args()
+
+    modules = load_modules(args.src, "analysis", "visualization", "climate_cube")
+    import matplotlib.pyplot as plt
+
+    analysis = modules.analysis
+    cotton = synthetic_cotton()
+    weather = synthetic_weather(args.stations)
+    cube = modules.climate_cube.build_climate_cube(weather)
+    historical = analysis.analyze_historical_trends(cotton)
+    context = {
+        "cotton": cotton,
+        "weather": weather,
+        "cube": cube,
+        "seasonal": analysis.analyze_seasonal_trends(cotton, cube),
+        "influences": analysis.analyze_climatic_influences(cotton, cube),
+        "historical": historical,
+        "forecast": analysis.predict_planted_area(historical),
+    }
+    calls = [(name, *recipe(modules, context)) for name, recipe in CALLS.items()]
+
+    seconds = {name: [] for name in CALLS}
+    samples = []
+    gc.collect()
+    baseline = rss_anon_mb()
+    for rerun in range(args.reruns):
+        for name, func, call_args in calls:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                func(*call_args)
+            seconds[name].append(time.perf_counter() - start)
+        if rerun in (0, 9) or (rerun + 1) % 50 == 0:
+            gc.collect()
+            samples.append(
+                {
+                    "rerun": rerun + 1,
+                    "open_figures": len(plt.get_fignums()),
+                    "rss_anon_mb": round(rss_anon_mb() - baseline, 1),
+                }
+            )
+
+    report = {
+        "reruns": args.reruns,
+        "functions": {
+            name: {
+                "first_seconds": round(times[0], 4),
+                "repeat_median_seconds": round(statistics.median(times[1:]), 5),
+            }
+            for name, times in seconds.items()
+        },
+        "memory": samples,
+        "errors": sorted(set(CALL_ERRORS)),
+    }
+    first = samples[1] if len(samples) > 1 else samples[0]
+    report["rss_growth_after_10_mb"] = round(
+        samples[-1]["rss_anon_mb"] - first["rss_anon_mb"], 1
+    )
+
+    write_report(report, args.output, args.label)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+"""
+Teste de carga do modo multiusuário: várias sessões simuladas do ``app.py``.
+
+Cada processo trabalhador executa o roteiro do ``app.py`` uma vez por sessão
+(como o Streamlit faz a cada interação), com um Streamlit substituto: os widgets
+devolvem o valor padrão, cada sessão escolhe uma seção e uma métrica em rodízio,
+``st.cache_resource`` guarda um valor por processo e ``st.cache_data`` devolve
+cópias, como no Streamlit real. Os globais de cada sessão são mantidos vivos até
+o fim, para medir o que cada uma retém.
+
+Por processo são registrados ``RssAnon`` (memória privada) e ``RssFile``
+(páginas de arquivos mapeados, compartilháveis entre processos) após os imports,
+após a primeira sessão e após a última; a sobrecarga por sessão é o crescimento
+de ``RssAnon`` entre a primeira e a última sessão dividido pelo número de
+sessões adicionais. ``private_frames_mb`` soma os DataFrames dos globais de uma
+sessão que não são os mesmos objetos das outras sessões.
+
+Uso::
+
+    python benchmarks/bench_sessions.py [--sessions 8] [--processes 2] [--stations 100]
+    python benchmarks/bench_sessions.py --src /tmp/revisao-anterior/src \\
+        --label antes --output benchmarks/results/bench_sessions.json
+
+As opções ``--src``, ``--label`` e ``--output`` estão descritas em
+``revisions.py``. Os dados sintéticos e os caches ficam em uma pasta temporária
+(ou em ``--workdir``), fora do repositório.
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import multiprocessing
+import os
+import pickle
+import runpy
+import shutil
+import sys
+import tempfile
+import time
+import types
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from revisions import add_revision_arguments, write_report  # noqa: E402
+from synthetic import (  # noqa: E402
+    write_conab_workbook,
+    write_inmet_csv,
+    write_station_index,
+)
+
+# Erros enviados a st.error (ou exceções) durante as sessões
+SESSION_ERRORS = []
+
+# Valores de st.cache_resource e de st.cache_data (serializados) do processo
+_RESOURCES = {}
+_DATA = {}
+
+
+class StopSession(Exception):
+    """
+    Equivale ao ``st.stop()``: interrompe o roteiro da sessão.
+    """
+
+
+class Element:
+    """
+    Elemento do Streamlit substituto: qualquer chamada de exibição não faz nada
+    e devolve outro elemento (que também serve de gerenciador de contexto).
+    """
+
+    def __init__(self, session: dict):
+        self._session = session
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: Element(self._session)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def columns(self, spec, **kwargs):
+        count = spec if isinstance(spec, int) else len(spec)
+        return [Element(self._session) for _ in range(count)]
+
+    def tabs(self, labels):
+        return [Element(self._session) for _ in labels]
+
+    def selectbox(self, label, options, index=0, **kwargs):
+        options = list(options)
+        choice = self._session["choices"].get(label)
+        return choice if choice in options else options[index]
+
+    def radio(self, label, options, index=0, **kwargs):
+        return self.selectbox(label, options, index)
+
+    def select_slider(self, label, options=(), value=None, **kwargs):
+        return list(options)[0] if value is None else value
+
+    def checkbox(self, label, value=False, **kwargs):
+        return value
+
+    def slider(self, label, min_value=None, max_value=None, value=None, *a, **kw):
+        return min_value if value is None else value
+
+    def number_input(self, label, min_value=None, max_value=None, value=None, **kw):
+        return min_value if value is None else value
+
+    def error(self, message, *args, **kwargs):
+        SESSION_ERRORS.append(str(message))
+
+    def stop(self):
+        raise StopSession()
+
+
+def cache_resource(func=None, **kwargs):
+    """
+    ``st.cache_resource``: um valor por processo, compartilhado pelas sessões
+    (a chave inclui o nome da função, pois o roteiro a redefine a cada sessão).
+    """
+    if func is None:
+        return lambda f: cache_resource(f)
+
+    def wrapper(*args):
+        key = (func.__module__, func.__qualname__, args)
+        if key not in _RESOURCES:
+            _RESOURCES[key] = func(*args)
+        return _RESOURCES[key]
+
+    return wrapper
+
+
+def cache_data(func=None, **kwargs):
+    """
+    ``st.cache_data``: o valor é guardado serializado e cada chamada recebe uma
+    cópia.
+    """
+    if func is None:
+        return lambda f: cache_data(f)
+
+    def wrapper(*args, **kw):
+        key = (func.__module__, func.__qualname__, pickle.dumps((args, kw)))
+        if key not in _DATA:
+            _DATA[key] = pickle.dumps(func(*args, **kw))
+        return pickle.loads(_DATA[key])
+
+    return wrapper
+
+
+def install_session_stub(session: dict) -> None:
+    """
+    Registra o Streamlit substituto com os widgets da sessão ``session``.
+    """
+    st = types.ModuleType("streamlit")
+    element = Element(session)
+    st.__getattr__ = lambda name: getattr(element, name)
+    st.sidebar = element
+    st.cache_resource = cache_resource
+    st.cache_data = cache_data
+
+    components = types.ModuleType("streamlit.components")
+    components_v1 = types.ModuleType("streamlit.components.v1")
+    components_v1.html = lambda *args, **kwargs: None
+    components.v1 = components_v1
+    st.components = components
+
+    sys.modules["streamlit"] = st
+    sys.modules["streamlit.components"] = components
+    sys.modules["streamlit.components.v1"] = components_v1
+
+
+def read_status() -> dict:
+    """
+    ``RssAnon`` e ``RssFile`` do processo atual, em MB.
+    """
+    status = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if name in ("RssAnon", "RssFile"):
+                status[name] = round(int(value.split()[0]) / 1024, 1)
+    return status
+
+
+def session_frames(namespace: dict) -> dict:
+    import pandas as pd
+
+    return {
+        id(value): value
+        for value in namespace.values()
+        if isinstance(value, pd.DataFrame)
+    }
+
+
+def run_worker(src_dir: str, sessions: int, choices: list, queue) -> None:
+    """
+    Executa ``sessions`` sessões do ``app.py`` em um processo e envia o relatório.
+    """
+    install_session_stub({"choices": {}})
+    sys.path.insert(0, src_dir)
+    app_path = os.path.join(src_dir, "app.py")
+
+    # Imports do app antes da medição de base
+    with contextlib.redirect_stdout(io.StringIO()):
+        import analysis  # noqa: F401
+        import visualization  # noqa: F401
+    gc.collect()
+    report = {"after_imports": read_status()}
+
+    namespaces, seconds = [], []
+    for k in range(sessions):
+        install_session_stub({"choices": choices[k % len(choices)]})
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            try:
+                namespaces.append(runpy.run_path(app_path, run_name="__main__"))
+            except StopSession:
+                namespaces.append({})
+            except Exception as e:
+                SESSION_ERRORS.append(f"{type(e).__name__}: {e}")
+                namespaces.append({})
+        seconds.append(round(time.perf_counter() - start, 3))
+        gc.collect()
+        if k == 0:
+            report["after_first_session"] = read_status()
+
+    report["after_last_session"] = read_status()
+    report["session_seconds"] = seconds
+    growth = report["after_last_session"]["RssAnon"]
+    growth -= report["after_first_session"]["RssAnon"]
+    report["per_session_rss_anon_mb"] = round(growth / max(sessions - 1, 1), 2)
+
+    # DataFrames próprios de cada sessão (não compartilhados com as outras)
+    frames = [session_frames(namespace) for namespace in namespaces]
+    seen = {}
+    for session in frames:
+        for key in session:
+            seen[key] = seen.get(key, 0) + 1
+    private = [
+        sum(
+            value.memory_usage(deep=True).sum()
+            for key, value in session.items()
+            if seen[key] == 1
+        )
+        / 2**20
+        for session in frames
+    ]
+    report["private_frames_mb"] = round(sum(private) / max(len(private), 1), 2)
+    report["errors"] = sorted(set(SESSION_ERRORS))
+    queue.put(report)
+
+
+def prepare_workdir(workdir: str, src_dir: str, args) -> str:
+    """
+    Monta a árvore ``src`` + ``data`` usada pelo app, com os dados sintéticos.
+    """
+    raw_dir = os.path.join(workdir, "data", "raw")
+    stations_dir = os.path.join(workdir, "data", "stations")
+    os.makedirs(raw_dir, exist_ok=True)
+    os.makedirs(stations_dir, exist_ok=True)
+
+    cotton_path = os.path.join(raw_dir, "AlgodoSerieHist.xlsx")
+    weather_path = os.path.join(raw_dir, "weather_sum_all.csv")
+    if not os.path.exists(weather_path):
+        write_conab_workbook(cotton_path, scale=args.cotton_scale)
+        stations = write_station_index(
+            os.path.join(stations_dir, "estacoes_inmet.csv"), args.stations
+        )
+        write_inmet_csv(weather_path, stations, first_year=2024 - args.years + 1)
+
+    # O app resolve os caminhos a partir da pasta do próprio arquivo
+    link = os.path.join(workdir, "src")
+    if os.path.islink(link):
+        os.remove(link)
+    os.symlink(os.path.abspath(src_dir), link)
+    return link
+
+
+def run_processes(src_dir: str, processes: int, sessions: int, choices) -> list:
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    workers = [
+        context.Process(target=run_worker, args=(src_dir, sessions, choices, queue))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    reports = [queue.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--stations", type=int, default=100)
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--cotton-scale", type=int, default=20)
+    parser.add_argument("--workdir", help="Pasta para os dados sintéticos e caches")
+    add_revision_arguments(parser)
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="algodao-sessions-")
+    src_dir = prepare_workdir(workdir, args.src, args)
+
+    # Sessões em rodízio de seção e métrica, como usuários diferentes
+    sections = [
+        "Tendências Sazonais",
+        "Melhores Regiões",
+        "Influência Climática",
+        "Tendências Históricas",
+        "Correlação de Variáveis",
+        "Previsão de Area Plantada",
+    ]
+    metrics = ["Area_Plantada", "Producao", "Produtividade"]
+    choices = [
+        {"Seção": section, "Métrica:": metric}
+        for section, metric in zip(sections, metrics * 2)
+    ]
+
+    # Primeiro processo: constrói os caches em disco; os seguintes só os leem
+    cold = run_processes(src_dir, 1, 1, choices)[0]
+    reports = run_processes(src_dir, args.processes, args.sessions, choices)
+
+    report = {
+        "sessions_per_process": args.sessions,
+        "processes": args.processes,
+        "stations": args.stations,
+        "years": args.years,
+        "cold_start_seconds": cold["session_seconds"][0],
+        "workers": reports,
+        "per_session_rss_anon_mb": round(
+            sum(r["per_session_rss_anon_mb"] for r in reports) / len(reports), 2
+        ),
+        "private_frames_mb": max(r["private_frames_mb"] for r in reports),
+        "rss_anon_after_load_mb": max(
+            r["after_first_session"]["RssAnon"] - r["after_imports"]["RssAnon"]
+            for r in reports
+        ),
+    }
+    if not args.workdir:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    write_report(report, args.output, args.label)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""
+Benchmark do fluxo carga -> análise -> gráficos sobre dados sintéticos.
+
+Para cada escala (1x, 10x, 100x) são gerados uma planilha no formato da CONAB
+e um CSV horário no formato do INMET; em seguida cada função pública de
+``data_cleaning``, ``analysis`` e ``visualization`` é cronometrada (melhor de
+``--repeat`` execuções, com o cache de memoização limpo) e executada mais uma
+vez sob ``tracemalloc`` para medir o pico de memória. O Streamlit é
+substituído por um módulo vazio, de modo que os gráficos são construídos mas
+não exibidos.
+
+Uso::
+
+    python benchmarks/bench_suite.py --scales 1 10 --output relatorio.json
+    python benchmarks/bench_suite.py --compare benchmarks/results/bench_suite.json
+
+Com ``--compare``, o script falha se alguma função ficar mais lenta (ou usar
+mais memória) que no relatório de referência além da tolerância
+(``--tolerance``, padrão 1.5x). Funções públicas novas sem receita de
+argumentos aparecem em ``skipped``.
+"""
+
+import argparse
+import contextlib
+import inspect
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+
+from synthetic import (  # noqa: E402
+    write_conab_workbook,
+    write_inmet_csv,
+    write_station_index,
+)
+
+MODULES = ["data_cleaning", "analysis", "visualization"]
+
+# Escala -> estações meteorológicas (o número de linhas da CONAB também escala)
+STATIONS_PER_SCALE = 5
+
+# Erros da execução atual: exceções e mensagens enviadas a st.error (erros
+# tratados dentro das funções de visualização passariam despercebidos)
+CALL_ERRORS = []
+
+# Diferenças abaixo deste valor são ruído de medição e não contam como regressão
+MIN_SECONDS = 0.05
+MIN_PEAK_MB = 5.0
+
+
+def install_streamlit_stub():
+    """
+    Registra um módulo ``streamlit`` sem efeitos: chamadas de exibição não fazem
+    nada e os decoradores de cache devolvem a própria função.
+    """
+
+    def noop(*args, **kwargs):
+        return None
+
+    def cache_decorator(func=None, **kwargs):
+        if func is None:
+            return lambda f: f
+        return func
+
+    st = types.ModuleType("streamlit")
+    st.__getattr__ = lambda name: noop
+    st.cache_data = st.cache_resource = cache_decorator
+    st.error = lambda message, *args, **kwargs: CALL_ERRORS.append(str(message))
+
+    components = types.ModuleType("streamlit.components")
+    components_v1 = types.ModuleType("streamlit.components.v1")
+    components_v1.html = noop
+    components.v1 = components_v1
+    st.components = components
+
+    sys.modules["streamlit"] = st
+    sys.modules["streamlit.components"] = components
+    sys.modules["streamlit.components.v1"] = components_v1
+
+
+def generate_inputs(workdir: str, scale: int) -> dict:
+    """
+    Gera (ou reaproveita) os arquivos sintéticos de uma escala.
+    """
+    scale_dir = os.path.join(workdir, f"scale-{scale}")
+    os.makedirs(scale_dir, exist_ok=True)
+    paths = {
+        "cotton": os.path.join(scale_dir, "AlgodoSerieHist.xlsx"),
+        "weather": os.path.join(scale_dir, "weather_sum_all.csv"),
+        "stations": os.path.join(scale_dir, "estacoes_inmet.csv"),
+        "wide_csv": os.path.join(scale_dir, "area_largo.csv"),
+    }
+    if not all(
+        os.path.exists(paths[name]) for name in ("cotton", "weather", "stations")
+    ):
+        write_conab_workbook(paths["cotton"], scale=scale)
+        stations = write_station_index(paths["stations"], STATIONS_PER_SCALE * scale)
+        write_inmet_csv(paths["weather"], stations)
+    return paths
+
+
+def build_context(paths: dict) -> dict:
+    """
+    Carrega os dados sintéticos e pré-calcula as entradas das funções.
+    """
+    import analysis
+    from climate_cube import build_climate_cube
+    from data_cleaning import (
+        index_weather,
+        load_conab_series,
+        load_cotton_data,
+        load_weather_data,
+    )
+
+    cotton = load_cotton_data(paths["cotton"])
+    weather = load_weather_data(paths["weather"], station_index_path=paths["stations"])
+    cube = build_climate_cube(weather)
+
+    # CSV largo com decimais em vírgula, como esperado por preprocess_data
+    if not os.path.exists(paths["wide_csv"]):
+        wide = cotton.pivot_table(
+            index="Região/UF", columns="Ano", values="Area_Plantada"
+        )
+        wide.columns = [f"{year}/{(year + 1) % 100:02d}" for year in wide.columns]
+        wide = wide.applymap(lambda v: f"{v:.1f}".replace(".", ","))
+        wide.rename_axis("REGIÃO/UF").reset_index().to_csv(
+            paths["wide_csv"], index=False
+        )
+
+    historical = analysis.analyze_historical_trends(cotton)
+    return {
+        "paths": paths,
+        "cotton": cotton,
+        "series": load_conab_series(paths["cotton"]),
+        "weather": weather,
+        "indexed_weather": index_weather(weather),
+        "cube": cube,
+        "seasonal": analysis.analyze_seasonal_trends(cotton, cube),
+        "regional": analysis.analyze_regional_potential(cotton, cube),
+        "correlations": analysis.analyze_climatic_influences(cotton, cube),
+        "historical": historical,
+        "predictions": analysis.predict_planted_area(historical),
+        "sizes": {
+            "cotton_rows": len(cotton),
+            "weather_daily_rows": len(weather),
+            "weather_csv_mb": round(os.path.getsize(paths["weather"]) / 2**20, 1),
+            "cube_rows": len(cube),
+        },
+    }
+
+
+# Receitas de argumentos: "modulo.funcao" -> contexto -> (args, kwargs).
+# Todas recebem os DataFrames compartilhados do contexto, sem cópias.
+RECIPES = {
+    "data_cleaning.load_cotton_data": lambda c: ((c["paths"]["cotton"],), {}),
+    "data_cleaning.load_conab_series": lambda c: ((c["paths"]["cotton"],), {}),
+    "data_cleaning.read_conab_workbook": lambda c: ((c["paths"]["cotton"],), {}),
+    "data_cleaning.select_metric": lambda c: ((c["series"], "Producao"), {}),
+    "data_cleaning.load_weather_data": lambda c: (
+        (c["paths"]["weather"],),
+        {"station_index_path": c["paths"]["stations"]},
+    ),
+    "data_cleaning.index_weather": lambda c: ((c["weather"],), {}),
+    "data_cleaning.slice_weather": lambda c: (
+        (c["indexed_weather"], c["weather"]["ESTACAO"].iloc[0]),
+        {"start": "2023-03-01", "end": "2023-05-31"},
+    ),
+    "data_cleaning.add_region_column": lambda c: (
+        (c["weather"].drop(columns="Região/UF"), c["paths"]["stations"]),
+        {},
+    ),
+    "analysis.analyze_seasonal_trends": lambda c: ((c["cotton"], c["cube"]), {}),
+    "analysis.analyze_regional_potential": lambda c: (
+        (c["cotton"], c["cube"]),
+        {},
+    ),
+    "analysis.climate_correlation_accumulator": lambda c: (
+        (c["cotton"], c["cube"]),
+        {},
+    ),
+    "analysis.analyze_climatic_influences": lambda c: ((c["cotton"], c["cube"]), {}),
+    "analysis.analyze_variable_correlations": lambda c: (
+        (c["cotton"], c["cube"]),
+        {},
+    ),
+    "analysis.analyze_lagged_influences": lambda c: ((c["cotton"], c["cube"]), {}),
+    "analysis.analyze_historical_trends": lambda c: ((c["cotton"],), {}),
+    "analysis.forecast_planted_area": lambda c: ((c["historical"],), {}),
+    "analysis.predict_planted_area": lambda c: ((c["historical"],), {}),
+    "analysis.predict_planted_area_by_state": lambda c: ((c["cotton"],), {}),
+    "analysis.preprocess_data": lambda c: ((c["paths"]["wide_csv"],), {}),
+    "visualization.prepare_combined_data": lambda c: (
+        (c["cotton"], c["cube"]),
+        {},
+    ),
+    "visualization.plot_seasonal_trends": lambda c: ((c["seasonal"],), {}),
+    "visualization.plot_regional_map": lambda c: ((c["regional"],), {}),
+    "visualization.add_coordinates_to_regions": lambda c: ((c["regional"],), {}),
+    "visualization.plot_correlation_heatmap": lambda c: (
+        (c["cotton"], c["cube"]),
+        {},
+    ),
+    "visualization.plot_climatic_influence": lambda c: ((c["correlations"],), {}),
+    "visualization.plot_historical_trends": lambda c: ((c["historical"],), {}),
+    "visualization.plot_scatter": lambda c: ((c["cotton"], c["cube"]), {}),
+    "visualization.plot_interactive_scatter": lambda c: ((c["seasonal"],), {}),
+    "visualization.plot_historical_trends_with_prediction": lambda c: (
+        (c["historical"], c["predictions"]),
+        {},
+    ),
+}
+
+
+def public_functions(module_name: str) -> dict:
+    """
+    Funções públicas definidas no próprio módulo (sem as importadas).
+    """
+    module = __import__(module_name)
+    return {
+        f"{module_name}.{name}": func
+        for name, func in inspect.getmembers(module, inspect.isfunction)
+        if not name.startswith("_") and func.__module__ == module_name
+    }
+
+
+def run_once(func, args, kwargs, trace_memory=False):
+    import matplotlib.pyplot as plt
+
+    from memo import clear_cache
+
+    clear_cache()
+    CALL_ERRORS.clear()
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    # Pré-visualizações impressas pelas funções não entram no relatório
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            func(*args, **kwargs)
+        except Exception as e:
+            CALL_ERRORS.append(f"{type(e).__name__}: {e}")
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    plt.close("all")
+    return elapsed, peak
+
+
+def benchmark_scale(workdir: str, scale: int, repeat: int) -> dict:
+    """
+    Mede todas as funções públicas em uma escala.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        context = build_context(generate_inputs(workdir, scale))
+    functions, skipped = {}, []
+    for module_name in MODULES:
+        for name, func in sorted(public_functions(module_name).items()):
+            if name not in RECIPES:
+                skipped.append(name)
+                continue
+            timings = []
+            for _ in range(repeat):
+                args, kwargs = RECIPES[name](context)
+                timings.append(run_once(func, args, kwargs)[0])
+            args, kwargs = RECIPES[name](context)
+            _, peak = run_once(func, args, kwargs, trace_memory=True)
+            functions[name] = {
+                "seconds": round(min(timings), 4),
+                "first_seconds": round(timings[0], 4),
+                "peak_mb": round(peak / 2**20, 2),
+            }
+            if CALL_ERRORS:
+                functions[name]["errors"] = list(CALL_ERRORS)
+            print(f"[{scale}x] {name}: {functions[name]}", file=sys.stderr)
+    return {"inputs": context["sizes"], "functions": functions, "skipped": skipped}
+
+
+def compare_reports(report: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Lista as regressões de tempo e memória em relação ao relatório de referência.
+    """
+    regressions = []
+    for scale, result in report["scales"].items():
+        reference = baseline.get("scales", {}).get(scale, {}).get("functions", {})
+        for name, current in result["functions"].items():
+            if name not in reference:
+                continue
+            for metric, floor in (("seconds", MIN_SECONDS), ("peak_mb", MIN_PEAK_MB)):
+                before, after = reference[name][metric], current[metric]
+                if after > max(before * tolerance, floor):
+                    regressions.append(
+                        f"[{scale}x] {name} {metric}: {after} (referência {before})"
+                    )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workdir", help="Pasta para os dados sintéticos")
+    parser.add_argument("--output")
+    parser.add_argument("--compare")
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    args = parser.parse_args()
+
+    install_streamlit_stub()
+    workdir = args.workdir or tempfile.mkdtemp(prefix="algodao-bench-")
+
+    report = {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "scales": {
+            str(scale): benchmark_scale(workdir, scale, args.repeat)
+            for scale in args.scales
+        },
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_reports(report, baseline, args.tolerance)
+        if regressions:
+            sys.exit("Regressões em relação à referência:\n" + "\n".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
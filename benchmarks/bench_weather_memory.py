@@ -0,0 +1,132 @@
+"""
+Relatório de memória da tabela climática: esquema antigo versus compacto.
+
+Um CSV horário sintético no formato do INMET é carregado com
+``load_weather_data`` (esquema compacto: float32, ``Ano`` int16, ``Mes``/``Dia``
+int8, categorias). A partir do mesmo resultado são montados o esquema anterior
+(coluna ``DATA`` datetime e ``Ano``/``Mes`` int64) e o esquema original (também
+com a coluna de data em texto, medições em float64, código da estação em texto e
+estação do ano via ``pd.cut``). O relatório traz bytes por linha de cada coluna e
+a projeção para o conjunto completo do INMET (``--full-stations`` estações
+diárias ao longo de ``--full-years`` anos).
+
+Uso::
+
+    python benchmarks/bench_weather_memory.py [--stations 40] [--output relatorio.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+
+from data_cleaning import (  # noqa: E402
+    WEATHER_DATE_COL,
+    WEATHER_STATION_COL,
+    load_weather_data,
+)
+from synthetic import write_inmet_csv, write_station_index  # noqa: E402
+
+
+def previous_schema(compact: pd.DataFrame) -> pd.DataFrame:
+    """
+    Esquema anterior: data completa em ``DATA`` e ``Ano``/``Mes`` em int64.
+    """
+    dates = pd.to_datetime(
+        pd.DataFrame(
+            {"year": compact["Ano"], "month": compact["Mes"], "day": compact["Dia"]}
+        )
+    )
+    return compact.drop(columns="Dia").assign(
+        DATA=dates,
+        Ano=compact["Ano"].astype("int64"),
+        Mes=compact["Mes"].astype("int64"),
+    )
+
+
+def original_schema(compact: pd.DataFrame) -> pd.DataFrame:
+    """
+    Esquema original: data em texto e datetime, medições em float64, código da
+    estação em texto, ``Ano``/``Mes`` int64 e estação do ano via ``pd.cut``.
+    """
+    legacy = previous_schema(compact)
+    measures = legacy.select_dtypes("float32").columns
+    legacy = legacy.astype({col: "float64" for col in measures})
+    legacy[WEATHER_DATE_COL] = legacy["DATA"].dt.strftime("%Y-%m-%d")
+    legacy[WEATHER_STATION_COL] = legacy[WEATHER_STATION_COL].astype(str)
+    legacy["Estacao"] = pd.cut(
+        legacy["Mes"],
+        bins=[0, 2, 5, 8, 11, 12],
+        labels=["Verão", "Outono", "Inverno", "Primavera", "Verão"],
+        ordered=False,
+    )
+    return legacy
+
+
+def schema_report(data: pd.DataFrame, full_rows: int) -> dict:
+    usage = data.memory_usage(deep=True, index=False)
+    row_bytes = usage.sum() / len(data)
+    return {
+        "bytes_per_row": round(row_bytes, 1),
+        "columns": {col: round(size / len(data), 1) for col, size in usage.items()},
+        "mb": round(usage.sum() / 2**20, 1),
+        "full_dataset_mb": round(row_bytes * full_rows / 2**20),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--stations", type=int, default=40)
+    parser.add_argument("--full-stations", type=int, default=600)
+    parser.add_argument("--full-years", type=int, default=25)
+    parser.add_argument("--workdir", help="Pasta para os dados sintéticos")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="algodao-weather-")
+    csv_path = os.path.join(workdir, "weather_sum_all.csv")
+    index_path = os.path.join(workdir, "estacoes_inmet.csv")
+    if not os.path.exists(csv_path):
+        stations = write_station_index(index_path, args.stations)
+        write_inmet_csv(csv_path, stations)
+
+    compact = load_weather_data(csv_path, station_index_path=index_path)
+    full_rows = args.full_stations * int(round(args.full_years * 365.25))
+
+    schemas = {
+        "original": original_schema(compact),
+        "anterior": previous_schema(compact),
+        "compacto": compact,
+    }
+    report = {
+        "rows": len(compact),
+        "full_dataset_rows": full_rows,
+        "schemas": {
+            name: schema_report(data, full_rows) for name, data in schemas.items()
+        },
+    }
+    compact_bytes = report["schemas"]["compacto"]["bytes_per_row"]
+    report["reduction"] = {
+        name: round(report["schemas"][name]["bytes_per_row"] / compact_bytes, 2)
+        for name in ("original", "anterior")
+    }
+    # A tabela mês -> estação deve reproduzir o pd.cut do esquema original
+    seasons = compact["Estacao"].astype(str)
+    if not schemas["original"]["Estacao"].astype(str).equals(seasons):
+        sys.exit("Estações do ano divergentes entre os esquemas")
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Perfil de tempo de importação dos módulos do projeto e das dependências.
+
+Cada módulo é importado em um processo novo com ``python -X importtime``; o
+relatório traz o tempo total de cada módulo e o tempo acumulado de cada
+dependência de terceiros que ele carregou.
+
+Uso::
+
+    python benchmarks/import_profile.py [--output relatorio.json]
+    python benchmarks/import_profile.py --check benchmarks/results/import_profile.json
+
+Com ``--check``, o script falha se algum módulo ficar mais lento que o
+relatório de referência além da tolerância (``--tolerance``, padrão 1.5x).
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# Módulos do projeto que podem ser importados sem efeitos colaterais
+PROJECT_MODULES = [
+    "data_cleaning",
+    "data_cache",
+    "climate_cube",
+    "analysis",
+    "figures",
+    "visualization",
+    "pipeline",
+]
+
+# Dependências pesadas acompanhadas individualmente
+DEPENDENCIES = [
+    "pandas",
+    "numpy",
+    "pyarrow",
+    "matplotlib",
+    "seaborn",
+    "streamlit",
+    "geopandas",
+    "folium",
+    "plotly",
+]
+
+
+def profile_import(module: str, repeat: int = 3) -> dict:
+    """
+    Importa ``module`` em processos novos e retorna o melhor tempo total e o
+    tempo acumulado por dependência (em milissegundos).
+    """
+    best = None
+    for _ in range(repeat):
+        env = dict(os.environ, PYTHONPATH=SRC_DIR)
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            env=env,
+            cwd=SRC_DIR,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"Falha ao importar {module}:\n{proc.stderr}")
+
+        total_us = 0
+        deps = {}
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, name = line[len("import time:") :].split("|")
+            name = name.strip()
+            cumulative = int(cumulative)
+            if name == module:
+                total_us = cumulative
+            # A linha do pacote (e não dos submódulos) inclui suas dependências
+            elif name in DEPENDENCIES:
+                deps[name] = cumulative
+
+        result = {
+            "total_ms": round(total_us / 1000, 1),
+            "dependencies_ms": {k: round(v / 1000, 1) for k, v in deps.items()},
+        }
+        if best is None or result["total_ms"] < best["total_ms"]:
+            best = result
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output")
+    parser.add_argument("--check")
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    report = {
+        "python": sys.version.split()[0],
+        "modules": {m: profile_import(m, args.repeat) for m in PROJECT_MODULES},
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+    if args.check:
+        with open(args.check, encoding="utf-8") as f:
+            baseline = json.load(f)["modules"]
+        regressions = [
+            f"{name}: {info['total_ms']} ms (referência {baseline[name]['total_ms']} ms)"
+            for name, info in report["modules"].items()
+            if name in baseline
+            and info["total_ms"] > baseline[name]["total_ms"] * args.tolerance
+        ]
+        if regressions:
+            sys.exit("Regressão no tempo de importação:\n" + "\n".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
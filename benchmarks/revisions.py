@@ -0,0 +1,67 @@
+"""
+Comparação de benchmarks entre revisões do código.
+
+Os roteiros que medem o efeito de uma mudança (``bench_immutability``,
+``bench_rerender`` e ``bench_sessions``) aceitam as mesmas opções:
+
+- ``--src``: pasta ``src`` a ser medida, por exemplo de um ``git worktree`` da
+  revisão anterior (padrão: a ``src`` deste repositório);
+- ``--label``: chave do relatório no arquivo de resultados (padrão ``atual``);
+- ``--output``: arquivo JSON de resultados; o relatório é gravado sob
+  ``--label``, preservando os das demais revisões.
+
+Exemplo, medindo a revisão anterior e a atual no mesmo arquivo::
+
+    git worktree add /tmp/revisao-anterior HEAD~1
+    python benchmarks/bench_rerender.py --src /tmp/revisao-anterior/src \\
+        --label antes --output benchmarks/results/bench_rerender.json
+    python benchmarks/bench_rerender.py \\
+        --label depois --output benchmarks/results/bench_rerender.json
+"""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(BENCH_DIR, "..", "src")
+
+
+def add_revision_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Registra ``--src``, ``--label`` e ``--output`` em ``parser``.
+    """
+    parser.add_argument("--src", default=SRC_DIR, help="Pasta src a ser medida")
+    parser.add_argument("--label", default="atual", help="Chave do relatório")
+    parser.add_argument("--output", help="Arquivo JSON de resultados")
+
+
+def load_modules(src_dir: str, *names: str) -> argparse.Namespace:
+    """
+    Importa os módulos ``names`` da pasta ``src_dir``, com o Streamlit
+    substituído por um módulo vazio.
+    """
+    from bench_suite import install_streamlit_stub
+
+    install_streamlit_stub()
+    sys.path.insert(0, os.path.abspath(src_dir))
+    return argparse.Namespace(**{name: importlib.import_module(name) for name in names})
+
+
+def write_report(report: dict, output: str = None, label: str = "atual") -> None:
+    """
+    Imprime ``report`` e, com ``output``, grava-o sob ``label`` nesse arquivo,
+    preservando os relatórios das demais chaves.
+    """
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if not output:
+        return
+    results = {}
+    if os.path.exists(output):
+        with open(output, encoding="utf-8") as f:
+            results = json.load(f)
+    results[label] = report
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(json.dumps(results, indent=2, ensure_ascii=False) + "\n")
@@ -0,0 +1,180 @@
+"""
+Geradores de dados sintéticos no formato da CONAB (algodão) e do INMET (clima).
+"""
+
+import numpy as np
+import pandas as pd
+
+# Linhas da série histórica da CONAB (regiões e UFs, sem os totais)
+REGIONS = [
+    "NORTE", "RR", "RO", "AC", "AM", "AP", "PA", "TO",
+    "NORDESTE", "MA", "PI", "CE", "RN", "PB", "PE", "AL", "SE", "BA",
+    "CENTRO-OESTE", "MT", "MS", "GO", "DF",
+    "SUDESTE", "MG", "ES", "RJ", "SP",
+    "SUL", "PR", "SC", "RS", "CENTRO-SUL",
+]  # fmt: skip
+
+MEASURES = [
+    "temp_max", "temp_avg", "temp_min", "hum_max", "hum_min",
+    "rain_max", "rad_max", "wind_avg", "wind_max",
+]  # fmt: skip
+
+
+def synthetic_cotton(
+    first_year: int = 1976, last_year: int = 2024, seed: int = 0, scale: int = 1
+):
+    """
+    Série de área plantada em formato longo (Região/UF, Ano, Area_Plantada);
+    ``scale`` > 1 acrescenta cópias numeradas das Regiões/UFs.
+    """
+    rng = np.random.default_rng(seed)
+    years = np.arange(first_year, last_year + 1)
+    regions = _scaled_regions(scale)
+    data = pd.DataFrame(
+        {
+            "Região/UF": np.repeat(regions, len(years)),
+            "Ano": np.tile(years, len(regions)),
+        }
+    )
+    data["Area_Plantada"] = rng.gamma(2.0, 50.0, len(data))
+    return data
+
+
+def synthetic_weather(
+    n_stations: int = 600,
+    first_year: int = 2000,
+    last_year: int = 2024,
+    freq: str = "D",
+    seed: int = 0,
+):
+    """
+    Medições por estação no formato de ``load_weather_data`` (já limpo).
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(f"{first_year}-01-01", f"{last_year}-12-31", freq=freq)
+    stations = [f"A{i:03d}" for i in range(1, n_stations + 1)]
+    ufs = [name for name in REGIONS if len(name) == 2]
+    n = len(dates) * n_stations
+
+    data = pd.DataFrame({"ESTACAO": pd.Categorical(np.repeat(stations, len(dates)))})
+    for col in MEASURES:
+        data[col] = rng.normal(25.0, 5.0, n).astype("float32")
+    data["Ano"] = np.tile(dates.year.values, n_stations).astype("int16")
+    data["Mes"] = np.tile(dates.month.values, n_stations).astype("int8")
+    data["Dia"] = np.tile(dates.day.values, n_stations).astype("int8")
+    seasons = np.array(["Verão"] * 2 + ["Outono"] * 3 + ["Inverno"] * 3)
+    seasons = np.concatenate([seasons, ["Primavera"] * 3, ["Verão"]])
+    data["Estacao"] = pd.Categorical(seasons[data["Mes"].to_numpy() - 1])
+    station_uf = np.array(ufs)[np.arange(n_stations) % len(ufs)]
+    data["Região/UF"] = pd.Categorical(np.repeat(station_uf, len(dates)))
+    return data
+
+
+# Planilhas da série histórica da CONAB: nome da aba -> (título, unidade)
+CONAB_SHEETS = {
+    "Área": ("Área Plantada", "Em mil hectares"),
+    "Produtividade Algodão em Caroço": (
+        "Produtividade de Algodão em Caroço",
+        "Em kg/ha",
+    ),
+    "Produção Algodão em Caroço": ("Produção de Algodão em Caroço", "Em mil t"),
+}
+
+
+def _scaled_regions(scale: int) -> list:
+    # Cópias numeradas das linhas da CONAB para aumentar a tabela
+    return REGIONS + [f"{name}-{k}" for k in range(2, scale + 1) for name in REGIONS]
+
+
+def write_conab_workbook(
+    path: str,
+    scale: int = 1,
+    first_year: int = 1976,
+    last_year: int = 2024,
+    seed: int = 0,
+) -> int:
+    """
+    Grava uma planilha no formato largo da série histórica da CONAB (títulos,
+    cabeçalho 'REGIÃO/UF' com as safras, total BRASIL e rodapé) e retorna o
+    número de linhas de Região/UF por aba.
+    """
+    from openpyxl import Workbook
+
+    rng = np.random.default_rng(seed)
+    regions = _scaled_regions(scale)
+    seasons = [
+        f"{year}/{(year + 1) % 100:02d}" for year in range(first_year, last_year)
+    ]
+    seasons.append(f"{last_year}/{(last_year + 1) % 100:02d} Previsão (¹)")
+
+    workbook = Workbook(write_only=True)
+    for sheet, (title, unit) in CONAB_SHEETS.items():
+        ws = workbook.create_sheet(sheet)
+        ws.append([None])
+        ws.append(["ALGODÃO - BRASIL"])
+        ws.append([f"Série Histórica de {title}"])
+        ws.append([f"Safras {seasons[0]} a {seasons[-1][:7]}"])
+        ws.append([unit])
+        ws.append(["REGIÃO/UF"] + seasons)
+        values = np.round(rng.gamma(2.0, 50.0, (len(regions), len(seasons))), 1)
+        for name, row in zip(regions, values):
+            ws.append([name] + row.tolist())
+        ws.append(["BRASIL"] + np.round(values.sum(axis=0), 1).tolist())
+        ws.append(["Legenda: (¹) Estimativa."])
+        ws.append(["Fonte: Conab"])
+    workbook.save(path)
+    return len(regions)
+
+
+def write_station_index(path: str, n_stations: int) -> list:
+    """
+    Grava um índice de estações sintético (UFs em rodízio) e retorna os códigos.
+    """
+    ufs = [name for name in REGIONS if len(name) == 2]
+    stations = [f"S{i:04d}" for i in range(1, n_stations + 1)]
+    pd.DataFrame(
+        {
+            "ESTACAO": stations,
+            "UF": [ufs[i % len(ufs)] for i in range(n_stations)],
+            "REGIAO": "",
+            "LATITUDE": np.nan,
+            "LONGITUDE": np.nan,
+            "ALTITUDE": np.nan,
+        }
+    ).to_csv(path, index=False)
+    return stations
+
+
+def write_inmet_csv(
+    path: str,
+    stations: list,
+    first_year: int = 2023,
+    last_year: int = 2024,
+    seed: int = 0,
+) -> int:
+    """
+    Grava medições horárias por estação no formato de ``weather_sum_all.csv``
+    (uma estação por vez, para limitar a memória) e retorna o número de linhas.
+    """
+    rng = np.random.default_rng(seed)
+    hours = pd.date_range(f"{first_year}-01-01", f"{last_year}-12-31 23:00", freq="H")
+    dates = hours.strftime("%Y-%m-%d")
+    times = hours.strftime("%H%M UTC")
+
+    rows = 0
+    for i, station in enumerate(stations):
+        block = pd.DataFrame(
+            {
+                "DATA (YYYY-MM-DD)": dates,
+                "HORA (UTC)": times,
+                "ESTACAO": station,
+            }
+        )
+        for col in MEASURES:
+            block[col] = np.round(rng.normal(25.0, 5.0, len(hours)), 2)
+        block.index += rows
+        block.to_csv(
+            path, mode="w" if i == 0 else "a", header=i == 0, index_label="index"
+        )
+        rows += len(block)
+    return rows
@@ -1,159 +1,337 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import PolynomialFeatures
 import numpy as np
-import streamlit as st
-
 
+from climate_cube import state_cube
+from correlations import CorrelationAccumulator
+from data_cleaning import DEFAULT_METRIC
+from features import build_climate_features, correlation_significance
+from forecasting import (
+    DEFAULT_MODEL,
+    DEFAULT_RESAMPLES,
+    INTERVAL_LEVELS,
+    bootstrap_intervals,
+    forecast_by_state,
+    forecast_cube,
+)
+from instrumentation import instrument
+from joins import merge_at_grain, reduce_to_grain
+from memo import memoize
+
+# Agregação anual de cada métrica (as demais são somadas)
+METRIC_AGGREGATIONS = {"Produtividade": "mean"}
+
+
+@instrument
+@memoize
 def analyze_seasonal_trends(
-    cotton_data: pd.DataFrame, weather_data: pd.DataFrame
+    cotton_data: pd.DataFrame, climate_cube: pd.DataFrame
 ) -> pd.DataFrame:
     """
-    Analisa tendências sazonais combinando dados de algodão e climáticos.
+    Analisa tendências sazonais combinando dados de algodão e o cubo climático.
     """
     try:
-        # Identificar colunas numéricas
-        numeric_cols = weather_data.select_dtypes(include=[float, int]).columns.tolist()
-
-        # Agrupar os dados climáticos por ano e estação, calculando a média
-        seasonal_weather = weather_data.groupby(["Ano", "Estacao"], as_index=False)[
-            numeric_cols
-        ].mean()
+        # Médias climáticas por ano e estação, consultadas no cubo
+        seasonal_weather = reduce_to_grain(climate_cube, ["Ano", "Estacao"])
 
         # Combinar dados de algodão com as tendências sazonais climáticas
-        combined_data = pd.merge(cotton_data, seasonal_weather, on="Ano", how="inner")
-
-        print("Pré-visualização dos dados sazonais combinados:")
-        print(combined_data.head())
+        combined_data = merge_at_grain(cotton_data, seasonal_weather, on=["Ano"])
 
         return combined_data
     except Exception as e:
         raise RuntimeError(f"Erro ao analisar tendências sazonais: {e}")
 
 
-def analyze_regional_potential(cotton_data, weather_data):
+@instrument
+@memoize
+def analyze_regional_potential(cotton_data, weather_data, metric=DEFAULT_METRIC):
     """
-    Analisa as melhores regiões para o plantio de algodão.
+    Analisa as melhores regiões para o plantio de algodão pela média de
+    ``metric`` (área plantada, por padrão).
     """
     try:
-        # Inspecionar e garantir que todas as colunas numéricas sejam numéricas
-        numeric_cols = ["Area_Plantada"]  # Atualize conforme necessário
-        for col in numeric_cols:
-            cotton_data[col] = pd.to_numeric(cotton_data[col], errors="coerce")
-
-        # Remover linhas com valores NaN nas colunas numéricas
-        cotton_data = cotton_data.dropna(subset=numeric_cols)
+        # Converter apenas a coluna da métrica, sem alterar o DataFrame recebido
+        values = pd.to_numeric(cotton_data[metric], errors="coerce")
 
-        # Garantir que os dados estejam prontos para agrupamento
-        print("Pré-visualização dos dados antes do agrupamento:")
-        print(cotton_data.head())
-
-        # Agrupar por região e calcular a média da área plantada
+        # Agrupar por região e calcular a média (valores ausentes são ignorados)
         regional_data = (
-            cotton_data.groupby("Região/UF")[numeric_cols]
+            values.groupby(cotton_data["Região/UF"])
             .mean()
-            .sort_values(by="Area_Plantada", ascending=False)
+            .dropna()
+            .sort_values(ascending=False)
         )
 
         # Resetar o índice para facilitar a visualização
-        regional_data = regional_data.reset_index()
-
-        print("Pré-visualização das melhores regiões para plantio:")
-        print(regional_data.head())
-
-        return regional_data
+        return regional_data.reset_index()
     except Exception as e:
         raise RuntimeError(f"Erro ao analisar potencial regional: {e}")
 
 
-def analyze_climatic_influences(cotton_data, weather_data):
-    # Garantir que 'Região/UF' exista em ambos os datasets
-    if "Região/UF" not in weather_data.columns:
-        # Exemplo de mapeamento; ajuste conforme necessário
-        station_to_region = {
-            "A001": "NORTE",
-            "A002": "NORDESTE",
-            # Outros mapeamentos
-        }
-        weather_data["Região/UF"] = weather_data["ESTACAO"].map(station_to_region)
-
-    # Certificar-se de que a coluna 'Ano' existe e está correta
-    if "Ano" not in weather_data.columns:
-        weather_data["Ano"] = pd.to_datetime(weather_data["DATA (YYYY-MM-DD)"]).dt.year
+@instrument
+@memoize
+def climate_correlation_accumulator(cotton_data, climate_cube, seasonal=False):
+    """
+    Somas de correlação entre área plantada e clima por Região/UF (e por
+    estação do ano, se ``seasonal``), compartilhadas pelas análises de correlação.
+    """
+    keys = ["Ano", "Estacao", "Região/UF"] if seasonal else ["Ano", "Região/UF"]
 
-    # Realizar a mesclagem
-    combined_data = cotton_data.merge(
-        weather_data, on=["Ano", "Região/UF"], how="inner"
+    # Médias climáticas por Região/UF (e estação), consultadas no cubo
+    combined_data = merge_at_grain(
+        cotton_data,
+        reduce_to_grain(state_cube(climate_cube), keys),
+        on=["Ano", "Região/UF"],
     )
 
-    # Filtrar apenas colunas numéricas
-    numeric_data = combined_data.select_dtypes(include=["float64", "int64"])
+    variables = list(combined_data.select_dtypes(include="number").columns)
+    accumulator = CorrelationAccumulator(variables, by=keys[1:])
+    return accumulator.update(combined_data)
+
+
+@instrument
+@memoize
+def analyze_climatic_influences(cotton_data, climate_cube, season=None):
+    """
+    Correlação de cada variável com a área plantada, no ano inteiro ou em uma
+    estação do ano.
+    """
+    if season is None:
+        corr_matrix = climate_correlation_accumulator(cotton_data, climate_cube).corr()
+    else:
+        corr_matrix = climate_correlation_accumulator(
+            cotton_data, climate_cube, seasonal=True
+        ).corr(Estacao=season)
 
     # Calcular correlações
-    correlations = numeric_data.corr()["Area_Plantada"].sort_values(ascending=False)
+    correlations = corr_matrix["Area_Plantada"].sort_values(ascending=False)
 
     return correlations
 
 
-def analyze_historical_trends(cotton_data):
-    # Garantir que o nome da coluna esteja correto
-    if "Area_Planted" not in cotton_data.columns:
-        cotton_data.rename(columns={"Area_Plantada": "Area_Planted"}, inplace=True)
+@instrument
+@memoize
+def analyze_variable_correlations(cotton_data, climate_cube, season=None):
+    """
+    Calcula a matriz de correlação entre variáveis climáticas e área plantada.
+    """
+    if season is None:
+        return climate_correlation_accumulator(cotton_data, climate_cube).corr()
+    return climate_correlation_accumulator(
+        cotton_data, climate_cube, seasonal=True
+    ).corr(Estacao=season)
+
+
+@instrument
+@memoize
+def analyze_lagged_influences(cotton_data, climate_cube):
+    """
+    Correlação e p-valor da área plantada com o clima do mesmo ano, das
+    estações, das janelas de safra e dos anos anteriores (t-1, t-2).
+    """
+    try:
+        features = build_climate_features(climate_cube)
+        return correlation_significance(cotton_data, features)
+    except Exception as e:
+        raise RuntimeError(f"Erro ao analisar influências climáticas defasadas: {e}")
 
-    # Agrupar por ano e somar a área plantada
-    historical_trends = cotton_data.groupby("Ano")["Area_Planted"].sum().reset_index()
 
-    # Criar visualização
-    plt.figure(figsize=(10, 6))
-    plt.plot(historical_trends["Ano"], historical_trends["Area_Planted"], marker="o")
-    plt.title("Tendências Históricas de Plantio de Algodão")
-    plt.xlabel("Ano")
-    plt.ylabel("Área Plantada (em mil hectares)")
-    plt.grid(True)
-    plt.tight_layout()
-    st.pyplot(plt)
-    plt.close()
+@instrument
+@memoize
+def analyze_historical_trends(cotton_data, metric=DEFAULT_METRIC):
+    # Agrupar por ano e agregar a métrica (soma, ou média para produtividade)
+    aggregation = METRIC_AGGREGATIONS.get(metric, "sum")
+    historical_trends = (
+        cotton_data.groupby("Ano")[metric].agg(aggregation).reset_index()
+    )
 
     return historical_trends
 
 
-def predict_planted_area(cotton_data, years_to_consider=10, forecast_until=2030):
+def _annual_series(cotton_data, metric=DEFAULT_METRIC) -> pd.Series:
+    """
+    Série anual de ``metric`` usada pelas previsões.
+    """
+    # Uma observação por ano (a média equivale ao ajuste sobre todas as linhas
+    # quando cada ano tem o mesmo número de registros); só a coluna da métrica
+    # é convertida, sem copiar o DataFrame recebido
+    values = pd.to_numeric(cotton_data[metric], errors="coerce")
+    series = values.groupby(cotton_data["Ano"]).mean().dropna()
+    if len(series) < 2:
+        raise ValueError("Dados insuficientes para previsão.")
+    return series
+
+
+@instrument
+@memoize
+def forecast_planted_area(cotton_data, forecast_until=2030, metric=DEFAULT_METRIC):
+    """
+    Cubo de previsões (janela, modelo, horizonte) da série anual de ``metric``.
+
+    Todas as janelas e modelos são ajustados de uma vez; trocar a configuração
+    na interface é apenas uma consulta ao cubo.
+    """
+    series = _annual_series(cotton_data, metric)
+
+    max_horizon = int(forecast_until - series.index.max())
+    if max_horizon < 1:
+        return pd.DataFrame(
+            columns=["Ano", "prediction"],
+            index=pd.MultiIndex.from_arrays(
+                [[], [], []], names=["window", "model", "horizon"]
+            ),
+        )
+    return forecast_cube(series.index.values, series.values, max_horizon)
+
+
+def _interval_columns() -> list:
+    return [f"{b}_{lvl}" for lvl in INTERVAL_LEVELS for b in ("lower", "upper")]
+
+
+def _with_intervals(series, selected, window, model, n_resamples, seed, predicted_col):
+    """
+    Previsões ``selected`` (uma janela e um modelo do cubo) com os intervalos
+    de previsão por bootstrap dos resíduos da mesma janela.
+    """
+    intervals = bootstrap_intervals(
+        series.index.values,
+        series.values,
+        len(selected),
+        window,
+        model=model,
+        n_resamples=n_resamples,
+        seed=seed,
+    )
+    predictions = pd.DataFrame(
+        {
+            "Ano": selected["Ano"].values,
+            predicted_col: selected["prediction"].values,
+        }
+    )
+    bands = intervals.drop(columns=["Ano", "prediction"])
+    return pd.concat([predictions, bands], axis=1)
+
+
+@instrument
+@memoize
+def predict_planted_area(
+    cotton_data,
+    years_to_consider=10,
+    forecast_until=2030,
+    model=DEFAULT_MODEL,
+    n_resamples=DEFAULT_RESAMPLES,
+    seed=0,
+    metric=DEFAULT_METRIC,
+):
+    """
+    Previsão anual de ``metric`` (coluna ``<metric>_Predicted``) com a janela e
+    o modelo escolhidos e os intervalos de previsão de 80% e 95%.
+    """
     try:
-        cotton_data = cotton_data.rename(columns={"Area_Plantada": "Area_Planted"})
-        recent_years = sorted(cotton_data["Ano"].unique())[-years_to_consider:]
-        filtered_data = cotton_data[cotton_data["Ano"].isin(recent_years)].copy()
-
-        # Validar dados
-        if filtered_data.empty or filtered_data["Area_Planted"].isnull().all():
-            raise ValueError("Dados insuficientes para previsão.")
-
-        X = filtered_data["Ano"].values.reshape(-1, 1)
-        y = filtered_data["Area_Planted"].values
-
-        # Regressão polinomial
-        poly = PolynomialFeatures(degree=2)  # Ajuste o grau conforme necessário
-        X_poly = poly.fit_transform(X)
-        model = LinearRegression()
-        model.fit(X_poly, y)
-
-        # Prever anos futuros
-        future_years = np.arange(X[-1][0] + 1, forecast_until + 1).reshape(-1, 1)
-        future_predictions = model.predict(poly.transform(future_years))
-
-        # Criar DataFrame de previsões
-        predictions = pd.DataFrame(
-            {
-                "Ano": future_years.flatten(),
-                "Area_Planted_Predicted": future_predictions,
-            }
+        predicted_col = f"{metric}_Predicted"
+        cube = forecast_planted_area(
+            cotton_data, forecast_until=forecast_until, metric=metric
         )
+        if cube.empty:
+            return pd.DataFrame(columns=["Ano", predicted_col] + _interval_columns())
 
-        return predictions
+        # Janelas de 2 até o total de anos disponíveis
+        n_years = cube.index.get_level_values("window").max()
+        window = int(min(max(years_to_consider, 2), n_years))
+        selected = cube.xs((window, model), level=["window", "model"])
+
+        series = _annual_series(cotton_data, metric)
+        return _with_intervals(
+            series, selected, window, model, n_resamples, seed, predicted_col
+        )
     except Exception as e:
         raise RuntimeError(f"Erro ao prever área plantada: {e}")
 
 
+@instrument
+@memoize
+def predict_all_windows(
+    cotton_data,
+    forecast_until=2030,
+    n_resamples=DEFAULT_RESAMPLES,
+    seed=0,
+    metric=DEFAULT_METRIC,
+):
+    """
+    Previsões de ``metric`` com intervalos para todas as janelas e modelos, em
+    uma tabela longa (``window``, ``model`` e as colunas de
+    ``predict_planted_area``); escolher a configuração é apenas um filtro.
+    """
+    try:
+        predicted_col = f"{metric}_Predicted"
+        columns = ["window", "model", "Ano", predicted_col] + _interval_columns()
+        cube = forecast_planted_area(
+            cotton_data, forecast_until=forecast_until, metric=metric
+        )
+        if cube.empty:
+            return pd.DataFrame(columns=columns)
+
+        series = _annual_series(cotton_data, metric)
+        tables = [
+            _with_intervals(
+                series, selected, window, model, n_resamples, seed, predicted_col
+            ).assign(window=window, model=model)
+            for (window, model), selected in cube.groupby(
+                level=["window", "model"], sort=False
+            )
+        ]
+        return pd.concat(tables, ignore_index=True)[columns]
+    except Exception as e:
+        raise RuntimeError(f"Erro ao prever área plantada: {e}")
+
+
+def select_state_forecast(
+    cube, years_to_consider=10, model=DEFAULT_MODEL, metric=DEFAULT_METRIC
+):
+    """
+    Seleciona em ``cube`` (saída de ``forecast_by_state``) a janela e o modelo
+    de cada Região/UF; cada série usa a maior janela disponível até
+    ``years_to_consider``.
+    """
+    predicted_col = f"{metric}_Predicted"
+    if cube.empty:
+        return pd.DataFrame(columns=["Região/UF", "Ano", predicted_col])
+
+    window = np.minimum(
+        max(years_to_consider, 2),
+        cube.groupby("Região/UF")["window"].transform("max"),
+    )
+    selected = cube[(cube["window"] == window) & (cube["model"] == model)]
+
+    return selected.rename(columns={"prediction": predicted_col})[
+        ["Região/UF", "Ano", predicted_col]
+    ].reset_index(drop=True)
+
+
+@instrument
+@memoize
+def predict_planted_area_by_state(
+    cotton_data,
+    years_to_consider=10,
+    forecast_until=2030,
+    model=DEFAULT_MODEL,
+    workers=None,
+    metric=DEFAULT_METRIC,
+):
+    """
+    Previsão de ``metric`` para cada Região/UF, com a mesma janela e modelo.
+    """
+    try:
+        cube = forecast_by_state(
+            cotton_data,
+            forecast_until=forecast_until,
+            value_col=metric,
+            workers=workers,
+        )
+        return select_state_forecast(cube, years_to_consider, model, metric)
+    except Exception as e:
+        raise RuntimeError(f"Erro ao prever área plantada por estado: {e}")
+
+
+@instrument
 def preprocess_data(file_path: str) -> pd.DataFrame:
     """
     Pré-processa os dados de área plantada de algodão.
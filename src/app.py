@@ -1,32 +1,58 @@
 import streamlit as st
-import pandas as pd
+import streamlit.components.v1 as components
+import logging
 import os
-from data_cleaning import load_cotton_data, load_weather_data
-from analysis import (
-    analyze_seasonal_trends,
-    analyze_regional_potential,
-    analyze_climatic_influences,
-    analyze_historical_trends,
-    predict_planted_area,
-)
-from visualization import (
-    plot_seasonal_trends,
-    plot_regional_map,
-    plot_climatic_influence,
-    plot_historical_trends,
-    plot_correlation_heatmap,
-    plot_historical_trends_with_prediction,
+from data_cleaning import DEFAULT_METRIC, METRIC_NAMES
+from analysis import select_state_forecast
+from artifacts import (
+    artifact_name,
+    ensure_snapshot,
+    figure_path,
+    read_manifest,
+    read_map,
+    read_table,
+    snapshot_key,
 )
+from figures import render_png
+from forecasting import DEFAULT_MODEL
+from instrumentation import start_run, summarize
 
 # Diretório base ajustado
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 DATA_DIR = os.path.join(BASE_DIR, "data", "raw")
 GEO_DIR = os.path.join(BASE_DIR, "data", "geo")
+GEOJSON_PATH = os.path.join(GEO_DIR, "br_states.json")
+
+
+@st.cache_resource(show_spinner=False)
+def current_snapshot(cotton_path, weather_path, key):
+    """
+    Pasta do snapshot de artefatos dos arquivos brutos atuais, compartilhada por
+    todas as sessões; ``key`` (de ``snapshot_key``) entra na chave do cache para
+    que o snapshot seja reconstruído quando qualquer arquivo de origem mudar
+    (CONAB, INMET, índice de estações ou GeoJSON).
+    """
+    return ensure_snapshot(cotton_path, weather_path, geojson_path=GEOJSON_PATH)
+
+
+def show_figure(name):
+    """
+    Exibe uma figura já renderizada do snapshot.
+    """
+    path = figure_path(snapshot_dir, name)
+    if os.path.exists(path):
+        st.image(path)
+    else:
+        st.warning("Gráfico não disponível neste snapshot.")
 
 
 # Configuração inicial da página
 st.set_page_config(page_title="Análise de Algodão no Brasil", layout="wide")
 
+# Registros de tempo desta execução (logs em JSON com ALGODAO_LOG_LEVEL=INFO)
+logging.basicConfig(level=os.environ.get("ALGODAO_LOG_LEVEL", "WARNING"))
+run_records = start_run()
+
 # Título e introdução
 st.title("Análise de Dados de Plantio e Colheita de Algodão no Brasil")
 st.markdown(
@@ -36,176 +62,273 @@ st.markdown(
     """
 )
 
-# Carregar dados
+# Carregar artefatos pré-calculados (tabelas, figuras e mapas)
 st.sidebar.header("Carregar Dados")
 try:
     cotton_data_path = os.path.join(DATA_DIR, "AlgodoSerieHist.xlsx")
     weather_data_path = os.path.join(DATA_DIR, "weather_sum_all.csv")
 
-    cotton_data = load_cotton_data(cotton_data_path)
-    weather_data = load_weather_data(weather_data_path)
+    snapshot_dir = current_snapshot(
+        cotton_data_path,
+        weather_data_path,
+        snapshot_key(cotton_data_path, weather_data_path, GEOJSON_PATH),
+    )
+    manifest = read_manifest(snapshot_dir)
 
     st.sidebar.success("Dados carregados com sucesso!")
 except Exception as e:
     st.sidebar.error(f"Erro ao carregar dados: {e}")
     st.stop()
 
+# Snapshot em uso
+with st.sidebar.expander("Snapshot de artefatos"):
+    st.write(f"Versão: {os.path.basename(snapshot_dir)}")
+    st.write(f"Gerado em: {manifest['created']}")
+    st.write(f"Arquivos: {len(manifest['files'])}")
+
+# Métrica da CONAB: a sessão guarda só a escolha; os artefatos são compartilhados
+metric = st.sidebar.selectbox(
+    "Métrica:", manifest["metrics"], format_func=METRIC_NAMES.get
+)
+metric_name = METRIC_NAMES[metric]
+
+# Painel de tempos por etapa, preenchido ao final da execução
+show_timings = st.sidebar.checkbox("Mostrar tempos de execução")
+timing_panel = st.sidebar.empty()
+
 # Sidebar para exibir dados brutos
 if st.sidebar.checkbox("Exibir dados brutos de algodão"):
     st.subheader("Dados Brutos de Algodão")
-    st.write(cotton_data.head(20))
+    st.write(read_table(snapshot_dir, artifact_name("raw_cotton", metric)))
 
 if st.sidebar.checkbox("Exibir dados meteorológicos brutos"):
     st.subheader("Dados Brutos Meteorológicos")
-    st.write(weather_data.head(20))
-
-# Tabs principais
-tabs = st.tabs(
-    [
-        "Tendências Sazonais",
-        "Melhores Regiões",
-        "Influência Climática",
-        "Tendências Históricas",
-        "Correlação de Variáveis",
-        "Previsão de Area Plantada",
-        "Conclusões",
-    ]
-)
+    st.write(read_table(snapshot_dir, "raw_weather"))
+
 
 # Aba: Tendências Sazonais
-with tabs[0]:
+def render_seasonal_trends():
     st.header("Tendências Sazonais")
     try:
-        seasonal_trends = analyze_seasonal_trends(cotton_data, weather_data)
+        seasonal_trends = read_table(snapshot_dir, "seasonal_trends")
         st.subheader("Gráfico")
-        plot_seasonal_trends(seasonal_trends)
+        show_figure("seasonal_trends")
         st.subheader("Dados de Tendências Sazonais")
         st.write(seasonal_trends)
     except Exception as e:
         st.error(f"Erro ao analisar tendências sazonais: {e}")
 
+
 # Aba: Melhores Regiões
-with tabs[1]:
+def render_regional_potential():
     st.header("Melhores Regiões para Plantio")
     try:
-        regional_potential = analyze_regional_potential(cotton_data, weather_data)
-        st.subheader("Mapa")
+        regional_potential = read_table(
+            snapshot_dir, artifact_name("regional_potential", metric)
+        )
+        st.subheader(f"Mapa: {metric_name}")
 
-        # Adicione o caminho correto para o shapefile
-        shapefile_path = "./data/geo/br_states.json"
-        plot_regional_map(regional_potential, shapefile_path)
+        map_name = artifact_name("regional_map", metric)
+        if map_name in manifest["errors"]:
+            st.error(
+                f"Erro ao plotar o mapa interativo: {manifest['errors'][map_name]}"
+            )
+        else:
+            components.html(read_map(snapshot_dir, map_name), width=800, height=600)
 
         st.subheader("Detalhes por Região")
         st.write(regional_potential)
     except Exception as e:
         st.error(f"Erro ao analisar regiões: {e}")
 
+
+def select_season(key):
+    """
+    Seletor de estação do ano (ou ano inteiro), entre os períodos do snapshot.
+    """
+    return st.selectbox("Período:", manifest["seasons"], key=f"season_{key}")
+
+
 # Aba: Influência Climática
-with tabs[2]:
+def render_climatic_influences():
     st.header("Influência Climática")
     try:
-        climatic_influences = analyze_climatic_influences(cotton_data, weather_data)
+        name = artifact_name("climatic_influences", select_season("climatic"))
+        climatic_influences = read_table(snapshot_dir, name)["correlacao"]
         st.subheader("Gráfico")
-        plot_climatic_influence(climatic_influences)
+        show_figure(name)
         st.subheader("Detalhes da Influência Climática")
         st.write(climatic_influences)
+
+        st.subheader("Clima das Safras Anteriores")
+        st.write(
+            "Correlação da área plantada com médias sazonais, janelas de safra "
+            "(primavera e verão) e com o clima de um e dois anos antes (lag1, lag2)."
+        )
+        lagged_influences = read_table(snapshot_dir, "lagged_influences")
+        max_p_value = st.slider("p-valor máximo:", 0.0, 1.0, 0.1, 0.01)
+        st.write(lagged_influences[lagged_influences["p_valor"] <= max_p_value])
     except Exception as e:
         st.error(f"Erro ao analisar influências climáticas: {e}")
 
+
 # Aba: Tendências Históricas
-with tabs[3]:
+def render_historical_trends():
     st.header("Tendências Históricas")
     try:
-        historical_trends = analyze_historical_trends(cotton_data)
-        st.subheader("Gráfico de Tendências Históricas")
-        plot_historical_trends(historical_trends)
+        name = artifact_name("historical_trends", metric)
+        historical_trends = read_table(snapshot_dir, name)
+        st.subheader(f"Gráfico de Tendências Históricas: {metric_name}")
+        show_figure(name)
         st.subheader("Dados Históricos")
         st.write(historical_trends)
     except Exception as e:
         st.error(f"Erro ao analisar tendências históricas: {e}")
 
+
 # Aba: Correlação de Variáveis
-with tabs[4]:
+def render_correlations():
     st.header("Mapa de Correlação")
     try:
         st.subheader("Mapa de Calor")
-        plot_correlation_heatmap(cotton_data, weather_data)
+        season = select_season("correlations")
+        show_figure(artifact_name("correlation_heatmap", season))
     except Exception as e:
         st.error(f"Erro ao gerar mapa de correlação: {e}")
 
 
+def render_backtest_leaderboard(years_to_consider, model):
+    with st.expander("Desempenho histórico dos modelos (backtesting)"):
+        if "backtest_leaderboard" in manifest["errors"]:
+            st.info(
+                "Ranking não disponível neste snapshot: "
+                f"{manifest['errors']['backtest_leaderboard']}"
+            )
+            return
+        leaderboard = read_table(snapshot_dir, "backtest_leaderboard")
+
+        region = st.selectbox("Região/UF:", sorted(leaderboard["Região/UF"].unique()))
+        horizon = st.slider(
+            "Horizonte (anos à frente):",
+            min_value=int(leaderboard["horizon"].min()),
+            max_value=int(leaderboard["horizon"].max()),
+        )
+        selected = leaderboard[
+            (leaderboard["Região/UF"] == region) & (leaderboard["horizon"] == horizon)
+        ]
+        st.write("Melhores combinações (menor MAE):", selected.head(10))
+
+        current = selected[
+            (selected["window"] == years_to_consider) & (selected["model"] == model)
+        ]
+        if not current.empty:
+            row = current.iloc[0]
+            st.write(
+                f"Configuração atual ({years_to_consider} anos, {model}): "
+                f"MAE {row['MAE']:,.1f}, MAPE {row['MAPE']:.1f}%"
+            )
+
+
 # Aba: Previsão
-with tabs[5]:
-    st.header("Previsão da Área Plantada")
+def render_forecast():
+    st.header(f"Previsão: {metric_name}")
 
     try:
-        # Entrada para selecionar o número de anos a considerar
+        historical_trends = read_table(
+            snapshot_dir, artifact_name("historical_trends", metric)
+        ).dropna(subset=["Ano", metric])
+        years = sorted(historical_trends["Ano"].unique())
+
+        # Todas as janelas (de 2 anos até a série inteira) estão no snapshot
+        max_window = max(len(years), 2)
         years_to_consider = st.number_input(
             "Anos para considerar na previsão:",
             min_value=2,
-            max_value=len(cotton_data["Ano"].unique()),
-            value=10,
+            max_value=max_window,
+            value=min(manifest["default_window"], max_window),
             step=1,
         )
-        # Análise de tendências históricas
+        model = st.selectbox(
+            "Modelo de previsão:",
+            manifest["models"],
+            index=manifest["models"].index(DEFAULT_MODEL),
+        )
 
-        if historical_trends.empty:
-            st.error("Dados históricos de área plantada não estão disponíveis.")
+        filtered_historical_trends = historical_trends[
+            historical_trends["Ano"].isin(years[-years_to_consider:])
+        ]
+        if filtered_historical_trends.empty:
+            st.error(f"Dados históricos de {metric_name} não estão disponíveis.")
         else:
-            # Limpar e validar dados históricos
-            historical_trends["Ano"] = pd.to_numeric(
-                historical_trends["Ano"], errors="coerce"
-            )
-            historical_trends["Area_Planted"] = pd.to_numeric(
-                historical_trends["Area_Planted"], errors="coerce"
-            )
-            historical_trends = historical_trends.dropna(subset=["Ano", "Area_Planted"])
-
-            # Filtrar os anos recentes
-            recent_years = sorted(historical_trends["Ano"].unique())[
-                -years_to_consider:
-            ]
-            filtered_historical_trends = historical_trends[
-                historical_trends["Ano"].isin(recent_years)
-            ]
             st.write("Dados Históricos Filtrados:", filtered_historical_trends)
 
-            st.subheader("Previsão de Área Plantada")
+            st.subheader(f"Previsão de {metric_name}")
 
+            forecast_name = artifact_name("forecast", metric)
             if len(filtered_historical_trends) < 2:
                 st.warning(
                     "Dados insuficientes para previsão. É necessário pelo menos dois anos de dados históricos."
                 )
+            elif forecast_name in manifest["errors"]:
+                st.error(
+                    f"Erro ao prever {metric_name}: {manifest['errors'][forecast_name]}"
+                )
             else:
-                try:
-                    # Previsão com dados filtrados
-                    predicted_areas = predict_planted_area(
-                        filtered_historical_trends, years_to_consider=years_to_consider
-                    )
+                forecasts = read_table(snapshot_dir, forecast_name)
+                selected = (forecasts["window"] == years_to_consider) & (
+                    forecasts["model"] == model
+                )
+                predicted_areas = (
+                    forecasts[selected]
+                    .drop(columns=["window", "model"])
+                    .reset_index(drop=True)
+                )
 
-                    if predicted_areas.empty:
-                        st.warning(
-                            "Não foi possível gerar previsões para a área plantada."
+                if predicted_areas.empty:
+                    st.warning(f"Não foi possível gerar previsões para {metric_name}.")
+                else:
+                    st.write(f"Previsão de {metric_name}:")
+                    st.write(predicted_areas)
+
+                    # Gráfico com histórico e previsão, desenhado a partir da tabela
+                    st.image(
+                        render_png(
+                            "historical_prediction",
+                            filtered_historical_trends,
+                            predicted_areas,
+                            metric,
                         )
-                    else:
-                        st.write("Previsão de Área Plantada (ha):")
-                        st.write(predicted_areas)
+                    )
 
-                        # Gráfico com histórico e previsão
-                        plot_historical_trends_with_prediction(
-                            filtered_historical_trends, predicted_areas
-                        )
+                    st.success("Análise e previsão concluídas com sucesso!")
 
-                        st.success("Análise e previsão concluídas com sucesso!")
-                except RuntimeError as prediction_error:
-                    st.error(f"Erro ao prever área plantada: {prediction_error}")
+                # O backtesting avalia apenas a área plantada
+                if metric == DEFAULT_METRIC:
+                    render_backtest_leaderboard(years_to_consider, model)
+
+                if st.checkbox("Mostrar previsão por Região/UF"):
+                    state_predictions = select_state_forecast(
+                        read_table(
+                            snapshot_dir, artifact_name("state_forecast", metric)
+                        ),
+                        years_to_consider,
+                        model,
+                        metric,
+                    )
+                    st.write(
+                        state_predictions.pivot(
+                            index="Região/UF",
+                            columns="Ano",
+                            values=f"{metric}_Predicted",
+                        )
+                    )
 
     except Exception as e:
         st.error(f"Erro ao analisar tendências históricas com previsão: {e}")
 
 
 # Aba: Conclusões
-with tabs[6]:
+def render_conclusions():
     st.header("Conclusões e Insights")
     st.markdown(
         """
@@ -258,3 +381,39 @@ with tabs[6]:
           - Promover programas de capacitação técnica para agricultores.
         """
     )
+
+
+# Seções do painel: título da aba -> função que a renderiza
+SECTIONS = {
+    "Tendências Sazonais": render_seasonal_trends,
+    "Melhores Regiões": render_regional_potential,
+    "Influência Climática": render_climatic_influences,
+    "Tendências Históricas": render_historical_trends,
+    "Correlação de Variáveis": render_correlations,
+    "Previsão de Area Plantada": render_forecast,
+    "Conclusões": render_conclusions,
+}
+
+# Modo "lazy" (padrão): apenas a seção selecionada é calculada a cada execução.
+# Modo "tabs": todas as abas do st.tabs são calculadas, como antes.
+RENDER_MODE = os.environ.get("ALGODAO_RENDER_MODE", "lazy")
+
+if RENDER_MODE == "tabs":
+    for tab, render in zip(st.tabs(list(SECTIONS)), SECTIONS.values()):
+        with tab:
+            render()
+else:
+    selected_section = st.radio(
+        "Seção", list(SECTIONS), horizontal=True, label_visibility="collapsed"
+    )
+    SECTIONS[selected_section]()
+
+if show_timings:
+    with timing_panel.container():
+        st.subheader("Tempos de execução")
+        timings = summarize(run_records)
+        st.write(
+            f"{len(timings)} etapas nesta execução. Etapas aninhadas também "
+            "aparecem dentro do tempo da etapa que as chamou."
+        )
+        st.dataframe(timings, hide_index=True)
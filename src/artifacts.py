@@ -0,0 +1,377 @@
+"""
+Repositório de artefatos pré-calculados do painel, em snapshots versionados.
+
+Cada snapshot é uma pasta em ``data/processed/artifacts/<chave>`` com as
+tabelas de resultado de cada aba (Parquet), as figuras renderizadas (PNG para
+o painel e SVG para relatórios) e o HTML dos mapas coropléticos, além de um
+``manifest.json`` com as opções disponíveis (métricas, períodos e modelos de
+previsão). A chave vem do hash dos arquivos brutos (CONAB, INMET, índice de
+estações e GeoJSON), das fontes do cubo climático (incluindo os anos anexados)
+e da versão do formato: quando algum deles muda, a chave muda e o snapshot é
+reconstruído; os snapshots antigos são removidos.
+
+As previsões de cada métrica ficam em uma única tabela com todas as janelas
+(de 2 anos até a série inteira) e modelos, com os intervalos de previsão; o
+painel filtra a configuração escolhida e desenha o gráfico a partir dela.
+
+O painel apenas lê os artefatos; a construção roda offline (por exemplo, na
+inicialização do container)::
+
+    python src/artifacts.py [--force]
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import re
+import shutil
+import unicodedata
+
+import pandas as pd
+
+from analysis import (
+    analyze_climatic_influences,
+    analyze_historical_trends,
+    analyze_lagged_influences,
+    analyze_regional_potential,
+    analyze_seasonal_trends,
+    analyze_variable_correlations,
+    predict_all_windows,
+)
+from backtest import run_backtest
+from climate_cube import climate_cube_sources
+from data_cache import DATA_DIR, source_fingerprint
+from data_cleaning import DEFAULT_METRIC, METRIC_NAMES
+from figures import (
+    climatic_influence_figure,
+    correlation_heatmap_figure,
+    historical_trends_figure,
+    seasonal_trends_figure,
+)
+from forecasting import MODELS, forecast_by_state
+from geo import GEOJSON_PATH, choropleth_html
+from instrumentation import instrument
+from shared_data import load_shared_datasets
+from stations import STATION_INDEX_PATH
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+ARTIFACTS_DIR = os.path.join(BASE_DIR, "data", "processed", "artifacts")
+MANIFEST_NAME = "manifest.json"
+SNAPSHOT_KEY_PATTERN = re.compile(r"[0-9a-f]{16}")
+
+# Versão do formato dos snapshots; mudar a versão invalida os existentes
+ARTIFACTS_VERSION = 3
+
+# Opções da aba de previsão (todas as janelas de 2 anos até a série inteira)
+DEFAULT_WINDOW = 10
+FORECAST_UNTIL = 2030
+ALL_YEAR = "Ano inteiro"
+FIGURE_FORMATS = ("png", "svg")
+PREVIEW_ROWS = 20
+
+
+def artifact_name(*parts) -> str:
+    """
+    Nome de arquivo de um artefato: partes sem acentos, separadas por '-'.
+    """
+    names = []
+    for part in parts:
+        text = unicodedata.normalize("NFKD", str(part))
+        text = text.encode("ascii", "ignore").decode().lower().replace(" ", "_")
+        names.append(text)
+    return "-".join(names)
+
+
+def snapshot_key(
+    cotton_path: str, weather_path: str, geojson_path: str = GEOJSON_PATH
+) -> str:
+    """
+    Chave do snapshot: hash dos arquivos brutos, das fontes do cubo climático
+    (que inclui os anos anexados) e da versão do formato.
+    """
+    digest = hashlib.sha256(f"artifacts:{ARTIFACTS_VERSION}".encode())
+    for path in (cotton_path, weather_path, STATION_INDEX_PATH, geojson_path):
+        source = source_fingerprint(path) if os.path.exists(path) else "ausente"
+        digest.update(f":{source}".encode())
+    for source in climate_cube_sources(weather_path):
+        digest.update(f":cubo:{source}".encode())
+    options = (FORECAST_UNTIL, sorted(MODELS))
+    digest.update(repr(options).encode())
+    return digest.hexdigest()[:16]
+
+
+class SnapshotWriter:
+    """
+    Grava tabelas, figuras e mapas na pasta de um snapshot em construção.
+    """
+
+    def __init__(self, snapshot_dir: str):
+        self.snapshot_dir = snapshot_dir
+        self.files = []
+        for folder in ("tables", "figures", "maps"):
+            os.makedirs(os.path.join(snapshot_dir, folder), exist_ok=True)
+
+    def _path(self, folder: str, filename: str) -> str:
+        self.files.append(f"{folder}/{filename}")
+        return os.path.join(self.snapshot_dir, folder, filename)
+
+    def table(self, name: str, table) -> None:
+        if isinstance(table, pd.Series):
+            table = table.to_frame()
+        # Índices com significado (ex.: nomes das variáveis) viram colunas
+        keep_index = not isinstance(table.index, pd.RangeIndex)
+        table.to_parquet(self._path("tables", f"{name}.parquet"), index=keep_index)
+
+    def figure(self, name: str, fig) -> None:
+        try:
+            for fmt in FIGURE_FORMATS:
+                fig.savefig(self._path("figures", f"{name}.{fmt}"), dpi=100)
+        finally:
+            fig.clear()
+
+    def map(self, name: str, html: str) -> None:
+        with open(self._path("maps", f"{name}.html"), "w", encoding="utf-8") as f:
+            f.write(html)
+
+
+def _write_forecasts(writer, metric_data, metric, errors, workers=None) -> None:
+    # Todas as janelas e modelos em uma tabela por métrica (previsão anual com
+    # intervalos e previsão por Região/UF); o painel apenas filtra a escolhida
+    name = artifact_name("forecast", metric)
+    try:
+        writer.table(
+            name,
+            predict_all_windows(
+                metric_data, forecast_until=FORECAST_UNTIL, metric=metric
+            ),
+        )
+        writer.table(
+            artifact_name("state_forecast", metric),
+            forecast_by_state(
+                metric_data,
+                forecast_until=FORECAST_UNTIL,
+                value_col=metric,
+                workers=workers,
+            ),
+        )
+    except (RuntimeError, ValueError) as e:
+        errors[name] = str(e)
+
+
+@instrument
+def build_snapshot(
+    cotton_path: str,
+    weather_path: str,
+    snapshot_dir: str,
+    geojson_path: str = GEOJSON_PATH,
+    workers: int = None,
+) -> dict:
+    """
+    Calcula as tabelas, figuras e mapas de todas as abas e grava o snapshot em
+    ``snapshot_dir``; retorna o manifesto (gravado por último).
+    """
+    datasets = load_shared_datasets(cotton_path, weather_path)
+    cotton_data = datasets["metrics"][DEFAULT_METRIC]
+    weather_data = datasets["weather"]
+    climate_cube = datasets["climate_cube"]
+    seasons = sorted(climate_cube["Estacao"].dropna().unique())
+
+    writer = SnapshotWriter(snapshot_dir)
+    errors = {}
+
+    # Tendências sazonais e clima das safras anteriores
+    seasonal_trends = analyze_seasonal_trends(cotton_data, climate_cube)
+    writer.table("seasonal_trends", seasonal_trends)
+    writer.figure("seasonal_trends", seasonal_trends_figure(seasonal_trends))
+    writer.table(
+        "lagged_influences", analyze_lagged_influences(cotton_data, climate_cube)
+    )
+    writer.table("raw_weather", weather_data.head(PREVIEW_ROWS))
+
+    # Influência climática e correlações, no ano inteiro e por estação
+    for season in [ALL_YEAR] + seasons:
+        selected = None if season == ALL_YEAR else season
+        influences = analyze_climatic_influences(
+            cotton_data, climate_cube, season=selected
+        )
+        name = artifact_name("climatic_influences", season)
+        writer.table(name, influences.to_frame("correlacao"))
+        writer.figure(name, climatic_influence_figure(influences))
+
+        corr_matrix = analyze_variable_correlations(
+            cotton_data, climate_cube, season=selected
+        )
+        name = artifact_name("correlation_heatmap", season)
+        writer.table(name, corr_matrix)
+        writer.figure(name, correlation_heatmap_figure(corr_matrix))
+
+    # Abas por métrica: potencial regional, histórico e previsões
+    for metric in METRIC_NAMES:
+        metric_data = datasets["metrics"][metric]
+        writer.table(
+            artifact_name("raw_cotton", metric), metric_data.head(PREVIEW_ROWS)
+        )
+
+        regional_potential = analyze_regional_potential(
+            metric_data, weather_data, metric=metric
+        )
+        writer.table(artifact_name("regional_potential", metric), regional_potential)
+        try:
+            html = choropleth_html(regional_potential, geojson_path, metric=metric)
+            writer.map(artifact_name("regional_map", metric), html)
+        except RuntimeError as e:
+            errors[artifact_name("regional_map", metric)] = str(e)
+
+        historical_trends = analyze_historical_trends(metric_data, metric)
+        name = artifact_name("historical_trends", metric)
+        writer.table(name, historical_trends)
+        writer.figure(name, historical_trends_figure(historical_trends, metric))
+
+        _write_forecasts(writer, metric_data, metric, errors, workers=workers)
+
+    # Ranking do backtesting da área plantada, com a mesma série do snapshot
+    try:
+        leaderboard = run_backtest(datasets["metrics"][DEFAULT_METRIC], workers=workers)
+        writer.table("backtest_leaderboard", leaderboard)
+    except RuntimeError as e:
+        errors["backtest_leaderboard"] = str(e)
+
+    manifest = {
+        "version": ARTIFACTS_VERSION,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "metrics": list(METRIC_NAMES),
+        "seasons": [ALL_YEAR] + seasons,
+        "default_window": DEFAULT_WINDOW,
+        "models": list(MODELS),
+        "forecast_until": FORECAST_UNTIL,
+        "files": writer.files,
+        "errors": errors,
+    }
+    with open(os.path.join(snapshot_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return manifest
+
+
+def is_snapshot(path: str) -> bool:
+    """
+    Indica se ``path`` é a pasta de um snapshot: nome com a chave hexadecimal de
+    16 caracteres e um ``manifest.json``.
+    """
+    return bool(SNAPSHOT_KEY_PATTERN.fullmatch(os.path.basename(path))) and (
+        os.path.isfile(os.path.join(path, MANIFEST_NAME))
+    )
+
+
+def _remove_stale(artifacts_dir: str, keep: str) -> None:
+    # Apenas snapshots são removidos; outras pastas e arquivos ficam intactos
+    # (assim como os ".tmp", snapshots em construção por outro processo)
+    for entry in os.listdir(artifacts_dir):
+        path = os.path.join(artifacts_dir, entry)
+        if entry != keep and is_snapshot(path):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+@instrument
+def ensure_snapshot(
+    cotton_path: str,
+    weather_path: str,
+    artifacts_dir: str = ARTIFACTS_DIR,
+    geojson_path: str = GEOJSON_PATH,
+    force: bool = False,
+    workers: int = None,
+) -> str:
+    """
+    Retorna a pasta do snapshot dos arquivos brutos atuais, construindo-o (em
+    uma pasta temporária renomeada ao final) quando não existir.
+    """
+    try:
+        key = snapshot_key(cotton_path, weather_path, geojson_path)
+        snapshot_dir = os.path.join(artifacts_dir, key)
+        if os.path.exists(os.path.join(snapshot_dir, MANIFEST_NAME)) and not force:
+            return snapshot_dir
+
+        tmp_dir = f"{snapshot_dir}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        try:
+            build_snapshot(cotton_path, weather_path, tmp_dir, geojson_path, workers)
+            if os.path.exists(snapshot_dir):
+                shutil.rmtree(snapshot_dir)
+            os.replace(tmp_dir, snapshot_dir)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        _remove_stale(artifacts_dir, keep=key)
+        return snapshot_dir
+    except Exception as e:
+        raise RuntimeError(f"Erro ao construir snapshot de artefatos: {e}")
+
+
+def read_manifest(snapshot_dir: str) -> dict:
+    """
+    Lê o manifesto de um snapshot.
+    """
+    with open(os.path.join(snapshot_dir, MANIFEST_NAME), encoding="utf-8") as f:
+        return json.load(f)
+
+
+@instrument
+def read_table(snapshot_dir: str, name: str) -> pd.DataFrame:
+    """
+    Lê uma tabela do snapshot.
+    """
+    return pd.read_parquet(os.path.join(snapshot_dir, "tables", f"{name}.parquet"))
+
+
+def figure_path(snapshot_dir: str, name: str, fmt: str = "png") -> str:
+    """
+    Caminho de uma figura renderizada do snapshot.
+    """
+    return os.path.join(snapshot_dir, "figures", f"{name}.{fmt}")
+
+
+def read_map(snapshot_dir: str, name: str) -> str:
+    """
+    Lê o HTML de um mapa do snapshot.
+    """
+    with open(
+        os.path.join(snapshot_dir, "maps", f"{name}.html"), encoding="utf-8"
+    ) as f:
+        return f.read()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Constrói o snapshot de artefatos pré-calculados do painel."
+    )
+    parser.add_argument(
+        "--cotton", default=os.path.join(DATA_DIR, "AlgodoSerieHist.xlsx")
+    )
+    parser.add_argument(
+        "--weather", default=os.path.join(DATA_DIR, "weather_sum_all.csv")
+    )
+    parser.add_argument("--output", default=ARTIFACTS_DIR)
+    parser.add_argument("--geojson", default=GEOJSON_PATH)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--force", action="store_true", help="Reconstrói mesmo se estiver atualizado"
+    )
+    args = parser.parse_args(argv)
+
+    snapshot_dir = ensure_snapshot(
+        args.cotton,
+        args.weather,
+        args.output,
+        args.geojson,
+        force=args.force,
+        workers=args.workers,
+    )
+    manifest = read_manifest(snapshot_dir)
+    print(
+        f"[artefatos] {len(manifest['files'])} arquivos em {snapshot_dir} "
+        f"({len(manifest['errors'])} erros)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Backtesting com origem móvel das previsões de área plantada.
+
+Para cada série de Região/UF, cada ano de origem (a partir de
+``min_train`` anos de histórico) e cada modelo, todas as janelas são
+ajustadas com os dados até a origem e comparadas com os anos seguintes. O
+resultado é um ranking (leaderboard) com MAE e MAPE por horizonte. O ranking
+exibido na aba de previsão do painel é gravado em cada snapshot de artefatos
+(``artifacts.py``), com a mesma série da CONAB do snapshot.
+
+Os erros de cada (série, modelo) ficam em cache em ``data/processed/backtest``;
+incluir um novo modelo calcula apenas as dobras que faltam.
+
+Uso (a partir da raiz do projeto)::
+
+    python src/backtest.py [--workers 4] [--models linear poly2 holt]
+"""
+
+import argparse
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_cache import DATA_DIR, cached_load
+from data_cleaning import DEFAULT_METRIC, load_conab_series, select_metric
+from forecasting import MODELS, forecast_array, parallel_map, state_series
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BACKTEST_DIR = os.path.join(BASE_DIR, "data", "processed", "backtest")
+FOLDS_DIR = os.path.join(BACKTEST_DIR, "folds")
+LEADERBOARD_PATH = os.path.join(BACKTEST_DIR, "leaderboard.parquet")
+
+DEFAULT_MAX_HORIZON = 5
+DEFAULT_MIN_TRAIN = 5
+# Janelas longas têm poucas origens; só entram no ranking com dobras suficientes
+DEFAULT_MIN_FOLDS = 10
+
+
+def rolling_origin_folds(
+    years,
+    values,
+    model: str,
+    max_horizon: int = DEFAULT_MAX_HORIZON,
+    min_train: int = DEFAULT_MIN_TRAIN,
+) -> pd.DataFrame:
+    """
+    Erros de previsão de um modelo em todas as origens e janelas de uma série.
+
+    Retorna as colunas ``origin`` (último ano de treino), ``window``,
+    ``horizon``, ``Ano``, ``actual`` e ``prediction``.
+    """
+    order = np.argsort(years)
+    years = np.asarray(years, dtype=float)[order]
+    values = np.asarray(values, dtype=float)[order]
+    actual_by_year = dict(zip(years.astype(int), values))
+    horizons = np.arange(1, max_horizon + 1)
+
+    columns = {name: [] for name in ["origin", "window", "horizon", "Ano"]}
+    columns.update(actual=[], prediction=[])
+    for n_train in range(max(min_train, 2), len(years)):
+        windows = np.arange(2, n_train + 1)
+        predictions = forecast_array(
+            years[:n_train], values[:n_train], horizons, windows, [model]
+        )[:, 0, :]
+
+        # Só entram os horizontes cujo ano existe na série observada
+        origin = int(years[n_train - 1])
+        targets = origin + horizons
+        observed = np.array([year in actual_by_year for year in targets])
+        window_grid, horizon_grid = np.meshgrid(
+            windows, horizons[observed], indexing="ij"
+        )
+        columns["origin"].append(np.full(window_grid.size, origin))
+        columns["window"].append(window_grid.ravel())
+        columns["horizon"].append(horizon_grid.ravel())
+        columns["Ano"].append(origin + horizon_grid.ravel())
+        columns["actual"].append(
+            np.array([actual_by_year[year] for year in origin + horizon_grid.ravel()])
+        )
+        columns["prediction"].append(predictions[:, observed].ravel())
+
+    return pd.DataFrame(
+        {
+            name: np.concatenate(parts) if parts else np.array([])
+            for name, parts in columns.items()
+        }
+    )
+
+
+def _fold_key(years, values, model, max_horizon, min_train) -> str:
+    digest = hashlib.sha256()
+    digest.update(np.asarray(years, dtype=np.int64).tobytes())
+    digest.update(np.asarray(values, dtype=np.float64).tobytes())
+    # Parâmetros do modelo também invalidam o cache
+    digest.update(f"{model}:{MODELS[model]}:{max_horizon}:{min_train}".encode())
+    return digest.hexdigest()[:16]
+
+
+def _evaluate_series(task) -> pd.DataFrame:
+    """
+    Dobras de todos os modelos de uma série, reaproveitando as do cache.
+    """
+    key, years, values, models, max_horizon, min_train, folds_dir = task
+    results = []
+    for model in models:
+        fold_key = _fold_key(years, values, model, max_horizon, min_train)
+        path = os.path.join(folds_dir, f"{fold_key}-{model}.parquet")
+        if os.path.exists(path):
+            folds = pd.read_parquet(path)
+        else:
+            folds = rolling_origin_folds(years, values, model, max_horizon, min_train)
+            # Séries idênticas podem ser avaliadas ao mesmo tempo em outro processo
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            folds.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        results.append(folds.assign(model=model))
+    return pd.concat(results, ignore_index=True).assign(**{"Região/UF": key})
+
+
+def summarize_folds(
+    folds: pd.DataFrame, min_folds: int = DEFAULT_MIN_FOLDS
+) -> pd.DataFrame:
+    """
+    Agrega as dobras em MAE e MAPE por (Região/UF, janela, modelo, horizonte).
+
+    Anos com área real igual a zero entram no MAE, mas não no MAPE. A coluna
+    ``rank`` ordena pelo MAE as combinações com pelo menos ``min_folds`` dobras.
+    """
+    abs_error = (folds["prediction"] - folds["actual"]).abs()
+    actual = folds["actual"].abs()
+    errors = folds.assign(
+        abs_error=abs_error,
+        pct_error=(abs_error / actual.where(actual > 0)) * 100,
+    )
+    leaderboard = (
+        errors.groupby(["Região/UF", "window", "model", "horizon"], observed=True)
+        .agg(
+            MAE=("abs_error", "mean"),
+            MAPE=("pct_error", "mean"),
+            n_folds=("abs_error", "size"),
+        )
+        .reset_index()
+    )
+    eligible = leaderboard["MAE"].where(leaderboard["n_folds"] >= min_folds)
+    leaderboard["rank"] = (
+        eligible.groupby([leaderboard["Região/UF"], leaderboard["horizon"]])
+        .rank(method="min")
+        .astype("Int64")
+    )
+    return leaderboard.sort_values(
+        ["Região/UF", "horizon", "rank", "window", "model"], kind="mergesort"
+    ).reset_index(drop=True)
+
+
+def run_backtest(
+    cotton_data: pd.DataFrame,
+    models=None,
+    max_horizon: int = DEFAULT_MAX_HORIZON,
+    min_train: int = DEFAULT_MIN_TRAIN,
+    value_col: str = "Area_Plantada",
+    workers: int = None,
+    folds_dir: str = FOLDS_DIR,
+) -> pd.DataFrame:
+    """
+    Executa o backtesting de todas as séries de Região/UF e retorna o ranking.
+    """
+    try:
+        models = list(MODELS) if models is None else list(models)
+        os.makedirs(folds_dir, exist_ok=True)
+
+        tasks = [
+            (key, years, values, models, max_horizon, min_train, folds_dir)
+            for key, years, values in state_series(cotton_data, value_col)
+        ]
+
+        folds = pd.concat(
+            parallel_map(_evaluate_series, tasks, workers), ignore_index=True
+        )
+        return summarize_folds(folds)
+    except Exception as e:
+        raise RuntimeError(f"Erro ao executar backtesting: {e}")
+
+
+def load_leaderboard(path: str = LEADERBOARD_PATH):
+    """
+    Lê o ranking gravado pelo backtesting, ou ``None`` se ainda não existir.
+    """
+    if not os.path.exists(path):
+        return None
+    return pd.read_parquet(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Backtesting com origem móvel das previsões de área plantada."
+    )
+    parser.add_argument(
+        "--cotton", default=os.path.join(DATA_DIR, "AlgodoSerieHist.xlsx")
+    )
+    parser.add_argument("--models", nargs="+", choices=list(MODELS))
+    parser.add_argument("--max-horizon", type=int, default=DEFAULT_MAX_HORIZON)
+    parser.add_argument("--min-train", type=int, default=DEFAULT_MIN_TRAIN)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default=LEADERBOARD_PATH)
+    args = parser.parse_args(argv)
+
+    # Mesma série do painel: área plantada da tabela longa da CONAB
+    cotton_series = cached_load(load_conab_series, args.cotton, name="conab")
+    cotton_data = select_metric(cotton_series, DEFAULT_METRIC)
+    leaderboard = run_backtest(
+        cotton_data,
+        models=args.models,
+        max_horizon=args.max_horizon,
+        min_train=args.min_train,
+        workers=args.workers,
+    )
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    leaderboard.to_parquet(args.output, index=False)
+    print(f"[backtest] {len(leaderboard)} linhas no ranking em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
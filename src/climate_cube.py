@@ -0,0 +1,239 @@
+"""
+Cubo climático pré-agregado por (Ano, Estacao, Região/UF).
+
+Para cada variável climática o cubo guarda soma, contagem, mínimo, máximo e
+média. Soma e contagem permitem reagregar o cubo em qualquer subconjunto das
+chaves sem voltar às linhas brutas, e também combinar cubos de arquivos
+diferentes (anexação incremental de um novo ano de dados do INMET).
+
+Uso pela linha de comando::
+
+    python src/climate_cube.py build [weather.csv]
+    python src/climate_cube.py append novo_ano.csv
+"""
+
+import json
+import os
+import sys
+
+import pandas as pd
+
+from data_cache import cached_load, source_fingerprint
+from data_cleaning import WEATHER_MEASURE_PREFIXES, add_region_column, load_weather_data
+from instrumentation import instrument
+from stations import STATION_INDEX_PATH
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_WEATHER_PATH = os.path.join(BASE_DIR, "data", "raw", "weather_sum_all.csv")
+CUBE_PATH = os.path.join(BASE_DIR, "data", "processed", "climate_cube.parquet")
+
+CUBE_KEYS = ["Ano", "Estacao", "Região/UF"]
+CUBE_STATS = ["sum", "count", "min", "max"]
+
+# Chave das estações sem UF no índice: ficam no cubo para as médias por ano e
+# estação do ano, mas não entram nas junções por Região/UF
+MISSING_UF = "SEM UF"
+
+# Versão do formato do cubo; faz parte da chave das fontes no manifesto
+CUBE_SCHEMA_VERSION = 2
+
+
+def cube_variables(cube: pd.DataFrame) -> list:
+    """
+    Lista as variáveis climáticas presentes no cubo.
+    """
+    return [col[: -len("_count")] for col in cube.columns if col.endswith("_count")]
+
+
+def _fill_missing_uf(weather_data: pd.DataFrame) -> pd.DataFrame:
+    # groupby descarta chaves categóricas nulas mesmo com dropna=False (pandas
+    # 1.5), então as estações sem UF recebem uma categoria explícita
+    regions = weather_data["Região/UF"]
+    if not regions.isna().any():
+        return weather_data
+    if regions.dtype == "category":
+        if MISSING_UF not in regions.cat.categories:
+            regions = regions.cat.add_categories(MISSING_UF)
+    else:
+        regions = regions.astype("object")
+    return weather_data.assign(**{"Região/UF": regions.fillna(MISSING_UF)})
+
+
+def state_cube(cube: pd.DataFrame) -> pd.DataFrame:
+    """
+    Linhas do cubo com Região/UF mapeada, para as junções por Região/UF.
+    """
+    return cube[cube["Região/UF"] != MISSING_UF]
+
+
+def _finalize(cube: pd.DataFrame, variables: list) -> pd.DataFrame:
+    # O cubo é pequeno: Ano volta a int64, como nos dados de algodão
+    cube["Ano"] = cube["Ano"].astype("int64")
+    for var in variables:
+        cube[f"{var}_count"] = cube[f"{var}_count"].astype("int64")
+        cube[f"{var}_mean"] = (cube[f"{var}_sum"] / cube[f"{var}_count"]).astype(
+            "float32"
+        )
+    return cube.sort_values(CUBE_KEYS, ignore_index=True)
+
+
+@instrument
+def build_climate_cube(weather_data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Agrega os dados climáticos em média, mínimo, máximo e contagem por
+    (Ano, Estacao, Região/UF).
+    """
+    try:
+        weather_data = _fill_missing_uf(add_region_column(weather_data))
+        variables = [
+            col
+            for col in weather_data.columns
+            if col.startswith(WEATHER_MEASURE_PREFIXES)
+        ]
+
+        # Estações sem Região/UF mapeada continuam no cubo (chave MISSING_UF),
+        # para que as agregações por ano e estação usem todas as medições
+        grouped = weather_data.groupby(CUBE_KEYS, observed=True)[variables]
+        cube = grouped.agg(CUBE_STATS)
+        cube.columns = [f"{var}_{stat}" for var, stat in cube.columns]
+        cube = cube.reset_index()
+
+        return _finalize(cube, variables)
+    except Exception as e:
+        raise RuntimeError(f"Erro ao construir cubo climático: {e}")
+
+
+def append_climate_cube(cube: pd.DataFrame, new_weather: pd.DataFrame) -> pd.DataFrame:
+    """
+    Incorpora novas medições ao cubo, agregando apenas as linhas novas.
+    """
+    try:
+        partial = build_climate_cube(new_weather)
+        variables = cube_variables(cube)
+        combined = pd.concat([cube, partial], ignore_index=True)
+
+        aggregations = {}
+        for var in variables:
+            aggregations[f"{var}_sum"] = "sum"
+            aggregations[f"{var}_count"] = "sum"
+            aggregations[f"{var}_min"] = "min"
+            aggregations[f"{var}_max"] = "max"
+        merged = combined.groupby(CUBE_KEYS, observed=True).agg(aggregations)
+
+        return _finalize(merged.reset_index(), variables)
+    except Exception as e:
+        raise RuntimeError(f"Erro ao anexar dados ao cubo climático: {e}")
+
+
+def cube_means(cube: pd.DataFrame, by: list) -> pd.DataFrame:
+    """
+    Reagrega o cubo pelas chaves ``by`` e retorna a média de cada variável,
+    ponderada pelas contagens (equivalente à média sobre as linhas brutas).
+    """
+    variables = cube_variables(cube)
+    columns = [f"{var}_{stat}" for var in variables for stat in ("sum", "count")]
+    totals = cube.groupby(by, observed=True)[columns].sum()
+
+    means = pd.DataFrame(index=totals.index)
+    for var in variables:
+        means[var] = (totals[f"{var}_sum"] / totals[f"{var}_count"]).astype("float32")
+    return means.reset_index()
+
+
+def _manifest_path(cube_path: str) -> str:
+    return os.path.splitext(cube_path)[0] + ".json"
+
+
+def save_climate_cube(cube: pd.DataFrame, sources: list, cube_path: str = CUBE_PATH):
+    """
+    Persiste o cubo em Parquet, junto com a lista de arquivos já incorporados.
+    """
+    os.makedirs(os.path.dirname(cube_path), exist_ok=True)
+    tmp_path = f"{cube_path}.tmp"
+    cube.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, cube_path)
+    with open(_manifest_path(cube_path), "w", encoding="utf-8") as f:
+        json.dump({"sources": sources}, f, indent=2)
+
+
+def _read_sources(cube_path: str) -> list:
+    path = _manifest_path(cube_path)
+    if not (os.path.exists(cube_path) and os.path.exists(path)):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["sources"]
+
+
+def _weather_digest(weather_path: str) -> str:
+    # O cubo depende também do índice de estações (UF de cada estação)
+    return "+".join(
+        [
+            source_fingerprint(weather_path),
+            source_fingerprint(STATION_INDEX_PATH),
+            f"v{CUBE_SCHEMA_VERSION}",
+        ]
+    )
+
+
+@instrument
+def load_climate_cube(
+    weather_path: str = DEFAULT_WEATHER_PATH, cube_path: str = CUBE_PATH
+) -> pd.DataFrame:
+    """
+    Carrega o cubo persistido, construindo-o a partir de ``weather_path`` se
+    ele ainda não existir ou se o arquivo climático tiver mudado.
+    """
+    try:
+        digest = _weather_digest(weather_path)
+        if digest in _read_sources(cube_path):
+            return pd.read_parquet(cube_path)
+
+        weather_data = cached_load(load_weather_data, weather_path, name="weather")
+        cube = build_climate_cube(weather_data)
+        save_climate_cube(cube, [digest], cube_path)
+        return cube
+    except Exception as e:
+        raise RuntimeError(f"Erro ao carregar cubo climático: {e}")
+
+
+def climate_cube_sources(
+    weather_path: str = DEFAULT_WEATHER_PATH, cube_path: str = CUBE_PATH
+) -> list:
+    """
+    Fontes já incorporadas ao cubo persistido de ``weather_path`` (o arquivo
+    base e os anexados), construindo o cubo antes se ele estiver desatualizado.
+    Serve de chave para os dados derivados do cubo.
+    """
+    if _weather_digest(weather_path) not in _read_sources(cube_path):
+        load_climate_cube(weather_path, cube_path)
+    return _read_sources(cube_path)
+
+
+def append_climate_file(new_path: str, cube_path: str = CUBE_PATH) -> pd.DataFrame:
+    """
+    Anexa ao cubo persistido um novo arquivo do INMET (por exemplo, um ano novo).
+    """
+    sources = _read_sources(cube_path)
+    if not sources:
+        raise RuntimeError("Cubo climático inexistente; execute 'build' primeiro.")
+
+    digest = source_fingerprint(new_path)
+    cube = pd.read_parquet(cube_path)
+    if digest in sources:
+        return cube
+
+    cube = append_climate_cube(cube, load_weather_data(new_path))
+    save_climate_cube(cube, sources + [digest], cube_path)
+    return cube
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "build"
+    if command == "build":
+        path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_WEATHER_PATH
+        result = load_climate_cube(path)
+    elif command == "append" and len(sys.argv) > 2:
+        result = append_climate_file(sys.argv[2])
+    else:
+        sys.exit("Uso: python src/climate_cube.py [build [arquivo] | append arquivo]")
+    print(f"[cubo] {len(result)} células em {CUBE_PATH}")
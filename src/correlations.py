@@ -0,0 +1,158 @@
+"""
+Correlações incrementais a partir de somas acumuladas.
+
+O ``CorrelationAccumulator`` guarda, para cada grupo (por exemplo, Região/UF e
+estação do ano) e cada par de variáveis, as somas n, Σx, Σx² e Σxy apenas das
+linhas em que as duas variáveis estão presentes (como em
+``DataFrame.corr()``, que descarta ausentes par a par). As somas são feitas
+sobre os valores deslocados por uma referência por variável (a média do
+primeiro bloco em que a variável aparece), o que evita o cancelamento de
+``Σxy - ΣxΣy/n`` quando a média é grande perto da dispersão. Com isso:
+
+- novos blocos de linhas podem ser somados com ``update`` à medida que chegam;
+- acumuladores de partições diferentes são combinados com ``merge``;
+- a matriz de correlação completa ou de qualquer subconjunto de grupos e
+  variáveis sai das somas em O(variáveis²), sem revisitar as linhas.
+"""
+
+import numpy as np
+import pandas as pd
+
+SUM_NAMES = ("n", "sx", "sxx", "sxy")
+
+
+class CorrelationAccumulator:
+    """
+    Somas de correlação por grupo, atualizáveis e combináveis.
+    """
+
+    def __init__(self, variables, by=()):
+        self.variables = list(variables)
+        self.by = list(by)
+        self.groups = {}
+        # Referência de cada variável, definida no primeiro bloco em que aparece
+        self.shift = np.full(len(self.variables), np.nan)
+
+    def _empty(self) -> dict:
+        size = len(self.variables)
+        return {name: np.zeros((size, size)) for name in SUM_NAMES}
+
+    def update(self, data: pd.DataFrame) -> "CorrelationAccumulator":
+        """
+        Soma as linhas de ``data`` (um bloco qualquer) aos grupos correspondentes.
+        """
+        values = data[self.variables].to_numpy(dtype=float)
+        present = ~np.isnan(values)
+        self._set_shift(np.where(present, values, 0.0), present)
+        filled = np.where(present, values - self.shift, 0.0)
+        mask = present.astype(float)
+
+        if self.by:
+            codes, keys = pd.MultiIndex.from_frame(data[self.by]).factorize()
+        else:
+            codes, keys = np.zeros(len(data), dtype=int), [()]
+
+        for code, key in enumerate(keys):
+            rows = codes == code
+            if not rows.any():
+                continue
+            x, m = filled[rows], mask[rows]
+            # Entrada [i, j] usa apenas as linhas com as variáveis i e j presentes
+            partial = {
+                "n": m.T @ m,
+                "sx": x.T @ m,
+                "sxx": (x * x).T @ m,
+                "sxy": x.T @ x,
+            }
+            sums = self.groups.setdefault(tuple(key), self._empty())
+            for name in SUM_NAMES:
+                sums[name] += partial[name]
+        return self
+
+    def merge(self, other: "CorrelationAccumulator") -> "CorrelationAccumulator":
+        """
+        Retorna um novo acumulador com as somas dos dois.
+        """
+        if other.variables != self.variables or other.by != self.by:
+            raise ValueError("Acumuladores com variáveis ou grupos diferentes.")
+        merged = CorrelationAccumulator(self.variables, self.by)
+        merged.shift = np.where(np.isnan(self.shift), other.shift, self.shift)
+        for source in (self, other):
+            # Variáveis sem referência na origem não têm somas a deslocar
+            delta = np.nan_to_num(merged.shift - source.shift)
+            for key, sums in source.groups.items():
+                target = merged.groups.setdefault(key, merged._empty())
+                shifted = _rebase(sums, delta)
+                for name in SUM_NAMES:
+                    target[name] += shifted[name]
+        return merged
+
+    def corr(self, variables=None, **filters) -> pd.DataFrame:
+        """
+        Matriz de correlação de Pearson dos grupos selecionados.
+
+        ``filters`` restringe os grupos pelas colunas de ``by`` (um valor ou uma
+        lista de valores), por exemplo ``corr(Estacao="Verão")``.
+        """
+        variables = self.variables if variables is None else list(variables)
+        totals = self._totals(variables, filters)
+
+        n, sx, sxx, sxy = (totals[name] for name in SUM_NAMES)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = sxy - sx * sx.T / n
+            var_x = sxx - sx**2 / n
+            r = cov / np.sqrt(var_x * var_x.T)
+        r[~np.isfinite(r)] = np.nan
+        r = np.clip(r, -1.0, 1.0)
+        return pd.DataFrame(r, index=variables, columns=variables)
+
+    def pair_counts(self, variables=None, **filters) -> pd.DataFrame:
+        """
+        Número de linhas com cada par de variáveis presente nos grupos
+        selecionados (mesmos filtros de ``corr``).
+        """
+        variables = self.variables if variables is None else list(variables)
+        counts = self._totals(variables, filters)["n"].astype(int)
+        return pd.DataFrame(counts, index=variables, columns=variables)
+
+    def _set_shift(self, filled: np.ndarray, present: np.ndarray) -> None:
+        # Só recebem referência as variáveis ainda sem somas acumuladas
+        counts = present.sum(axis=0)
+        new = np.isnan(self.shift) & (counts > 0)
+        self.shift[new] = filled.sum(axis=0)[new] / counts[new]
+
+    def _totals(self, variables: list, filters: dict) -> dict:
+        positions = [self.variables.index(var) for var in variables]
+        selection = np.ix_(positions, positions)
+
+        totals = {name: np.zeros((len(positions),) * 2) for name in SUM_NAMES}
+        for key, sums in self.groups.items():
+            if self._matches(key, filters):
+                for name in SUM_NAMES:
+                    totals[name] += sums[name][selection]
+        return totals
+
+    def _matches(self, key: tuple, filters: dict) -> bool:
+        for column, wanted in filters.items():
+            value = key[self.by.index(column)]
+            if isinstance(wanted, (list, tuple, set)):
+                if value not in wanted:
+                    return False
+            elif value != wanted:
+                return False
+        return True
+
+
+def _rebase(sums: dict, delta: np.ndarray) -> dict:
+    """
+    Desloca as somas de ``delta`` por variável: com x' = x - d, Σx' = Σx - d·n,
+    Σx'² = Σx² - 2d·Σx + d²·n e Σx'y' = Σxy - d_j·Σx - d_i·Σy + d_i·d_j·n.
+    """
+    n, sx, sxx, sxy = (sums[name] for name in SUM_NAMES)
+    d_i, d_j = delta[:, None], delta[None, :]
+    return {
+        "n": n,
+        "sx": sx - d_i * n,
+        "sxx": sxx - 2 * d_i * sx + d_i**2 * n,
+        "sxy": sxy - d_j * sx - d_i * sx.T + d_i * d_j * n,
+    }
@@ -0,0 +1,176 @@
+"""
+Cache em Parquet dos dados limpos de algodão e climáticos.
+
+Os DataFrames produzidos pelos carregadores são gravados em
+``data/processed/cache`` com uma chave derivada do hash do arquivo bruto.
+Quando o arquivo bruto muda, a chave muda e o cache é reconstruído.
+
+Pré-construir o cache (por exemplo, na inicialização do container)::
+
+    python src/data_cache.py
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+import pandas as pd
+
+from data_cleaning import (
+    CONAB_SCHEMA_VERSION,
+    WEATHER_SCHEMA_VERSION,
+    load_conab_series,
+    load_cotton_data,
+    load_weather_data,
+)
+from instrumentation import instrument
+from stations import STATION_INDEX_PATH
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DATA_DIR = os.path.join(BASE_DIR, "data", "raw")
+CACHE_DIR = os.path.join(BASE_DIR, "data", "processed", "cache")
+MANIFEST_NAME = "manifest.json"
+
+# Fontes padrão da aplicação: nome do cache -> (carregador, arquivo bruto)
+DEFAULT_SOURCES = {
+    "cotton": (load_cotton_data, os.path.join(DATA_DIR, "AlgodoSerieHist.xlsx")),
+    "conab": (load_conab_series, os.path.join(DATA_DIR, "AlgodoSerieHist.xlsx")),
+    "weather": (load_weather_data, os.path.join(DATA_DIR, "weather_sum_all.csv")),
+}
+
+# Arquivos auxiliares que também invalidam o cache de uma fonte
+DEFAULT_DEPENDENCIES = {
+    "weather": [STATION_INDEX_PATH],
+}
+
+# Versão do esquema produzido pelo carregador; mudar a versão invalida o cache
+SCHEMA_VERSIONS = {
+    "conab": CONAB_SCHEMA_VERSION,
+    "weather": WEATHER_SCHEMA_VERSION,
+}
+
+
+def _read_manifest(cache_dir: str) -> dict:
+    path = os.path.join(cache_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_manifest(cache_dir: str, manifest: dict) -> None:
+    path = os.path.join(cache_dir, MANIFEST_NAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def file_hash(filepath: str, block_size: int = 1 << 20) -> str:
+    """
+    Calcula o SHA-256 do conteúdo do arquivo, lendo em blocos.
+    """
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_fingerprint(filepath: str, cache_dir: str = CACHE_DIR) -> str:
+    """
+    Retorna o hash do arquivo bruto, reaproveitando o valor do manifesto
+    enquanto tamanho e mtime não mudarem (evita reler arquivos grandes).
+    """
+    stat = os.stat(filepath)
+    key = os.path.abspath(filepath)
+    entry = _read_manifest(cache_dir).get("sources", {}).get(key)
+    if (
+        entry
+        and entry["size"] == stat.st_size
+        and entry["mtime_ns"] == stat.st_mtime_ns
+    ):
+        return entry["sha256"]
+
+    digest = file_hash(filepath)
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = _read_manifest(cache_dir)
+    manifest.setdefault("sources", {})[key] = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": digest,
+    }
+    _write_manifest(cache_dir, manifest)
+    return digest
+
+
+def _remove_stale(cache_dir: str, name: str, keep: str) -> None:
+    prefix = f"{name}-"
+    for entry in os.listdir(cache_dir):
+        if entry.startswith(prefix) and entry.endswith(".parquet") and entry != keep:
+            os.remove(os.path.join(cache_dir, entry))
+
+
+@instrument
+def cached_load(
+    loader,
+    filepath: str,
+    name: str = None,
+    cache_dir: str = CACHE_DIR,
+    dependencies: list = None,
+    version=None,
+):
+    """
+    Carrega ``loader(filepath)`` a partir do cache em Parquet, reconstruindo-o
+    quando o arquivo bruto (ou algum arquivo em ``dependencies``) ou a versão
+    do esquema (``version``) mudar.
+    """
+    name = name or loader.__name__
+    if dependencies is None:
+        dependencies = DEFAULT_DEPENDENCIES.get(name, [])
+    if version is None:
+        version = SCHEMA_VERSIONS.get(name)
+    try:
+        digest = source_fingerprint(filepath, cache_dir)
+        if dependencies or version is not None:
+            combined = hashlib.sha256(digest.encode())
+            for path in dependencies:
+                combined.update(source_fingerprint(path, cache_dir).encode())
+            if version is not None:
+                combined.update(f"schema:{version}".encode())
+            digest = combined.hexdigest()
+        cache_file = f"{name}-{digest[:16]}.parquet"
+        cache_path = os.path.join(cache_dir, cache_file)
+
+        if os.path.exists(cache_path):
+            return pd.read_parquet(cache_path, memory_map=True)
+
+        data = loader(filepath)
+
+        # Gravar em arquivo temporário para não deixar caches parciais
+        tmp_path = f"{cache_path}.tmp"
+        data.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cache_path)
+        _remove_stale(cache_dir, name, keep=cache_file)
+
+        return data
+    except Exception as e:
+        raise RuntimeError(f"Erro ao carregar cache de '{name}': {e}")
+
+
+def build_cache(sources: dict = None, cache_dir: str = CACHE_DIR) -> None:
+    """
+    Pré-constrói o cache de todas as fontes disponíveis.
+    """
+    sources = sources or DEFAULT_SOURCES
+    for name, (loader, filepath) in sources.items():
+        if not os.path.exists(filepath):
+            print(f"[cache] {name}: arquivo ausente, ignorado ({filepath})")
+            continue
+        data = cached_load(loader, filepath, name=name, cache_dir=cache_dir)
+        print(f"[cache] {name}: {len(data)} linhas em cache")
+
+
+if __name__ == "__main__":
+    build_cache(cache_dir=sys.argv[1] if len(sys.argv) > 1 else CACHE_DIR)
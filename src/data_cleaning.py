@@ -1,75 +1,329 @@
+import re
+
+import numpy as np
 import pandas as pd
 
+from instrumentation import instrument
+from stations import STATION_INDEX_PATH, load_station_index, lookup_station_uf
 
-def load_cotton_data(filepath: str) -> pd.DataFrame:
+# Série histórica da CONAB: aba -> coluna de valores no formato longo
+CONAB_AREA_SHEET = "Área"
+CONAB_SHEETS = {
+    CONAB_AREA_SHEET: "Area_Plantada",
+    "Produção Algodão em Caroço": "Producao",
+    "Produtividade Algodão em Caroço": "Produtividade",
+}
+CONAB_HEADER_LABEL = "REGIÃO/UF"
+CONAB_YEAR_PATTERN = re.compile(r"(\d{4})")
+CONAB_TOTAL_ROWS = {"BRASIL", "NORTE/NORDESTE"}
+CONAB_FOOTER_PREFIXES = ("Legenda", "Fonte")
+
+# Tabela longa com todas as métricas da CONAB; mudar o esquema da tabela exige
+# incrementar a versão (invalida o cache "conab" gravado no formato anterior)
+CONAB_SCHEMA_VERSION = 3
+METRIC_COL = "Metrica"
+VALUE_COL = "Valor"
+DEFAULT_METRIC = "Area_Plantada"
+METRIC_NAMES = {
+    "Area_Plantada": "Área Plantada",
+    "Producao": "Produção",
+    "Produtividade": "Produtividade",
+}
+METRIC_LABELS = {
+    "Area_Plantada": "Área Plantada (mil ha)",
+    "Producao": "Produção (mil t)",
+    "Produtividade": "Produtividade (kg/ha)",
+}
+
+# Colunas do arquivo INMET (weather_sum_all.csv) utilizadas nas análises
+WEATHER_DATE_COL = "DATA (YYYY-MM-DD)"
+WEATHER_STATION_COL = "ESTACAO"
+WEATHER_MEASURE_PREFIXES = ("temp_", "hum_", "rain_", "rad_", "wind_")
+
+# Quantidade de agregados parciais acumulados antes de consolidá-los
+WEATHER_MAX_PARTIALS = 8
+
+# Esquema compacto dos dados climáticos diários: a data fica em Ano/Mes/Dia
+# (int16/int8) e a estação do ano sai de uma tabela mês -> código
+WEATHER_SCHEMA_VERSION = 2
+WEATHER_INDEX = [WEATHER_STATION_COL, "DATA"]
+MONTH_SEASONS = ["Verão"] * 2 + ["Outono"] * 3 + ["Inverno"] * 3 + ["Primavera"] * 3
+MONTH_SEASONS += ["Verão"]
+SEASONS = sorted(set(MONTH_SEASONS))
+# Código em SEASONS de cada mês (a posição 0 não é usada)
+MONTH_SEASON_CODES = np.array(
+    [-1] + [SEASONS.index(season) for season in MONTH_SEASONS], dtype="int8"
+)
+
+
+def _conab_sheet_to_long(rows, value_name: str) -> pd.DataFrame:
     """
-    Carrega e processa os dados de algodão do arquivo Excel.
+    Converte as linhas de uma aba da série histórica da CONAB em formato longo
+    (Região/UF, Ano, valor), com os anos lidos do cabeçalho das safras.
     """
-    try:
-        data = pd.read_excel(filepath, engine="openpyxl", skiprows=4, header=None)
-        col_count = len(data.columns)
+    rows = iter(rows)
 
-        # Criar nomes de colunas dinamicamente
-        col_names = ["Região/UF"] + [
-            str(year) for year in range(1976, 1976 + col_count - 1)
-        ]
-        data.columns = col_names[:col_count]
+    # Localizar o cabeçalho 'REGIÃO/UF' e extrair o ano inicial de cada safra
+    for header in rows:
+        if header and str(header[0]).strip().upper() == CONAB_HEADER_LABEL:
+            break
+    else:
+        raise ValueError(f"Cabeçalho '{CONAB_HEADER_LABEL}' não encontrado.")
+    year_columns = [
+        (position, int(match.group(1)))
+        for position, label in enumerate(header[1:], start=1)
+        if label is not None and (match := CONAB_YEAR_PATTERN.search(str(label)))
+    ]
+    positions = [position for position, _ in year_columns]
+    years = np.array([year for _, year in year_columns], dtype="int64")
 
+    regions, values = [], []
+    for row in rows:
+        name = row[0] if row else None
+        if name is None or str(name).startswith(CONAB_FOOTER_PREFIXES):
+            break
+        name = str(name).strip()
         # Excluir totais e valores agregados
-        data = data[~data["Região/UF"].str.contains("BRASIL|NORTE/NORDESTE", na=False)]
+        if name in CONAB_TOTAL_ROWS:
+            continue
+        regions.append(name)
+        values.append([row[p] if p < len(row) else None for p in positions])
 
-        # Transformar para formato longo
-        data_long = data.melt(
-            id_vars=["Região/UF"], var_name="Ano", value_name="Area_Plantada"
-        )
-        data_long["Area_Plantada"] = pd.to_numeric(
-            data_long["Area_Plantada"], errors="coerce"
-        )
-        data_long["Ano"] = pd.to_numeric(
-            data_long["Ano"].str.extract(r"(\d{4})")[0], errors="coerce"
+    # Matriz (Região/UF x safra) -> formato longo, ano a ano
+    matrix = pd.DataFrame(values).apply(pd.to_numeric, errors="coerce")
+    data_long = pd.DataFrame(
+        {
+            "Região/UF": np.tile(regions, len(years)),
+            "Ano": np.repeat(years, len(regions)),
+            value_name: matrix.to_numpy(dtype="float64").T.ravel(),
+        }
+    )
+
+    # Remover valores ausentes
+    return data_long.dropna(subset=[value_name]).reset_index(drop=True)
+
+
+def read_conab_workbook(filepath: str, sheets: dict = None) -> dict:
+    """
+    Lê várias abas da série histórica da CONAB em uma única abertura da
+    planilha (modo somente leitura, em streaming) e retorna um DataFrame longo
+    por aba. ``sheets`` mapeia o nome da aba ao nome da coluna de valores.
+    """
+    from openpyxl import load_workbook
+
+    sheets = CONAB_SHEETS if sheets is None else sheets
+    workbook = load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        missing = [sheet for sheet in sheets if sheet not in workbook.sheetnames]
+        if missing:
+            raise ValueError(f"Abas ausentes na planilha: {missing}")
+        return {
+            sheet: _conab_sheet_to_long(
+                workbook[sheet].iter_rows(values_only=True), value_name
+            )
+            for sheet, value_name in sheets.items()
+        }
+    finally:
+        workbook.close()
+
+
+@instrument
+def load_conab_series(filepath: str, sheets: dict = None) -> pd.DataFrame:
+    """
+    Carrega as séries da CONAB (área, produção e produtividade) em uma única
+    leitura da planilha, em uma tabela longa (Região/UF, Ano, Metrica, Valor)
+    com a métrica categórica e os valores em float64 (os mesmos da planilha).
+    """
+    try:
+        frames = read_conab_workbook(filepath, sheets)
+        metrics = list((CONAB_SHEETS if sheets is None else sheets).values())
+        data = pd.concat(
+            [
+                frame.rename(columns={metric: VALUE_COL}).assign(**{METRIC_COL: metric})
+                for frame, metric in zip(frames.values(), metrics)
+            ],
+            ignore_index=True,
         )
+        data[METRIC_COL] = pd.Categorical(data[METRIC_COL], categories=metrics)
+        data[VALUE_COL] = data[VALUE_COL].astype("float64")
+        return data[["Região/UF", "Ano", METRIC_COL, VALUE_COL]]
+    except Exception as e:
+        raise RuntimeError(f"Erro ao carregar séries da CONAB: {e}")
 
-        # Remover valores ausentes
-        data_long.dropna(subset=["Ano", "Area_Plantada"], inplace=True)
 
-        return data_long
+def select_metric(series_data: pd.DataFrame, metric: str = DEFAULT_METRIC):
+    """
+    Filtra uma métrica da tabela longa da CONAB e retorna (Região/UF, Ano,
+    <metrica>), no mesmo formato de ``load_cotton_data``.
+    """
+    if metric not in series_data[METRIC_COL].cat.categories:
+        raise ValueError(f"Métrica desconhecida: {metric}")
+    selected = series_data[series_data[METRIC_COL] == metric]
+    return pd.DataFrame(
+        {
+            "Região/UF": selected["Região/UF"].to_numpy(),
+            "Ano": selected["Ano"].to_numpy(),
+            metric: selected[VALUE_COL].to_numpy(),
+        }
+    )
+
+
+@instrument
+def load_cotton_data(filepath: str) -> pd.DataFrame:
+    """
+    Carrega e processa os dados de algodão (área plantada) do arquivo Excel.
+    """
+    try:
+        area = read_conab_workbook(filepath, {CONAB_AREA_SHEET: "Area_Plantada"})
+        return area[CONAB_AREA_SHEET]
     except Exception as e:
         raise RuntimeError(f"Erro ao carregar dados de algodão: {e}")
 
 
-def load_weather_data(filepath: str) -> pd.DataFrame:
+def _weather_columns(filepath: str) -> list:
     """
-    Carrega e processa os dados climáticos.
+    Lê apenas o cabeçalho do CSV e retorna as colunas usadas nas análises.
+    """
+    header = pd.read_csv(filepath, nrows=0).columns
+    missing = {WEATHER_DATE_COL, WEATHER_STATION_COL} - set(header)
+    if missing:
+        raise ValueError(f"Colunas obrigatórias ausentes: {sorted(missing)}")
+
+    measures = [col for col in header if col.startswith(WEATHER_MEASURE_PREFIXES)]
+    return [WEATHER_DATE_COL, WEATHER_STATION_COL] + measures
+
+
+def _reduce_weather_chunk(chunk: pd.DataFrame, measures: list) -> pd.DataFrame:
+    """
+    Reduz um bloco do CSV a somas e contagens parciais por estação e dia.
+    """
+    chunk["DATA"] = pd.to_datetime(chunk.pop(WEATHER_DATE_COL), errors="coerce")
+    chunk = chunk.dropna(subset=["DATA"])
+
+    grouped = chunk.groupby([WEATHER_STATION_COL, "DATA"], sort=False)[measures]
+    sums = grouped.sum(min_count=1).astype("float64").add_suffix("__sum")
+    counts = grouped.count().astype("int32").add_suffix("__count")
+    return pd.concat([sums, counts], axis=1)
+
+
+def _combine_weather_partials(partials: list) -> pd.DataFrame:
+    """
+    Consolida agregados parciais de blocos diferentes (um dia pode cruzar blocos).
+    """
+    combined = pd.concat(partials)
+    if combined.index.has_duplicates:
+        combined = combined.groupby(level=[0, 1], sort=False).sum(min_count=1)
+    return combined
+
+
+@instrument
+def load_weather_data(
+    filepath: str,
+    chunksize: int = 500_000,
+    station_index_path: str = STATION_INDEX_PATH,
+    indexed: bool = False,
+) -> pd.DataFrame:
+    """
+    Carrega e processa os dados climáticos em blocos, agregando por estação e dia,
+    e associa cada estação à sua UF pelo índice de estações.
+
+    O resultado usa o esquema compacto: medições em float32, ``Ano`` (int16),
+    ``Mes`` e ``Dia`` (int8) no lugar das colunas de data, e estação do INMET,
+    estação do ano e Região/UF categóricas. Com ``indexed``, retorna os dados
+    indexados por (estação, data) via ``index_weather``.
     """
     try:
-        # Carregar os dados
-        data = pd.read_csv(filepath)
-
-        # Converter a coluna DATA para datetime
-        data["DATA"] = pd.to_datetime(data["DATA (YYYY-MM-DD)"], errors="coerce")
-        data["Ano"] = data["DATA"].dt.year
-        data["Mes"] = data["DATA"].dt.month
-
-        # Definir estações do ano com base nos meses
-        season_bins = [0, 2, 5, 8, 11, 12]  # Divisão em meses
-        season_labels = ["Verão", "Outono", "Inverno", "Primavera", "Verão"]
-        data["Estacao"] = pd.cut(
-            data["Mes"],
-            bins=season_bins,
-            labels=season_labels,
-            ordered=False,
-            right=True,
+        usecols = _weather_columns(filepath)
+        measures = usecols[2:]
+        dtypes = {WEATHER_STATION_COL: "string"}
+        dtypes.update({col: "float32" for col in measures})
+
+        # Ler o arquivo em blocos, mantendo apenas agregados diários parciais
+        partials = []
+        reader = pd.read_csv(
+            filepath, usecols=usecols, dtype=dtypes, chunksize=chunksize
         )
+        for chunk in reader:
+            partials.append(_reduce_weather_chunk(chunk, measures))
+            if len(partials) >= WEATHER_MAX_PARTIALS:
+                partials = [_combine_weather_partials(partials)]
+
+        if not partials:
+            raise ValueError("Arquivo meteorológico sem registros.")
+        daily = _combine_weather_partials(partials)
 
-        # Verificar duplicatas ou problemas
-        if data["Estacao"].isna().any():
-            raise ValueError(
-                "Erro ao mapear meses para estações: valores nulos detectados."
+        # Médias diárias por estação a partir das somas e contagens
+        data = pd.DataFrame(index=daily.index)
+        for col in measures:
+            data[col] = (daily[f"{col}__sum"] / daily[f"{col}__count"]).astype(
+                "float32"
             )
+        data = data.reset_index()
+        data[WEATHER_STATION_COL] = data[WEATHER_STATION_COL].astype("category")
 
-        print("Pré-visualização dos dados meteorológicos:")
-        print(data.head())
+        # A data completa é substituída por ano, mês e dia compactos
+        dates = data.pop("DATA").dt
+        data["Ano"] = dates.year.astype("int16")
+        data["Mes"] = dates.month.astype("int8")
+        data["Dia"] = dates.day.astype("int8")
 
-        return data
+        # Definir estações do ano com base nos meses (consulta à tabela mês -> código)
+        data["Estacao"] = pd.Categorical.from_codes(
+            MONTH_SEASON_CODES[data["Mes"].to_numpy()], categories=SEASONS
+        )
+
+        data = add_region_column(data, station_index_path)
+        return index_weather(data) if indexed else data
     except Exception as e:
         raise RuntimeError(f"Erro ao carregar dados meteorológicos: {e}")
+
+
+def index_weather(weather_data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Retorna os dados climáticos indexados por (estação, data) e ordenados, para
+    consultas rápidas por intervalo com ``slice_weather``.
+    """
+    dates = pd.to_datetime(
+        pd.DataFrame(
+            {
+                "year": weather_data["Ano"],
+                "month": weather_data["Mes"],
+                "day": weather_data["Dia"],
+            }
+        )
+    )
+    index = pd.MultiIndex.from_arrays(
+        [weather_data[WEATHER_STATION_COL], dates], names=WEATHER_INDEX
+    )
+    indexed = weather_data.drop(columns=WEATHER_STATION_COL).set_axis(index)
+    return indexed.sort_index()
+
+
+def slice_weather(indexed_weather: pd.DataFrame, station, start=None, end=None):
+    """
+    Medições de uma estação entre ``start`` e ``end`` (inclusive), a partir dos
+    dados indexados por ``index_weather``.
+    """
+    start = None if start is None else pd.Timestamp(start)
+    end = None if end is None else pd.Timestamp(end)
+    return indexed_weather.loc[(station, slice(start, end)), :]
+
+
+@instrument
+def add_region_column(
+    weather_data: pd.DataFrame, station_index_path: str = STATION_INDEX_PATH
+) -> pd.DataFrame:
+    """
+    Retorna os dados climáticos com a coluna 'Região/UF' (UF da estação, via
+    índice de estações), sem alterar o original.
+    """
+    if "Região/UF" in weather_data.columns:
+        return weather_data
+    station_index = load_station_index(station_index_path)
+    return weather_data.assign(
+        **{
+            "Região/UF": lookup_station_uf(
+                weather_data[WEATHER_STATION_COL], station_index
+            )
+        }
+    )
@@ -0,0 +1,108 @@
+"""
+Variáveis climáticas derivadas para explicar a área plantada.
+
+A decisão de plantio responde ao clima das safras anteriores, não apenas ao
+do mesmo ano. A partir do cubo climático são construídas, por Região/UF e ano:
+
+- médias anuais e por estação do ano (``temp_avg``, ``temp_avg_Verão``, ...);
+- médias em janelas de estações (``temp_avg_safra``: primavera e verão);
+- defasagens de um e dois anos de todas elas (``temp_avg_safra_lag1``, ...).
+
+As correlações com a área plantada e seus p-valores são calculados de uma vez
+para todas as variáveis.
+"""
+
+import numpy as np
+import pandas as pd
+
+from climate_cube import cube_means, cube_variables, state_cube
+from correlations import CorrelationAccumulator
+
+# Janelas de estações do ano agregadas em uma única média
+SEASON_WINDOWS = {
+    "safra": ["Primavera", "Verão"],
+    "entressafra": ["Outono", "Inverno"],
+}
+
+DEFAULT_LAGS = (1, 2)
+
+FEATURE_KEYS = ["Região/UF", "Ano"]
+
+
+def build_climate_features(
+    climate_cube: pd.DataFrame, lags=DEFAULT_LAGS, season_windows=None
+) -> pd.DataFrame:
+    """
+    Tabela larga (Região/UF, Ano) com as médias anuais, sazonais, por janela
+    de estações e suas defasagens.
+    """
+    try:
+        season_windows = SEASON_WINDOWS if season_windows is None else season_windows
+        variables = cube_variables(climate_cube)
+        # Estações sem UF não têm Região/UF para as variáveis derivadas
+        climate_cube = state_cube(climate_cube)
+
+        annual = cube_means(climate_cube, FEATURE_KEYS).set_index(FEATURE_KEYS)
+
+        seasonal = cube_means(climate_cube, FEATURE_KEYS + ["Estacao"]).pivot_table(
+            index=FEATURE_KEYS, columns="Estacao", values=variables, observed=True
+        )
+        seasonal.columns = [f"{var}_{season}" for var, season in seasonal.columns]
+
+        windows = []
+        for name, seasons in season_windows.items():
+            window_cube = climate_cube[climate_cube["Estacao"].isin(seasons)]
+            window = cube_means(window_cube, FEATURE_KEYS).set_index(FEATURE_KEYS)
+            windows.append(window.add_suffix(f"_{name}"))
+
+        current = pd.concat([annual, seasonal] + windows, axis=1)
+
+        # Grade completa de anos por Região/UF, para que shift(k) seja k anos
+        regions = current.index.get_level_values("Região/UF").unique()
+        years = current.index.get_level_values("Ano")
+        grid = pd.MultiIndex.from_product(
+            [regions, np.arange(years.min(), years.max() + 1)], names=FEATURE_KEYS
+        )
+        current = current.reindex(grid)
+
+        grouped = current.groupby(level="Região/UF", observed=True)
+        lagged = [grouped.shift(lag).add_suffix(f"_lag{lag}") for lag in lags]
+        features = pd.concat([current] + lagged, axis=1).astype("float32")
+
+        return features.reset_index()
+    except Exception as e:
+        raise RuntimeError(f"Erro ao construir variáveis climáticas derivadas: {e}")
+
+
+def correlation_significance(
+    cotton_data: pd.DataFrame,
+    features: pd.DataFrame,
+    target: str = "Area_Plantada",
+) -> pd.DataFrame:
+    """
+    Correlação de cada variável com ``target``, com p-valor bicaudal e número
+    de observações, ordenada pela correlação.
+
+    Todas as correlações saem de um único acumulador e os p-valores de uma
+    única chamada vetorizada à distribuição t.
+    """
+    from scipy import stats
+
+    combined = cotton_data[FEATURE_KEYS + [target]].merge(
+        features, on=FEATURE_KEYS, how="inner"
+    )
+    variables = [col for col in features.columns if col not in FEATURE_KEYS]
+    accumulator = CorrelationAccumulator([target] + variables).update(combined)
+
+    r = accumulator.corr().loc[variables, target].to_numpy()
+    n = accumulator.pair_counts().loc[variables, target].to_numpy().astype(float)
+
+    dof = n - 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t_stat = r * np.sqrt(dof / (1 - r**2))
+    p_values = 2 * stats.t.sf(np.abs(t_stat), np.where(dof > 0, dof, np.nan))
+
+    return pd.DataFrame(
+        {"correlacao": r, "p_valor": p_values, "n": n.astype(int)},
+        index=pd.Index(variables, name="variavel"),
+    ).sort_values("correlacao", ascending=False)
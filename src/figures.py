@@ -0,0 +1,233 @@
+"""
+Construção das figuras do projeto com matplotlib/seaborn, sem Streamlit.
+
+Cada função recebe os dados já analisados e retorna uma ``Figure``; exibir
+(no Streamlit) ou salvar (no pipeline em lote) fica a cargo de quem chama.
+As figuras são objetos ``Figure`` explícitos, fora do estado global do pyplot,
+e ``render_png`` as renderiza com o backend Agg, guardando o PNG no cache de
+memoização (chave: nome da figura, impressão digital dos dados e parâmetros).
+O seaborn é importado apenas dentro das funções que o utilizam.
+"""
+
+import io
+
+import pandas as pd
+from matplotlib.artist import setp
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from data_cleaning import DEFAULT_METRIC, METRIC_LABELS, METRIC_NAMES
+from memo import memoize
+
+DEFAULT_DPI = 100
+
+
+def new_figure(figsize):
+    """
+    Cria uma figura com um único eixo, ligada a um canvas Agg (sem pyplot).
+    """
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.subplots()
+
+
+def seasonal_trends_figure(seasonal_data: pd.DataFrame):
+    """
+    Figura das tendências sazonais de temperatura média.
+    """
+    import seaborn as sns
+
+    fig, ax = new_figure((10, 6))
+    sns.lineplot(data=seasonal_data, x="Ano", y="temp_avg", hue="Estacao", ax=ax)
+    ax.set_title("Tendências Sazonais de Temperatura Média")
+    ax.set_xlabel("Ano")
+    ax.set_ylabel("Temperatura Média (°C)")
+    return fig
+
+
+def correlation_heatmap_figure(corr_matrix: pd.DataFrame):
+    """
+    Figura do mapa de calor de correlação com melhorias de nomeclatura e design.
+    """
+    import seaborn as sns
+
+    # Renomear variáveis para maior clareza
+    rename_dict = {
+        "temp_max": "Temperatura Máxima (°C)",
+        "temp_avg": "Temperatura Média (°C)",
+        "temp_min": "Temperatura Mínima (°C)",
+        "hum_max": "Umidade Máxima (%)",
+        "hum_min": "Umidade Mínima (%)",
+        "rain_max": "Precipitação Máxima (mm)",
+        "rad_max": "Radiação Máxima (W/m²)",
+        "wind_avg": "Velocidade Média do Vento (m/s)",
+        "wind_max": "Velocidade Máxima do Vento (m/s)",
+        "Area_Plantada": "Área Plantada (ha)",
+        "Ano": "Ano",
+    }
+    corr_matrix = corr_matrix.rename(index=rename_dict, columns=rename_dict)
+
+    # Plotar o mapa de calor
+    fig, ax = new_figure((12, 10))
+    sns.heatmap(
+        corr_matrix,
+        annot=True,  # Exibe os valores nas células
+        fmt=".2f",
+        cmap="coolwarm",  # Paleta de cores
+        cbar=True,
+        square=True,  # Células quadradas
+        linewidths=0.5,
+        ax=ax,
+    )
+    ax.set_title(
+        "Mapa de Calor da Correlação entre Variáveis Climáticas e Área Plantada",
+        fontsize=14,
+    )
+    setp(ax.get_xticklabels(), rotation=45, ha="right")
+    fig.tight_layout()
+    return fig
+
+
+def climatic_influence_figure(correlations: pd.Series):
+    """
+    Figura das variáveis climáticas mais influentes com nomes mais descritivos.
+    """
+    import seaborn as sns
+
+    # Renomear variáveis para facilitar a leitura
+    rename_dict = {
+        "temp_max": "Temperatura Máxima (°C)",
+        "temp_avg": "Temperatura Média (°C)",
+        "temp_min": "Temperatura Mínima (°C)",
+        "hum_max": "Umidade Máxima (%)",
+        "rain_max": "Precipitação Máxima (mm)",
+        "rad_max": "Radiação Máxima (W/m²)",
+        "wind_avg": "Velocidade Média do Vento (m/s)",
+        "wind_max": "Velocidade Máxima do Vento (m/s)",
+        "hum_min": "Umidade Mínima (%)",
+        "Ano": "Ano",
+        "Area_Plantada": "Área Plantada",
+    }
+
+    correlations = correlations.drop(
+        "Area_Plantada", errors="ignore"
+    )  # Remover redundância
+    correlations = correlations.rename(index=rename_dict)  # Renomear variáveis
+    correlations = correlations.sort_values(ascending=False)  # Ordenar por correlação
+
+    # Criar o gráfico
+    fig, ax = new_figure((10, 6))
+    sns.barplot(
+        x=correlations.values,
+        y=correlations.index,
+        hue=correlations.index,
+        dodge=False,
+        ax=ax,
+    )
+    ax.set_title("Correlação entre Variáveis Climáticas e Área Plantada de Algodão")
+    ax.set_xlabel("Correlação")
+    ax.set_ylabel("Variáveis Climáticas")
+    ax.grid(axis="x", linestyle="--", alpha=0.7)
+    fig.tight_layout()
+    return fig
+
+
+def historical_trends_figure(historical_trends: pd.DataFrame, metric=DEFAULT_METRIC):
+    """
+    Figura das tendências históricas de ``metric`` (área plantada, por padrão).
+    """
+    import seaborn as sns
+
+    fig, ax = new_figure((10, 6))
+    sns.lineplot(data=historical_trends, x="Ano", y=metric, ax=ax)
+    ax.set_title(f"Tendências Históricas: {METRIC_NAMES[metric]}")
+    ax.set_xlabel("Ano")
+    ax.set_ylabel(METRIC_LABELS[metric])
+    return fig
+
+
+def scatter_figure(combined_data: pd.DataFrame):
+    """
+    Figura de dispersão: temperatura média vs área plantada.
+    """
+    fig, ax = new_figure((8, 5))
+    ax.scatter(combined_data["temp_avg"], combined_data["Area_Plantada"], alpha=0.7)
+    ax.set_title("Dispersão: Temperatura Média vs Área Plantada")
+    ax.set_xlabel("Temperatura Média (°C)")
+    ax.set_ylabel("Área Plantada (ha)")
+    ax.grid(True)
+    return fig
+
+
+def historical_prediction_figure(
+    historical_trends, predicted_areas, metric=DEFAULT_METRIC
+):
+    """
+    Figura do histórico de ``metric`` com a previsão e, quando disponíveis,
+    as faixas dos intervalos de previsão de 80% e 95%.
+    """
+    fig, ax = new_figure((10, 6))
+    for level, alpha in ((95, 0.15), (80, 0.3)):
+        if f"lower_{level}" in predicted_areas.columns:
+            ax.fill_between(
+                predicted_areas["Ano"],
+                predicted_areas[f"lower_{level}"],
+                predicted_areas[f"upper_{level}"],
+                color="orange",
+                alpha=alpha,
+                label=f"Intervalo de {level}%",
+            )
+    ax.plot(
+        historical_trends["Ano"],
+        historical_trends[metric],
+        label="Histórico",
+        marker="o",
+        color="blue",
+    )
+    ax.plot(
+        predicted_areas["Ano"],
+        predicted_areas[f"{metric}_Predicted"],
+        label="Previsão",
+        linestyle="--",
+        color="orange",
+    )
+    ax.set_title(f"Tendências Históricas e Previsão: {METRIC_NAMES[metric]}")
+    ax.set_xlabel("Ano")
+    ax.set_ylabel(METRIC_LABELS[metric])
+    ax.legend()
+    ax.grid()
+    return fig
+
+
+# Figuras renderizadas por ``render_png``: nome -> função que constrói a figura
+FIGURES = {
+    "seasonal_trends": seasonal_trends_figure,
+    "correlation_heatmap": correlation_heatmap_figure,
+    "climatic_influence": climatic_influence_figure,
+    "historical_trends": historical_trends_figure,
+    "scatter": scatter_figure,
+    "historical_prediction": historical_prediction_figure,
+}
+
+
+def figure_png(fig, dpi: int = DEFAULT_DPI) -> bytes:
+    """
+    Renderiza ``fig`` em PNG com o backend Agg e libera seus elementos.
+    """
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=dpi)
+        return buffer.getvalue()
+    finally:
+        fig.clear()
+
+
+@memoize
+def render_png(name: str, *args, dpi: int = DEFAULT_DPI, **kwargs) -> bytes:
+    """
+    PNG da figura ``name`` de ``FIGURES`` construída com ``args``/``kwargs``;
+    chamadas repetidas com os mesmos dados e parâmetros vêm do cache.
+    """
+    if name not in FIGURES:
+        raise ValueError(f"Figura desconhecida: {name}")
+    return figure_png(FIGURES[name](*args, **kwargs), dpi=dpi)
@@ -0,0 +1,327 @@
+"""
+Motor de previsão da área plantada em lote.
+
+Ajusta, em uma única passada vetorizada, todos os tamanhos de janela
+(2..N anos mais recentes) e várias famílias de modelos:
+
+- polinômios de grau 1, 2 e 3, por mínimos quadrados em forma fechada sobre
+  matrizes de projeto empilhadas (uma por janela, via máscaras de pesos);
+- suavização exponencial de Holt (tendência linear), atualizada em paralelo
+  para todas as janelas.
+
+O resultado é um cubo (janela, modelo, horizonte) com as previsões, de modo
+que a interface possa trocar de configuração sem reajustar nada.
+
+As séries de cada Região/UF são independentes e podem ser distribuídas em um
+pool de processos (``forecast_by_state``); o número de processos vem do
+argumento ``workers`` ou da variável ``ALGODAO_FORECAST_WORKERS``.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Modelos disponíveis: nome -> (família, parâmetros)
+MODELS = {
+    "linear": ("poly", {"degree": 1}),
+    "poly2": ("poly", {"degree": 2}),
+    "poly3": ("poly", {"degree": 3}),
+    "holt": ("holt", {"alpha": 0.5, "beta": 0.3}),
+}
+
+DEFAULT_MODEL = "poly2"
+
+DEFAULT_WORKERS = int(os.environ.get("ALGODAO_FORECAST_WORKERS", 1))
+
+# Intervalos de previsão por bootstrap dos resíduos
+DEFAULT_RESAMPLES = 2000
+INTERVAL_LEVELS = (80, 95)
+
+
+def window_masks(n_obs: int, windows) -> np.ndarray:
+    """
+    Máscara (janela, observação) que seleciona as ``w`` observações mais recentes.
+    """
+    windows = np.asarray(windows)
+    positions = np.arange(n_obs)
+    return (positions[None, :] >= n_obs - windows[:, None]).astype(float)
+
+
+def fit_polynomials(x, y, masks, degree: int) -> np.ndarray:
+    """
+    Coeficientes (janela, grau + 1) dos polinômios ajustados a cada janela.
+
+    Resolve as equações normais de todas as janelas de uma vez.
+    """
+    design = np.vander(x, degree + 1, increasing=True)
+    gram = np.einsum("wn,nj,nk->wjk", masks, design, design)
+    moments = np.einsum("wn,nj,n->wj", masks, design, y)
+    return np.einsum("wjk,wk->wj", np.linalg.pinv(gram), moments)
+
+
+def _forecast_polynomial(x, y, windows, masks, horizons, degree):
+    predictions = np.empty((len(windows), len(horizons)))
+    # Janelas com poucos pontos usam o maior grau que conseguem determinar
+    effective = np.minimum(degree, windows - 1)
+    for d in np.unique(effective):
+        rows = effective == d
+        coefs = fit_polynomials(x, y, masks[rows], d)
+        future = np.vander(horizons.astype(float), d + 1, increasing=True)
+        predictions[rows] = coefs @ future.T
+    return predictions
+
+
+def _forecast_holt(y, windows, horizons, alpha, beta):
+    n_obs = len(y)
+    starts = n_obs - np.asarray(windows)
+    level = y[starts].astype(float)
+    trend = y[starts + 1] - y[starts]
+
+    # Cada janela começa em um ponto diferente; as demais ficam paradas
+    for t in range(starts.min() + 1, n_obs):
+        active = t > starts
+        new_level = alpha * y[t] + (1 - alpha) * (level + trend)
+        new_trend = beta * (new_level - level) + (1 - beta) * trend
+        level = np.where(active, new_level, level)
+        trend = np.where(active, new_trend, trend)
+
+    return level[:, None] + trend[:, None] * horizons[None, :]
+
+
+def forecast_array(years, values, horizons, windows, models) -> np.ndarray:
+    """
+    Previsões em um array (janela, modelo, horizonte) para anos já ordenados.
+    """
+    # Anos centrados no último ano observado, para bom condicionamento
+    x = years - years[-1]
+    masks = window_masks(len(years), windows)
+
+    predictions = []
+    for name in models:
+        family, params = MODELS[name]
+        if family == "poly":
+            predictions.append(
+                _forecast_polynomial(
+                    x, values, windows, masks, horizons, params["degree"]
+                )
+            )
+        else:
+            predictions.append(_forecast_holt(values, windows, horizons, **params))
+    return np.stack(predictions, axis=1)
+
+
+def forecast_cube(
+    years, values, max_horizon: int, windows=None, models=None
+) -> pd.DataFrame:
+    """
+    Previsões para todas as combinações de janela, modelo e horizonte.
+
+    Retorna um DataFrame indexado por (window, model, horizon) com as colunas
+    ``Ano`` (ano previsto) e ``prediction``.
+    """
+    order = np.argsort(years)
+    years = np.asarray(years, dtype=float)[order]
+    values = np.asarray(values, dtype=float)[order]
+    n_obs = len(years)
+    if n_obs < 2:
+        raise ValueError("São necessários pelo menos dois anos para a previsão.")
+    if max_horizon < 1:
+        raise ValueError("O horizonte de previsão deve ser de pelo menos um ano.")
+
+    windows = np.arange(2, n_obs + 1) if windows is None else np.asarray(windows)
+    windows = np.clip(windows, 2, n_obs)
+    models = list(MODELS) if models is None else list(models)
+    horizons = np.arange(1, max_horizon + 1)
+
+    cube = forecast_array(years, values, horizons, windows, models)
+
+    index = pd.MultiIndex.from_product(
+        [windows, models, horizons], names=["window", "model", "horizon"]
+    )
+    return pd.DataFrame(
+        {
+            "Ano": np.tile(years[-1] + horizons, len(windows) * len(models)).astype(
+                int
+            ),
+            "prediction": cube.reshape(-1),
+        },
+        index=index,
+    )
+
+
+def _holt_paths(series, alpha, beta):
+    """
+    Nível e tendência finais de Holt para várias séries (linhas) ao mesmo tempo,
+    e as previsões de um passo à frente de cada ponto.
+    """
+    level = series[:, 0].astype(float)
+    trend = series[:, 1] - series[:, 0]
+    fitted = np.empty_like(series, dtype=float)
+    fitted[:, 0] = series[:, 0]
+    for t in range(1, series.shape[1]):
+        fitted[:, t] = level + trend
+        new_level = alpha * series[:, t] + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        level = new_level
+    return level, trend, fitted
+
+
+def bootstrap_intervals(
+    years,
+    values,
+    max_horizon: int,
+    window: int,
+    model: str = DEFAULT_MODEL,
+    n_resamples: int = DEFAULT_RESAMPLES,
+    seed=None,
+) -> pd.DataFrame:
+    """
+    Intervalos de previsão de 80% e 95% por bootstrap dos resíduos.
+
+    Para os polinômios, todas as reamostragens são reajustadas em um único
+    produto matricial com a pseudo-inversa da matriz de projeto; para Holt, a
+    recursão é executada em paralelo sobre as reamostragens. Retorna as colunas
+    ``Ano``, ``prediction``, ``lower_80``, ``upper_80``, ``lower_95`` e
+    ``upper_95``. Janelas sem graus de liberdade nos resíduos (ajuste exato, por
+    exemplo três anos com ``poly3``) não permitem estimar a incerteza: as faixas
+    ficam em NaN, em vez de largura zero.
+    """
+    order = np.argsort(years)
+    years = np.asarray(years, dtype=float)[order][-window:]
+    values = np.asarray(values, dtype=float)[order][-window:]
+    n_obs = len(years)
+    if n_obs < 2:
+        raise ValueError("São necessários pelo menos dois anos para a previsão.")
+
+    rng = np.random.default_rng(seed)
+    horizons = np.arange(1, max_horizon + 1)
+    family, params = MODELS[model]
+
+    if family == "poly":
+        degree = min(params["degree"], n_obs - 1)
+        design = np.vander(years - years[-1], degree + 1, increasing=True)
+        future = np.vander(horizons.astype(float), degree + 1, increasing=True)
+        solver = np.linalg.pinv(design)  # (grau + 1, janela)
+        fitted = design @ (solver @ values)
+        residuals = values - fitted
+        # Corrige a subestimação da variância pelos graus de liberdade do ajuste
+        dof = n_obs - degree - 1
+        if dof > 0:
+            residuals = residuals * np.sqrt(n_obs / dof)
+
+        samples = fitted + residuals[rng.integers(0, n_obs, (n_resamples, n_obs))]
+        coefs = samples @ solver.T  # um único ajuste para todas as reamostragens
+        point = future @ (solver @ values)
+        paths = coefs @ future.T
+    else:
+        level, trend, fitted = _holt_paths(values[None, :], **params)
+        residuals = values[1:] - fitted[0, 1:]
+        # Os dois primeiros anos definem nível e tendência iniciais
+        dof = n_obs - 2
+        samples = fitted + np.concatenate(
+            [
+                np.zeros((n_resamples, 1)),
+                residuals[rng.integers(0, n_obs - 1, (n_resamples, n_obs - 1))],
+            ],
+            axis=1,
+        )
+        point = level[0] + trend[0] * horizons
+        level, trend, _ = _holt_paths(samples, **params)
+        paths = level[:, None] + trend[:, None] * horizons[None, :]
+
+    # Ruído futuro: um resíduo sorteado para cada horizonte
+    paths = (
+        paths + residuals[rng.integers(0, len(residuals), (n_resamples, max_horizon))]
+    )
+
+    result = pd.DataFrame({"Ano": (years[-1] + horizons).astype(int)})
+    result["prediction"] = point
+    for level_pct in INTERVAL_LEVELS:
+        tail = (100 - level_pct) / 2
+        if dof > 0:
+            lower, upper = np.percentile(paths, [tail, 100 - tail], axis=0)
+        else:
+            lower = upper = np.full(max_horizon, np.nan)
+        result[f"lower_{level_pct}"] = lower
+        result[f"upper_{level_pct}"] = upper
+    return result
+
+
+def parallel_map(function, tasks: list, workers: int = None) -> list:
+    """
+    Aplica ``function`` a cada tarefa, em um pool de processos quando
+    ``workers > 1``. Os resultados seguem a ordem das tarefas.
+    """
+    workers = DEFAULT_WORKERS if workers is None else workers
+    if workers <= 1 or len(tasks) <= 1:
+        return [function(task) for task in tasks]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map preserva a ordem das tarefas, independentemente de quem termina antes
+        chunksize = max(1, len(tasks) // (workers * 4))
+        return list(pool.map(function, tasks, chunksize=chunksize))
+
+
+def _forecast_series(task) -> pd.DataFrame:
+    """
+    Executa ``forecast_cube`` para uma série (usado pelos processos do pool).
+    """
+    key, years, values, forecast_until, windows, models = task
+    max_horizon = int(forecast_until - years.max()) if len(years) else 0
+    if len(years) < 2 or max_horizon < 1:
+        return pd.DataFrame()
+    cube = forecast_cube(years, values, max_horizon, windows=windows, models=models)
+    return cube.reset_index().assign(**{"Região/UF": key})
+
+
+def state_series(cotton_data: pd.DataFrame, value_col: str = "Area_Plantada"):
+    """
+    Anos e valores válidos de cada Região/UF, em ordem de Região/UF, lidos
+    coluna a coluna sem copiar nem alterar ``cotton_data``.
+    """
+    values = pd.to_numeric(cotton_data[value_col], errors="coerce").to_numpy()
+    years = cotton_data["Ano"].to_numpy()
+    valid = ~(pd.isna(values) | pd.isna(years))
+    regions = cotton_data["Região/UF"][valid]
+    positions = np.flatnonzero(valid)
+    groups = regions.groupby(regions.to_numpy(), sort=True).indices
+    return [
+        (str(key), years[positions[rows]], values[positions[rows]])
+        for key, rows in sorted(groups.items())
+    ]
+
+
+def forecast_by_state(
+    cotton_data: pd.DataFrame,
+    forecast_until: int = 2030,
+    value_col: str = "Area_Plantada",
+    windows=None,
+    models=None,
+    workers: int = None,
+) -> pd.DataFrame:
+    """
+    Previsões de todas as séries de Região/UF, em paralelo.
+
+    Retorna um DataFrame longo com as colunas ``Região/UF``, ``window``,
+    ``model``, ``horizon``, ``Ano`` e ``prediction``, ordenado pelas chaves; o
+    resultado não depende do número de processos. Séries com menos de dois
+    anos válidos são ignoradas.
+    """
+    tasks = [
+        (key, years, values, forecast_until, windows, models)
+        for key, years, values in state_series(cotton_data, value_col)
+    ]
+
+    results = parallel_map(_forecast_series, tasks, workers)
+
+    columns = ["Região/UF", "window", "model", "horizon", "Ano", "prediction"]
+    results = [r for r in results if not r.empty]
+    if not results:
+        return pd.DataFrame(columns=columns)
+    return (
+        pd.concat(results, ignore_index=True)[columns]
+        .sort_values(["Região/UF", "window", "model", "horizon"], kind="mergesort")
+        .reset_index(drop=True)
+    )
@@ -0,0 +1,122 @@
+"""
+Geometrias dos estados e mapa coroplético da área plantada, com cache.
+
+As geometrias do GeoJSON são lidas uma única vez, simplificadas com a
+tolerância configurada (``ALGODAO_GEO_TOLERANCE``, em graus) e gravadas em
+GeoParquet. O HTML do mapa coroplético é guardado em disco com uma chave
+derivada do conteúdo da tabela regional, do GeoJSON e da tolerância.
+"""
+
+import functools
+import hashlib
+import os
+
+from data_cache import CACHE_DIR, source_fingerprint
+from data_cleaning import DEFAULT_METRIC, METRIC_LABELS
+from memo import fingerprint
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+GEOJSON_PATH = os.path.join(BASE_DIR, "data", "geo", "br_states.json")
+MAPS_DIR = os.path.join(CACHE_DIR, "maps")
+
+DEFAULT_TOLERANCE = float(os.environ.get("ALGODAO_GEO_TOLERANCE", 0.01))
+
+
+@functools.lru_cache(maxsize=4)
+def _load_geometries(geojson_path: str, digest: str, tolerance: float):
+    import geopandas as gpd
+
+    cache_path = os.path.join(CACHE_DIR, f"geo-{digest[:16]}-{tolerance:g}.parquet")
+    if os.path.exists(cache_path):
+        return gpd.read_parquet(cache_path)
+
+    states = gpd.read_file(geojson_path)
+    if tolerance > 0:
+        states["geometry"] = states.geometry.simplify(tolerance, preserve_topology=True)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{cache_path}.tmp"
+    states.to_parquet(tmp_path)
+    os.replace(tmp_path, cache_path)
+    return states
+
+
+def load_state_geometries(
+    geojson_path: str = GEOJSON_PATH, tolerance: float = DEFAULT_TOLERANCE
+):
+    """
+    Retorna as geometrias simplificadas dos estados (GeoDataFrame).
+    """
+    try:
+        digest = source_fingerprint(geojson_path)
+        return _load_geometries(os.path.abspath(geojson_path), digest, tolerance)
+    except Exception as e:
+        raise RuntimeError(f"Erro ao carregar geometrias dos estados: {e}")
+
+
+@functools.lru_cache(maxsize=4)
+def _geojson_text(geojson_path: str, digest: str, tolerance: float) -> str:
+    states = _load_geometries(geojson_path, digest, tolerance)
+    # O campo 'id' do GeoJSON vira o id de cada feature (usado em key_on)
+    return states.set_index("id").to_json()
+
+
+def _render_choropleth(regional_data, geo_json: str, metric: str) -> str:
+    import folium
+
+    # Criar o mapa centrado no Brasil
+    m = folium.Map(location=[-14.235, -51.9253], zoom_start=4)
+
+    # Adicionar o mapa coroplético
+    folium.Choropleth(
+        geo_data=geo_json,
+        name="choropleth",
+        data=regional_data,
+        columns=["id", metric],  # Usar a coluna 'id' e a métrica selecionada
+        key_on="feature.id",  # Ajustar para usar o campo 'id' do GeoJSON
+        fill_color="YlGn",
+        fill_opacity=0.7,
+        line_opacity=0.2,
+        legend_name=METRIC_LABELS[metric],
+    ).add_to(m)
+
+    # Adicionar controle de camadas
+    folium.LayerControl().add_to(m)
+    return m.get_root().render()
+
+
+def choropleth_html(
+    regional_data,
+    geojson_path: str = GEOJSON_PATH,
+    tolerance: float = DEFAULT_TOLERANCE,
+    metric: str = DEFAULT_METRIC,
+) -> str:
+    """
+    Retorna o HTML do mapa coroplético de ``metric`` por estado, reutilizando
+    o HTML em cache quando tabela, GeoJSON e tolerância forem os mesmos.
+    """
+    try:
+        # Renomear colunas no regional_data para corresponder ao GeoJSON
+        if "Região/UF" in regional_data.columns:
+            regional_data = regional_data.rename(columns={"Região/UF": "id"})
+
+        geo_digest = source_fingerprint(geojson_path)
+        key = hashlib.sha256(
+            f"{fingerprint(regional_data)}:{geo_digest}:{tolerance:g}".encode()
+        ).hexdigest()
+        cache_path = os.path.join(MAPS_DIR, f"{key[:24]}.html")
+        if os.path.exists(cache_path):
+            with open(cache_path, encoding="utf-8") as f:
+                return f.read()
+
+        geo_json = _geojson_text(os.path.abspath(geojson_path), geo_digest, tolerance)
+        html = _render_choropleth(regional_data, geo_json, metric)
+
+        os.makedirs(MAPS_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(html)
+        os.replace(tmp_path, cache_path)
+        return html
+    except Exception as e:
+        raise RuntimeError(f"Erro ao gerar mapa coroplético: {e}")
@@ -0,0 +1,131 @@
+"""
+Instrumentação leve das etapas de carga, análise e gráficos.
+
+Cada etapa instrumentada (decorador ``instrument`` ou gerenciador de contexto
+``stage``) registra tempo de execução, linhas de entrada e de saída e,
+opcionalmente, o pico de memória alocada (``ALGODAO_TRACE_MEMORY=1``, via
+``tracemalloc``). Os registros vão para o logger ``algodao.instrumentation``
+em JSON e, dentro de ``collect()``/``start_run()``, para a lista da execução
+atual (usada no painel de tempos do ``app.py``).
+"""
+
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import os
+import time
+import tracemalloc
+
+import pandas as pd
+
+logger = logging.getLogger("algodao.instrumentation")
+
+TRACE_MEMORY = os.environ.get("ALGODAO_TRACE_MEMORY", "0") == "1"
+
+# Registros da execução atual e pilha de etapas abertas (para picos aninhados)
+_records = contextvars.ContextVar("algodao_records", default=None)
+_stack = contextvars.ContextVar("algodao_stage_stack", default=())
+
+
+def count_rows(value) -> int:
+    """
+    Soma as linhas dos DataFrames/Series em ``value`` (ou em uma tupla/lista).
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sum(count_rows(item) for item in value)
+    return 0
+
+
+def start_run() -> list:
+    """
+    Inicia uma nova lista de registros para a execução atual e a retorna.
+    """
+    records = []
+    _records.set(records)
+    return records
+
+
+@contextlib.contextmanager
+def collect():
+    """
+    Coleta os registros das etapas executadas dentro do bloco.
+    """
+    token = _records.set([])
+    try:
+        yield _records.get()
+    finally:
+        _records.reset(token)
+
+
+@contextlib.contextmanager
+def stage(name: str, rows_in: int = None):
+    """
+    Mede uma etapa; o bloco pode preencher ``record["rows_out"]``.
+    """
+    record = {"stage": name, "rows_in": rows_in, "rows_out": None}
+    frame = {"peak": 0}
+
+    trace = TRACE_MEMORY
+    if trace:
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        # O pico é global: guarda o da etapa externa antes de zerá-lo
+        _, peak = tracemalloc.get_traced_memory()
+        for outer in _stack.get():
+            outer["peak"] = max(outer["peak"], peak)
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+
+    token = _stack.set(_stack.get() + (frame,))
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["seconds"] = round(time.perf_counter() - start, 4)
+        _stack.reset(token)
+        if trace:
+            _, peak = tracemalloc.get_traced_memory()
+            frame["peak"] = max(frame["peak"], peak)
+            record["peak_mb"] = round((frame["peak"] - baseline) / 2**20, 2)
+            for outer in _stack.get():
+                outer["peak"] = max(outer["peak"], frame["peak"])
+            if started:
+                tracemalloc.stop()
+
+        records = _records.get()
+        if records is not None:
+            records.append(record)
+        logger.info(json.dumps(record, ensure_ascii=False))
+
+
+def instrument(func=None, *, name: str = None):
+    """
+    Decorador que registra cada chamada de ``func`` como uma etapa.
+    """
+    if func is None:
+        return functools.partial(instrument, name=name)
+
+    stage_name = name or f"{func.__module__}.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        rows_in = count_rows(args) + count_rows(list(kwargs.values()))
+        with stage(stage_name, rows_in=rows_in) as record:
+            result = func(*args, **kwargs)
+            record["rows_out"] = count_rows(result)
+        return result
+
+    return wrapper
+
+
+def summarize(records: list) -> pd.DataFrame:
+    """
+    Tabela dos registros, na ordem em que as etapas terminaram.
+    """
+    columns = ["stage", "seconds", "rows_in", "rows_out", "peak_mb"]
+    return pd.DataFrame(records, columns=columns)
@@ -0,0 +1,80 @@
+"""
+Junções entre os dados de algodão e os dados climáticos.
+
+Os dados de algodão têm granularidade (Região/UF, Ano), enquanto os dados
+climáticos têm uma linha por estação e dia. Juntar os dois apenas por ``Ano``
+multiplica cada linha de algodão por todas as medições do ano. Aqui os dados
+climáticos são primeiro reduzidos à granularidade da junção e as junções
+muitos-para-muitos com expansão acima de um limite são recusadas.
+"""
+
+import warnings
+
+import pandas as pd
+
+from climate_cube import cube_means, cube_variables
+from data_cleaning import WEATHER_MEASURE_PREFIXES
+
+# Máximo de linhas do lado direito por chave antes de a junção ser considerada
+# sem limite (ex.: 4 estações do ano por ano é aceitável; 365 dias não é)
+DEFAULT_MAX_FANOUT = 12
+
+
+def reduce_to_grain(weather: pd.DataFrame, keys: list) -> pd.DataFrame:
+    """
+    Reduz dados climáticos (linhas brutas ou cubo climático) às médias por
+    ``keys``, com uma linha por combinação de chaves.
+    """
+    if cube_variables(weather):
+        return cube_means(weather, keys)
+
+    measures = [
+        col for col in weather.columns if col.startswith(WEATHER_MEASURE_PREFIXES)
+    ]
+    reduced = weather.groupby(keys, observed=True)[measures].mean()
+    return reduced.astype("float32").reset_index()
+
+
+def estimate_merge_rows(left: pd.DataFrame, right: pd.DataFrame, on: list) -> int:
+    """
+    Estima o número de linhas de uma junção interna sem materializá-la.
+    """
+    left_counts = left.groupby(on, observed=True).size()
+    right_counts = right.groupby(on, observed=True).size()
+    counts = pd.concat([left_counts, right_counts], axis=1, join="inner")
+    return int((counts.iloc[:, 0] * counts.iloc[:, 1]).sum())
+
+
+def merge_at_grain(
+    left: pd.DataFrame,
+    right: pd.DataFrame,
+    on: list,
+    how: str = "inner",
+    max_fanout: int = DEFAULT_MAX_FANOUT,
+    on_unbounded: str = "raise",
+) -> pd.DataFrame:
+    """
+    Junta ``left`` e ``right`` por ``on`` verificando a expansão de linhas.
+
+    Se alguma chave do lado direito tiver mais de ``max_fanout`` linhas, a
+    junção é recusada (``on_unbounded="raise"``) ou apenas sinalizada com um
+    aviso (``on_unbounded="warn"``).
+    """
+    if on_unbounded not in ("raise", "warn"):
+        raise ValueError("on_unbounded deve ser 'raise' ou 'warn'.")
+
+    on = [on] if isinstance(on, str) else list(on)
+    fanout = int(right.groupby(on, observed=True).size().max()) if len(right) else 0
+    if fanout > max_fanout:
+        message = (
+            f"Junção por {on} expande até {fanout} linhas por chave "
+            f"(limite {max_fanout}); estimativa de "
+            f"{estimate_merge_rows(left, right, on)} linhas. "
+            "Reduza os dados climáticos com reduce_to_grain antes da junção."
+        )
+        if on_unbounded == "raise":
+            raise ValueError(message)
+        warnings.warn(message, RuntimeWarning, stacklevel=2)
+
+    validate = "many_to_one" if fanout <= 1 else None
+    return left.merge(right, on=on, how=how, validate=validate)
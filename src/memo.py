@@ -0,0 +1,144 @@
+"""
+Memoização das funções de análise, compartilhada entre sessões do Streamlit.
+
+Os resultados ficam em um cache LRU do processo, com chave baseada em uma
+impressão digital do conteúdo dos DataFrames de entrada. O tamanho máximo e o
+tempo de vida das entradas podem ser configurados pelas variáveis de ambiente
+``ALGODAO_MEMO_MAXSIZE`` e ``ALGODAO_MEMO_TTL`` (segundos) ou por
+``configure()``.
+
+Os resultados são compartilhados, sem cópias: quem chama não deve alterá-los
+(as funções de análise também não alteram os DataFrames recebidos).
+"""
+
+import functools
+import hashlib
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+_lock = threading.RLock()
+_entries = OrderedDict()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+# Impressões digitais dos DataFrames compartilhados (somente leitura): id -> (ref, hash)
+_shared = {}
+_config = {
+    "maxsize": int(os.environ.get("ALGODAO_MEMO_MAXSIZE", 128)),
+    "ttl": float(os.environ.get("ALGODAO_MEMO_TTL", 3600)),
+}
+
+
+def configure(maxsize: int = None, ttl: float = None) -> None:
+    """
+    Ajusta o tamanho máximo (número de entradas) e o TTL (segundos) do cache.
+    """
+    with _lock:
+        if maxsize is not None:
+            _config["maxsize"] = maxsize
+        if ttl is not None:
+            _config["ttl"] = ttl
+        _evict(time.monotonic())
+
+
+def mark_shared(value):
+    """
+    Registra um DataFrame compartilhado e somente leitura: sua impressão digital
+    é calculada uma vez e reaproveitada enquanto o objeto existir.
+    """
+    key = id(value)
+    digest = fingerprint(value)
+    with _lock:
+        _shared[key] = (weakref.ref(value, lambda _: _shared.pop(key, None)), digest)
+    return value
+
+
+def fingerprint(value) -> str:
+    """
+    Gera uma impressão digital barata do conteúdo de um argumento.
+    """
+    entry = _shared.get(id(value))
+    if entry is not None and entry[0]() is value:
+        return entry[1]
+
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        digest.update(type(value).__name__.encode())
+        digest.update(repr(value.shape).encode())
+        if isinstance(value, pd.DataFrame):
+            digest.update(repr(list(zip(value.columns, value.dtypes))).encode())
+        else:
+            digest.update(repr((value.name, value.dtype)).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(repr((value.shape, value.dtype)).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    else:
+        digest.update(repr(value).encode())
+    return digest.hexdigest()
+
+
+def _evict(now: float) -> None:
+    ttl = _config["ttl"]
+    expired = [key for key, (stamp, _) in _entries.items() if now - stamp > ttl]
+    for key in expired:
+        del _entries[key]
+    while len(_entries) > _config["maxsize"]:
+        _entries.popitem(last=False)
+        _stats["evictions"] += 1
+    _stats["evictions"] += len(expired)
+
+
+def memoize(func):
+    """
+    Decorador que guarda o resultado de ``func`` no cache compartilhado.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (
+            func.__module__,
+            func.__qualname__,
+            tuple(fingerprint(arg) for arg in args),
+            tuple(sorted((name, fingerprint(arg)) for name, arg in kwargs.items())),
+        )
+        now = time.monotonic()
+        with _lock:
+            entry = _entries.get(key)
+            if entry is not None and now - entry[0] <= _config["ttl"]:
+                _entries.move_to_end(key)
+                _stats["hits"] += 1
+                return entry[1]
+            _stats["misses"] += 1
+
+        result = func(*args, **kwargs)
+
+        with _lock:
+            _entries[key] = (time.monotonic(), result)
+            _entries.move_to_end(key)
+            _evict(time.monotonic())
+        return result
+
+    return wrapper
+
+
+def cache_stats() -> dict:
+    """
+    Retorna acertos, falhas, remoções e ocupação atual do cache.
+    """
+    with _lock:
+        return dict(_stats, size=len(_entries), **_config)
+
+
+def clear_cache() -> None:
+    """
+    Esvazia o cache e zera as estatísticas.
+    """
+    with _lock:
+        _entries.clear()
+        for key in _stats:
+            _stats[key] = 0
@@ -0,0 +1,199 @@
+"""
+Pipeline em lote, sem Streamlit: carga -> limpeza -> análises -> previsão.
+
+Grava cada tabela de resultado em Parquet e/ou CSV e cada figura em PNG, para
+que o painel possa ser servido a partir de artefatos pré-calculados.
+
+Uso (a partir da raiz do projeto)::
+
+    PYTHONPATH=src python -m pipeline --output data/processed/pipeline
+"""
+
+import argparse
+import os
+
+import pandas as pd
+
+from analysis import (
+    analyze_climatic_influences,
+    analyze_historical_trends,
+    analyze_lagged_influences,
+    analyze_regional_potential,
+    analyze_seasonal_trends,
+    analyze_variable_correlations,
+    predict_planted_area,
+    predict_planted_area_by_state,
+)
+from climate_cube import load_climate_cube
+from data_cache import cached_load
+from data_cleaning import (
+    DEFAULT_METRIC,
+    METRIC_NAMES,
+    load_conab_series,
+    select_metric,
+)
+from figures import (
+    climatic_influence_figure,
+    correlation_heatmap_figure,
+    figure_png,
+    historical_prediction_figure,
+    historical_trends_figure,
+    seasonal_trends_figure,
+)
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DATA_DIR = os.path.join(BASE_DIR, "data", "raw")
+OUTPUT_DIR = os.path.join(BASE_DIR, "data", "processed", "pipeline")
+
+
+def run_analyses(
+    cotton_data: pd.DataFrame,
+    climate_cube: pd.DataFrame,
+    years_to_consider: int = 10,
+    forecast_until: int = 2030,
+    workers: int = None,
+    metric_data: pd.DataFrame = None,
+    metric: str = DEFAULT_METRIC,
+) -> dict:
+    """
+    Executa todas as análises e a previsão, retornando as tabelas por nome.
+
+    Potencial regional, tendências históricas e previsões usam ``metric`` de
+    ``metric_data`` (por padrão, a área plantada de ``cotton_data``).
+    """
+    metric_data = cotton_data if metric_data is None else metric_data
+    historical_trends = analyze_historical_trends(metric_data, metric)
+    recent_years = sorted(historical_trends["Ano"].unique())[-years_to_consider:]
+    recent_trends = historical_trends[historical_trends["Ano"].isin(recent_years)]
+
+    return {
+        "seasonal_trends": analyze_seasonal_trends(cotton_data, climate_cube),
+        "regional_potential": analyze_regional_potential(
+            metric_data, climate_cube, metric=metric
+        ),
+        "climatic_influences": analyze_climatic_influences(
+            cotton_data, climate_cube
+        ).to_frame("correlacao"),
+        "lagged_influences": analyze_lagged_influences(cotton_data, climate_cube),
+        "historical_trends": historical_trends,
+        "correlation_matrix": analyze_variable_correlations(cotton_data, climate_cube),
+        "recent_trends": recent_trends,
+        "forecast": predict_planted_area(
+            historical_trends,
+            years_to_consider=years_to_consider,
+            forecast_until=forecast_until,
+            metric=metric,
+        ),
+        "state_forecast": predict_planted_area_by_state(
+            metric_data,
+            years_to_consider=years_to_consider,
+            forecast_until=forecast_until,
+            workers=workers,
+            metric=metric,
+        ),
+    }
+
+
+def build_figures(results: dict, metric: str = DEFAULT_METRIC) -> dict:
+    """
+    Constrói as figuras a partir das tabelas de resultado.
+    """
+    return {
+        "seasonal_trends": seasonal_trends_figure(results["seasonal_trends"]),
+        "climatic_influence": climatic_influence_figure(
+            results["climatic_influences"]["correlacao"]
+        ),
+        "historical_trends": historical_trends_figure(
+            results["historical_trends"], metric
+        ),
+        "correlation_heatmap": correlation_heatmap_figure(
+            results["correlation_matrix"]
+        ),
+        "forecast": historical_prediction_figure(
+            results["recent_trends"], results["forecast"], metric
+        ),
+    }
+
+
+def write_outputs(
+    results: dict, output_dir: str, formats=("parquet",), metric=DEFAULT_METRIC
+) -> list:
+    """
+    Grava as tabelas e as figuras em ``output_dir`` e retorna os caminhos.
+    """
+    tables_dir = os.path.join(output_dir, "tables")
+    figures_dir = os.path.join(output_dir, "figures")
+    os.makedirs(tables_dir, exist_ok=True)
+    os.makedirs(figures_dir, exist_ok=True)
+
+    written = []
+    for name, table in results.items():
+        # Índices com significado (ex.: nomes das variáveis) viram colunas
+        keep_index = not isinstance(table.index, pd.RangeIndex)
+        if "parquet" in formats:
+            path = os.path.join(tables_dir, f"{name}.parquet")
+            table.to_parquet(path, index=keep_index)
+            written.append(path)
+        if "csv" in formats:
+            path = os.path.join(tables_dir, f"{name}.csv")
+            table.to_csv(path, index=keep_index)
+            written.append(path)
+
+    for name, fig in build_figures(results, metric).items():
+        path = os.path.join(figures_dir, f"{name}.png")
+        with open(path, "wb") as f:
+            f.write(figure_png(fig))
+        written.append(path)
+
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Executa o pipeline completo de análise do algodão em lote."
+    )
+    parser.add_argument(
+        "--cotton", default=os.path.join(DATA_DIR, "AlgodoSerieHist.xlsx")
+    )
+    parser.add_argument(
+        "--weather", default=os.path.join(DATA_DIR, "weather_sum_all.csv")
+    )
+    parser.add_argument("--output", default=OUTPUT_DIR)
+    parser.add_argument(
+        "--format", choices=["parquet", "csv", "both"], default="parquet"
+    )
+    parser.add_argument("--years-to-consider", type=int, default=10)
+    parser.add_argument("--forecast-until", type=int, default=2030)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processos para as previsões por Região/UF (padrão: ALGODAO_FORECAST_WORKERS)",
+    )
+    parser.add_argument(
+        "--metric",
+        choices=list(METRIC_NAMES),
+        default=DEFAULT_METRIC,
+        help="Métrica da CONAB do potencial regional, histórico e previsões",
+    )
+    args = parser.parse_args(argv)
+
+    cotton_series = cached_load(load_conab_series, args.cotton, name="conab")
+    climate_cube = load_climate_cube(args.weather)
+
+    results = run_analyses(
+        select_metric(cotton_series, DEFAULT_METRIC),
+        climate_cube,
+        years_to_consider=args.years_to_consider,
+        forecast_until=args.forecast_until,
+        workers=args.workers,
+        metric_data=select_metric(cotton_series, args.metric),
+        metric=args.metric,
+    )
+    formats = ("parquet", "csv") if args.format == "both" else (args.format,)
+    written = write_outputs(results, args.output, formats, args.metric)
+    print(f"[pipeline] {len(written)} arquivos gravados em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Dados compartilhados e somente leitura entre as sessões do painel.
+
+Os dados limpos (séries da CONAB e dados climáticos diários) e os agregados
+pré-calculados (tabela de cada métrica e cubo climático) são gravados uma vez
+como arquivos Arrow IPC sem compressão em ``data/processed/cache/shared`` e
+lidos por mapeamento de memória. As colunas viram visões somente leitura das
+páginas do arquivo, compartilhadas por todas as sessões (e por todos os
+processos do servidor), em vez de cópias por sessão.
+
+``load_shared_datasets`` alimenta a construção do snapshot de artefatos do
+painel (``artifacts.py``); como os DataFrames são marcados como compartilhados,
+as análises memoizadas não recalculam a impressão digital a cada chamada.
+"""
+
+import hashlib
+import os
+
+import pandas as pd
+
+from climate_cube import climate_cube_sources, load_climate_cube
+from data_cache import CACHE_DIR, cached_load, source_fingerprint
+from data_cleaning import (
+    CONAB_SCHEMA_VERSION,
+    METRIC_NAMES,
+    WEATHER_SCHEMA_VERSION,
+    load_conab_series,
+    load_weather_data,
+    select_metric,
+)
+from instrumentation import instrument
+from memo import mark_shared
+from stations import STATION_INDEX_PATH
+
+SHARED_DIR = os.path.join(CACHE_DIR, "shared")
+
+
+def write_arrow(data: pd.DataFrame, path: str) -> None:
+    """
+    Grava ``data`` em Arrow IPC sem compressão (arquivo temporário + rename).
+    """
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    # NaN continua NaN (sem máscara de nulos), para a leitura não copiar a coluna
+    for position, col in enumerate(data.columns):
+        if data[col].dtype.kind == "f":
+            values = pa.array(data[col].to_numpy(), from_pandas=False)
+            table = table.set_column(position, col, values)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with pa.ipc.new_file(tmp_path, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def map_arrow(path: str) -> pd.DataFrame:
+    """
+    Lê um arquivo Arrow IPC por mapeamento de memória, sem copiar as colunas.
+    """
+    import pyarrow as pa
+
+    table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def shared_frame(name: str, key: str, build, shared_dir: str = SHARED_DIR):
+    """
+    Retorna o DataFrame ``name`` mapeado do disco, construindo-o com ``build()``
+    apenas quando não houver arquivo para a chave ``key``.
+    """
+    path = os.path.join(shared_dir, f"{name}-{key}.arrow")
+    if not os.path.exists(path):
+        os.makedirs(shared_dir, exist_ok=True)
+        write_arrow(build(), path)
+        for entry in os.listdir(shared_dir):
+            stale = entry.startswith(f"{name}-") and entry.endswith(".arrow")
+            if stale and entry != os.path.basename(path):
+                os.remove(os.path.join(shared_dir, entry))
+    return mark_shared(map_arrow(path))
+
+
+def _source_key(*parts) -> str:
+    return hashlib.sha256(":".join(map(str, parts)).encode()).hexdigest()[:16]
+
+
+@instrument
+def load_shared_datasets(
+    cotton_path: str, weather_path: str, shared_dir: str = SHARED_DIR
+) -> dict:
+    """
+    Carrega (ou constrói) os conjuntos compartilhados: ``cotton_series``,
+    ``metrics`` (Região/UF, Ano e a métrica, para cada métrica), ``weather`` e
+    ``climate_cube``.
+    """
+    try:
+        cotton_key = _source_key(source_fingerprint(cotton_path), CONAB_SCHEMA_VERSION)
+        weather_key = _source_key(
+            source_fingerprint(weather_path),
+            source_fingerprint(STATION_INDEX_PATH),
+            WEATHER_SCHEMA_VERSION,
+        )
+        # O cubo persistido também recebe anos anexados (climate_cube.py append)
+        cube_key = _source_key(weather_key, *climate_cube_sources(weather_path))
+
+        def load_series():
+            return cached_load(load_conab_series, cotton_path, name="conab")
+
+        cotton_series = shared_frame("conab", cotton_key, load_series, shared_dir)
+        metrics = {
+            metric: shared_frame(
+                f"metric-{metric}",
+                cotton_key,
+                lambda metric=metric: select_metric(cotton_series, metric),
+                shared_dir,
+            )
+            for metric in METRIC_NAMES
+        }
+        weather = shared_frame(
+            "weather",
+            weather_key,
+            lambda: cached_load(load_weather_data, weather_path, name="weather"),
+            shared_dir,
+        )
+        climate_cube = shared_frame(
+            "climate_cube",
+            cube_key,
+            lambda: load_climate_cube(weather_path),
+            shared_dir,
+        )
+        return {
+            "cotton_series": cotton_series,
+            "metrics": metrics,
+            "weather": weather,
+            "climate_cube": climate_cube,
+        }
+    except Exception as e:
+        raise RuntimeError(f"Erro ao carregar dados compartilhados: {e}")
@@ -0,0 +1,129 @@
+"""
+Índice de metadados das estações meteorológicas do INMET.
+
+O índice (``data/stations/estacoes_inmet.csv``) associa o código da estação a
+UF, região, latitude, longitude e altitude. Ele pode ser regenerado a partir
+dos CSVs anuais do INMET, cujo cabeçalho traz esses metadados::
+
+    python src/stations.py build pasta_com_csvs_inmet/
+"""
+
+import functools
+import glob
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+STATION_INDEX_PATH = os.path.join(BASE_DIR, "data", "stations", "estacoes_inmet.csv")
+
+INDEX_COLUMNS = ["ESTACAO", "UF", "REGIAO", "LATITUDE", "LONGITUDE", "ALTITUDE"]
+
+# Siglas de região usadas pelo INMET -> nomes usados na série da CONAB
+REGION_NAMES = {
+    "N": "NORTE",
+    "NE": "NORDESTE",
+    "CO": "CENTRO-OESTE",
+    "SE": "SUDESTE",
+    "S": "SUL",
+}
+
+# Campos do cabeçalho dos CSVs do INMET -> colunas do índice
+_HEADER_FIELDS = {
+    "REGIAO": "REGIAO",
+    "REGIÃO": "REGIAO",
+    "UF": "UF",
+    "CODIGO (WMO)": "ESTACAO",
+    "LATITUDE": "LATITUDE",
+    "LONGITUDE": "LONGITUDE",
+    "ALTITUDE": "ALTITUDE",
+}
+
+
+@functools.lru_cache(maxsize=4)
+def _read_station_index(path: str, mtime: float) -> pd.DataFrame:
+    index = pd.read_csv(
+        path,
+        usecols=INDEX_COLUMNS,
+        dtype={
+            "ESTACAO": "string",
+            "UF": "category",
+            "REGIAO": "category",
+            "LATITUDE": "float32",
+            "LONGITUDE": "float32",
+            "ALTITUDE": "float32",
+        },
+    )
+    index = index.drop_duplicates("ESTACAO", keep="last")
+    index["ESTACAO"] = index["ESTACAO"].astype("category")
+    return index.set_index("ESTACAO")
+
+
+def load_station_index(path: str = STATION_INDEX_PATH) -> pd.DataFrame:
+    """
+    Carrega o índice de estações, indexado pelo código da estação.
+    """
+    try:
+        return _read_station_index(path, os.path.getmtime(path))
+    except Exception as e:
+        raise RuntimeError(f"Erro ao carregar índice de estações: {e}")
+
+
+def lookup_station_uf(stations: pd.Series, index: pd.DataFrame) -> pd.Categorical:
+    """
+    Mapeia uma série categórica de códigos de estação para a UF, consultando o
+    índice uma vez por categoria (e não por linha).
+    """
+    stations = stations.astype("category")
+    positions = index.index.get_indexer(stations.cat.categories)
+    uf_codes = np.where(positions >= 0, index["UF"].cat.codes.to_numpy()[positions], -1)
+
+    # Códigos de linha -> códigos de UF (-1 para estação desconhecida ou nula)
+    row_codes = stations.cat.codes.to_numpy()
+    codes = np.where(row_codes >= 0, uf_codes[row_codes], -1)
+    return pd.Categorical.from_codes(codes, categories=index["UF"].cat.categories)
+
+
+def _parse_inmet_header(filepath: str) -> dict:
+    record = {}
+    with open(filepath, encoding="latin-1") as f:
+        for _ in range(8):
+            parts = f.readline().strip().split(";")
+            field = parts[0].rstrip(":").strip().upper()
+            if field in _HEADER_FIELDS and len(parts) > 1:
+                record[_HEADER_FIELDS[field]] = parts[1].strip()
+
+    for col in ("LATITUDE", "LONGITUDE", "ALTITUDE"):
+        if col in record:
+            record[col] = float(record[col].replace(",", "."))
+    record["REGIAO"] = REGION_NAMES.get(record.get("REGIAO"), record.get("REGIAO"))
+    return record
+
+
+def build_station_index(inmet_dir: str, path: str = STATION_INDEX_PATH) -> pd.DataFrame:
+    """
+    Gera o índice de estações a partir dos cabeçalhos dos CSVs do INMET.
+    """
+    files = glob.glob(os.path.join(inmet_dir, "**", "*.[cC][sS][vV]"), recursive=True)
+    records = [_parse_inmet_header(f) for f in sorted(files)]
+    records = [r for r in records if "ESTACAO" in r and "UF" in r]
+    if not records:
+        raise RuntimeError(f"Nenhum cabeçalho de estação do INMET em {inmet_dir}")
+
+    index = (
+        pd.DataFrame.from_records(records, columns=INDEX_COLUMNS)
+        .drop_duplicates("ESTACAO", keep="last")
+        .sort_values("ESTACAO")
+    )
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    index.to_csv(path, index=False)
+    return index
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] != "build":
+        sys.exit("Uso: python src/stations.py build pasta_com_csvs_inmet/")
+    result = build_station_index(sys.argv[2])
+    print(f"[estações] {len(result)} estações em {STATION_INDEX_PATH}")
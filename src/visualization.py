@@ -1,83 +1,50 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
 import pandas as pd
 import streamlit as st
-import geopandas as gpd
-import plotly.express as px
-import folium
-from streamlit_folium import st_folium
 
-@st.cache_data
+from analysis import analyze_variable_correlations
+from data_cleaning import DEFAULT_METRIC
+from figures import render_png
+from geo import GEOJSON_PATH, choropleth_html
+from instrumentation import instrument
+from joins import merge_at_grain, reduce_to_grain
+from memo import memoize
+
+
+@instrument
+@memoize
 def prepare_combined_data(cotton_data, weather_data):
     """
     Prepara os dados combinados para análise (merge de algodão e clima).
     """
-    # Renomear colunas
-    cotton_data.rename(columns={"Area_Plantada": "Area_Planted"}, inplace=True)
-
-    # Filtrar dados por anos em comum
-    common_years = set(cotton_data["Ano"]).intersection(weather_data["Ano"])
-    cotton_filtered = cotton_data[cotton_data["Ano"].isin(common_years)]
-    weather_filtered = weather_data[weather_data["Ano"].isin(common_years)]
+    # Reduzir os dados climáticos a uma linha por ano antes do merge
+    yearly_weather = reduce_to_grain(weather_data, ["Ano"])
 
-    # Fazer o merge dos dados
-    combined_data = pd.merge(cotton_filtered, weather_filtered, on="Ano")
+    # Fazer o merge dos dados (apenas anos em comum)
+    combined_data = merge_at_grain(cotton_data, yearly_weather, on=["Ano"])
     return combined_data
 
 
+@instrument
 def plot_seasonal_trends(seasonal_data: pd.DataFrame):
     """
     Plota tendências sazonais.
     """
-    plt.figure(figsize=(10, 6))
-    sns.lineplot(data=seasonal_data, x="Ano", y="temp_avg", hue="Estacao")
-    plt.title("Tendências Sazonais de Temperatura Média")
-    plt.xlabel("Ano")
-    plt.ylabel("Temperatura Média (°C)")
-    st.pyplot(plt)
+    st.image(render_png("seasonal_trends", seasonal_data))
 
 
-def plot_regional_map(regional_data, geojson_path):
+@instrument
+def plot_regional_map(regional_data, geojson_path=GEOJSON_PATH, metric=DEFAULT_METRIC):
     """
     Plota o mapa das melhores regiões para plantio de algodão, focado no Brasil.
     """
+    import streamlit.components.v1 as components
+
     try:
-        # Renomear colunas no regional_data para corresponder ao GeoJSON
-        if "Região/UF" in regional_data.columns:
-            regional_data = regional_data.rename(columns={"Região/UF": "id"})
-
-        # Verificar as colunas após o rename
-        print("Colunas no regional_data após ajuste:", regional_data.columns)
-
-        # Carregar o GeoJSON
-        brazil_geo = gpd.read_file(geojson_path)
-        print("Colunas no GeoJSON:", brazil_geo.columns)
-
-        # Verificar se as chaves do merge correspondem
-        print("IDs no GeoJSON:", brazil_geo["id"].unique())
-        print("IDs no regional_data:", regional_data["id"].unique())
-
-        # Criar o mapa centrado no Brasil
-        m = folium.Map(location=[-14.235, -51.9253], zoom_start=4)
-
-        # Adicionar o mapa coroplético
-        folium.Choropleth(
-            geo_data=geojson_path,
-            name="choropleth",
-            data=regional_data,
-            columns=["id", "Area_Plantada"],  # Usar a coluna 'id' e 'Area_Plantada'
-            key_on="feature.id",  # Ajustar para usar o campo 'id' do GeoJSON
-            fill_color="YlGn",
-            fill_opacity=0.7,
-            line_opacity=0.2,
-            legend_name="Área Plantada (ha)",
-        ).add_to(m)
-
-        # Adicionar controle de camadas
-        folium.LayerControl().add_to(m)
+        # HTML do mapa coroplético (geometrias simplificadas e HTML em cache)
+        html = choropleth_html(regional_data, geojson_path, metric=metric)
 
         # Exibir o mapa no Streamlit
-        st_folium(m, width=800, height=600)
+        components.html(html, width=800, height=600)
 
     except Exception as e:
         st.error(f"Erro ao plotar o mapa interativo: {e}")
@@ -124,12 +91,10 @@ def add_coordinates_to_regions(regional_data):
         "AC": {"lon": -70.0, "lat": -9.5},
     }
 
-    # Adicionar colunas de longitude e latitude
-    regional_data["lon"] = regional_data["Região/UF"].map(
-        lambda x: coordinates.get(x, {}).get("lon")
-    )
-    regional_data["lat"] = regional_data["Região/UF"].map(
-        lambda x: coordinates.get(x, {}).get("lat")
+    # Adicionar colunas de longitude e latitude (em um novo DataFrame)
+    regional_data = regional_data.assign(
+        lon=regional_data["Região/UF"].map(lambda x: coordinates.get(x, {}).get("lon")),
+        lat=regional_data["Região/UF"].map(lambda x: coordinates.get(x, {}).get("lat")),
     )
 
     # Verificar se há valores ausentes
@@ -143,161 +108,78 @@ def add_coordinates_to_regions(regional_data):
     return regional_data
 
 
-def plot_correlation_heatmap(cotton_data, weather_data):
+@instrument
+def plot_correlation_heatmap(cotton_data, climate_cube, season=None):
     """
     Plota um mapa de calor de correlação com melhorias de nomeclatura e design.
     """
     try:
-        # Combinar os dados
-        combined_data = cotton_data.merge(
-            weather_data, on=["Ano", "Região/UF"], how="inner"
+        corr_matrix = analyze_variable_correlations(
+            cotton_data, climate_cube, season=season
         )
 
-        # Selecionar apenas colunas numéricas
-        numeric_data = combined_data.select_dtypes(include=["float64", "int64"])
-
-        # Calcular a matriz de correlação
-        corr_matrix = numeric_data.corr()
-
-        # Renomear variáveis para maior clareza
-        rename_dict = {
-            "temp_max": "Temperatura Máxima (°C)",
-            "temp_avg": "Temperatura Média (°C)",
-            "temp_min": "Temperatura Mínima (°C)",
-            "hum_max": "Umidade Máxima (%)",
-            "hum_min": "Umidade Mínima (%)",
-            "rain_max": "Precipitação Máxima (mm)",
-            "rad_max": "Radiação Máxima (W/m²)",
-            "wind_avg": "Velocidade Média do Vento (m/s)",
-            "wind_max": "Velocidade Máxima do Vento (m/s)",
-            "Area_Plantada": "Área Plantada (ha)",
-            "Ano": "Ano",
-        }
-        corr_matrix = corr_matrix.rename(index=rename_dict, columns=rename_dict)
-
-        # Plotar o mapa de calor
-        plt.figure(figsize=(12, 10))
-        sns.heatmap(
-            corr_matrix,
-            annot=True,  # Exibe os valores nas células
-            fmt=".2f",
-            cmap="coolwarm",  # Paleta de cores
-            cbar=True,
-            square=True,  # Células quadradas
-            linewidths=0.5,
-        )
-        plt.title(
-            "Mapa de Calor da Correlação entre Variáveis Climáticas e Área Plantada",
-            fontsize=14,
-        )
-        plt.xticks(rotation=45, ha="right")
-        plt.tight_layout()
-
-        # Exibir o gráfico no Streamlit
-        st.pyplot(plt)
-        plt.close()
+        # Exibir o gráfico (PNG em cache) no Streamlit
+        st.image(render_png("correlation_heatmap", corr_matrix))
     except Exception as e:
         st.error(f"Erro ao gerar mapa de calor: {e}")
 
 
+@instrument
 def plot_climatic_influence(correlations: pd.Series):
     """
     Plota as variáveis climáticas mais influentes com nomes mais descritivos.
     """
-    # Renomear variáveis para facilitar a leitura
-    rename_dict = {
-        "temp_max": "Temperatura Máxima (°C)",
-        "temp_avg": "Temperatura Média (°C)",
-        "temp_min": "Temperatura Mínima (°C)",
-        "hum_max": "Umidade Máxima (%)",
-        "rain_max": "Precipitação Máxima (mm)",
-        "rad_max": "Radiação Máxima (W/m²)",
-        "wind_avg": "Velocidade Média do Vento (m/s)",
-        "wind_max": "Velocidade Máxima do Vento (m/s)",
-        "hum_min": "Umidade Mínima (%)",
-        "Ano": "Ano",
-        "Area_Plantada": "Área Plantada",
-    }
+    # Exibir o gráfico (PNG em cache) no Streamlit
+    st.image(render_png("climatic_influence", correlations))
 
-    correlations = correlations.drop(
-        "Area_Plantada", errors="ignore"
-    )  # Remover redundância
-    correlations = correlations.rename(index=rename_dict)  # Renomear variáveis
-    correlations = correlations.sort_values(ascending=False)  # Ordenar por correlação
 
-    # Criar o gráfico
-    plt.figure(figsize=(10, 6))
-    sns.barplot(
-        x=correlations.values, y=correlations.index, hue=correlations.index, dodge=False
-    )
-    plt.title("Correlação entre Variáveis Climáticas e Área Plantada de Algodão")
-    plt.xlabel("Correlação")
-    plt.ylabel("Variáveis Climáticas")
-    plt.grid(axis="x", linestyle="--", alpha=0.7)
-    plt.tight_layout()
-
-    # Exibir o gráfico no Streamlit
-    st.pyplot(plt)
-
-
-def plot_historical_trends(historical_trends: pd.DataFrame):
+@instrument
+def plot_historical_trends(historical_trends: pd.DataFrame, metric=DEFAULT_METRIC):
     """
-    Plota as tendências históricas na área plantada.
+    Plota as tendências históricas de ``metric`` (área plantada, por padrão).
     """
-    plt.figure(figsize=(10, 6))
-    sns.lineplot(data=historical_trends, x="Ano", y="Area_Planted")
-    plt.title("Tendências Históricas da Área Plantada")
-    plt.xlabel("Ano")
-    plt.ylabel("Área Plantada (ha)")
-    st.pyplot(plt)
+    st.image(render_png("historical_trends", historical_trends, metric))
 
 
+@instrument
 def plot_scatter(cotton_data: pd.DataFrame, weather_data: pd.DataFrame):
     """
     Plota scatterplot das variáveis: temperatura média vs área plantada.
     """
-    # Renomear colunas, se necessário
-    cotton_data.rename(columns={"Area_Plantada": "Area_Planted"}, inplace=True)
-
     # Verificar colunas nos datasets
-    required_cols = {"Ano", "Area_Planted"}
+    required_cols = {"Ano", "Area_Plantada"}
     if not required_cols.issubset(cotton_data.columns):
         raise ValueError(
             f"Faltando colunas no dataset de algodão: {required_cols - set(cotton_data.columns)}"
         )
 
+    # Reduzir os dados climáticos (brutos ou cubo) a uma linha por ano
+    yearly_weather = reduce_to_grain(weather_data, ["Ano"])
+
     weather_cols = {"Ano", "temp_avg", "rain_max"}
-    if not weather_cols.issubset(weather_data.columns):
+    if not weather_cols.issubset(yearly_weather.columns):
         raise ValueError(
-            f"Faltando colunas no dataset meteorológico: {weather_cols - set(weather_data.columns)}"
+            f"Faltando colunas no dataset meteorológico: {weather_cols - set(yearly_weather.columns)}"
         )
 
-    # Filtrar dados por anos em comum
-    common_years = set(cotton_data["Ano"]).intersection(weather_data["Ano"])
-    cotton_filtered = cotton_data[cotton_data["Ano"].isin(common_years)]
-    weather_filtered = weather_data[weather_data["Ano"].isin(common_years)]
-
-    # Fazer o merge dos dados
-    combined_data = pd.merge(cotton_filtered, weather_filtered, on="Ano")
+    # Fazer o merge dos dados (apenas anos em comum)
+    combined_data = merge_at_grain(cotton_data, yearly_weather, on=["Ano"])
 
     # Amostrar dados para melhorar desempenho (exemplo: 20%)
     if len(combined_data) > 10000:
         combined_data = combined_data.sample(frac=0.2, random_state=42)
 
     # Gerar scatterplot
-    plt.figure(figsize=(8, 5))
-    plt.scatter(combined_data["temp_avg"], combined_data["Area_Planted"], alpha=0.7)
-    plt.title("Dispersão: Temperatura Média vs Área Plantada")
-    plt.xlabel("Temperatura Média (°C)")
-    plt.ylabel("Área Plantada (ha)")
-    plt.grid(True)
-    st.pyplot(plt)
+    st.image(render_png("scatter", combined_data))
 
 
+@instrument
 def plot_interactive_scatter(data):
     """
     Gera um gráfico interativo usando Plotly.
     """
+    import plotly.express as px
+
     fig = px.scatter(
         data,
         x="temp_avg",
@@ -307,29 +189,13 @@ def plot_interactive_scatter(data):
     )
     fig.update_traces(marker=dict(size=5, opacity=0.7))
 
-    st.pyplot(plt)
+    st.plotly_chart(fig)
 
 
-def plot_historical_trends_with_prediction(historical_trends, predicted_areas):
-    plt.figure(figsize=(10, 6))
-    plt.plot(
-        historical_trends["Ano"],
-        historical_trends["Area_Planted"],
-        label="Histórico",
-        marker="o",
-        color="blue",
-    )
-    plt.plot(
-        predicted_areas["Ano"],
-        predicted_areas["Area_Planted_Predicted"],
-        label="Previsão",
-        linestyle="--",
-        color="orange",
+@instrument
+def plot_historical_trends_with_prediction(
+    historical_trends, predicted_areas, metric=DEFAULT_METRIC
+):
+    st.image(
+        render_png("historical_prediction", historical_trends, predicted_areas, metric)
     )
-    plt.title("Tendências Históricas e Previsão da Área Plantada")
-    plt.xlabel("Ano")
-    plt.ylabel("Área Plantada (ha)")
-    plt.legend()
-    plt.grid()
-    st.pyplot(plt)
-    plt.close()
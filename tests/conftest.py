@@ -0,0 +1,10 @@
+"""
+Configuração dos testes: os módulos de ``src`` são importados pelo nome, como
+no app e no pipeline.
+"""
+
+import os
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, os.path.abspath(SRC_DIR))
@@ -0,0 +1,75 @@
+"""
+Testes do cubo climático (``climate_cube.py``).
+"""
+
+import numpy as np
+import pandas as pd
+
+from climate_cube import (
+    MISSING_UF,
+    append_climate_cube,
+    build_climate_cube,
+    cube_means,
+    state_cube,
+)
+
+MEASURES = ["temp_avg", "rain_max"]
+
+
+def _weather(first_year=2015, last_year=2018, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(f"{first_year}-01-01", f"{last_year}-12-31", freq="5D")
+    stations = {"A001": "DF", "A002": "GO", "A652": None, "A701": None}
+    data = pd.DataFrame(
+        {
+            "ESTACAO": np.repeat(list(stations), len(dates)),
+            "Ano": np.tile(dates.year, len(stations)).astype("int16"),
+            "Estacao": pd.Categorical(
+                np.tile(np.where(dates.month <= 6, "Verão", "Inverno"), len(stations))
+            ),
+            "Região/UF": pd.Categorical(np.repeat(list(stations.values()), len(dates))),
+        }
+    )
+    for col in MEASURES:
+        values = rng.normal(25.0, 5.0, len(data)).astype("float32")
+        values[rng.choice(len(data), 10, replace=False)] = np.nan
+        data[col] = values
+    return data
+
+
+def test_cube_keeps_stations_without_uf():
+    weather = _weather()
+    cube = build_climate_cube(weather)
+    assert cube["temp_avg_count"].sum() == weather["temp_avg"].notna().sum()
+    assert MISSING_UF in set(cube["Região/UF"])
+    assert MISSING_UF not in set(state_cube(cube)["Região/UF"])
+    # O DataFrame recebido não é alterado
+    assert weather["Região/UF"].isna().any()
+
+
+def test_cube_means_match_raw_groupby():
+    weather = _weather()
+    means = cube_means(build_climate_cube(weather), ["Ano", "Estacao"])
+    expected = (
+        weather.groupby(["Ano", "Estacao"], observed=True)[MEASURES]
+        .mean()
+        .reset_index()
+    )
+    means = means.sort_values(["Ano", "Estacao"], ignore_index=True)
+    expected = expected.sort_values(["Ano", "Estacao"], ignore_index=True)
+    np.testing.assert_array_equal(means["Ano"], expected["Ano"])
+    np.testing.assert_array_equal(
+        means["Estacao"].astype(str), expected["Estacao"].astype(str)
+    )
+    np.testing.assert_allclose(means[MEASURES], expected[MEASURES], rtol=1e-5)
+
+
+def test_append_equals_full_rebuild():
+    old, new = _weather(2015, 2017), _weather(2018, 2019, seed=1)
+    appended = append_climate_cube(build_climate_cube(old), new)
+    rebuilt = build_climate_cube(pd.concat([old, new], ignore_index=True))
+
+    for cube in (appended, rebuilt):
+        cube["Estacao"] = cube["Estacao"].astype(str)
+        cube["Região/UF"] = cube["Região/UF"].astype(str)
+    pd.testing.assert_frame_equal(appended, rebuilt, check_dtype=False, rtol=1e-5)
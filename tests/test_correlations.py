@@ -0,0 +1,82 @@
+"""
+Testes das correlações incrementais (``correlations.py``).
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from correlations import CorrelationAccumulator
+
+VARIABLES = ["Area_Plantada", "Temperatura", "Precipitacao", "Umidade"]
+
+
+def _data():
+    rng = np.random.default_rng(2)
+    n_rows = 400
+    data = pd.DataFrame(rng.normal(size=(n_rows, len(VARIABLES))), columns=VARIABLES)
+    data["Temperatura"] += 0.6 * data["Area_Plantada"]
+    data["Umidade"] -= 0.4 * data["Precipitacao"]
+    # Ausentes em posições diferentes de cada coluna (descartados par a par)
+    for col in VARIABLES:
+        data.loc[rng.choice(n_rows, 40, replace=False), col] = np.nan
+    data["Estacao"] = rng.choice(["Verão", "Outono", "Inverno", "Primavera"], n_rows)
+    data["Região/UF"] = rng.choice(["BA", "MT", "GO"], n_rows)
+    return data
+
+
+def test_corr_matches_dataframe_corr():
+    data = _data()
+    accumulator = CorrelationAccumulator(VARIABLES).update(data)
+    pd.testing.assert_frame_equal(accumulator.corr(), data[VARIABLES].corr())
+
+
+def test_corr_filters_groups():
+    data = _data()
+    accumulator = CorrelationAccumulator(VARIABLES, by=["Região/UF", "Estacao"])
+    accumulator.update(data)
+
+    summer = data[data["Estacao"] == "Verão"]
+    pd.testing.assert_frame_equal(
+        accumulator.corr(Estacao="Verão"), summer[VARIABLES].corr()
+    )
+    selected = data[data["Região/UF"].isin(["BA", "GO"])]
+    pd.testing.assert_frame_equal(
+        accumulator.corr(["Temperatura", "Umidade"], **{"Região/UF": ["BA", "GO"]}),
+        selected[["Temperatura", "Umidade"]].corr(),
+    )
+
+
+def test_merge_equals_single_pass():
+    data = _data()
+    by = ["Estacao"]
+    whole = CorrelationAccumulator(VARIABLES, by).update(data)
+    first = CorrelationAccumulator(VARIABLES, by).update(data.iloc[:150])
+    second = CorrelationAccumulator(VARIABLES, by)
+    for start in range(150, len(data), 100):
+        second.update(data.iloc[start : start + 100])
+
+    merged = first.merge(second)
+    pd.testing.assert_frame_equal(merged.corr(), whole.corr())
+    pd.testing.assert_frame_equal(merged.corr(), data[VARIABLES].corr())
+    present = data[VARIABLES].notna().astype(int)
+    pd.testing.assert_frame_equal(merged.pair_counts(), present.T.dot(present))
+
+
+def test_merge_rejects_different_variables():
+    with pytest.raises(ValueError):
+        CorrelationAccumulator(VARIABLES).merge(CorrelationAccumulator(VARIABLES[:2]))
+
+
+def test_corr_with_large_offset():
+    # Média 1e6 e dispersão 1e-3: as somas brutas cancelariam Σxy - ΣxΣy/n
+    data = _data()
+    data[VARIABLES] = 1e6 + 1e-3 * data[VARIABLES]
+    expected = data[VARIABLES].corr()
+
+    accumulator = CorrelationAccumulator(VARIABLES).update(data)
+    pd.testing.assert_frame_equal(accumulator.corr(), expected)
+
+    first = CorrelationAccumulator(VARIABLES).update(data.iloc[:150])
+    second = CorrelationAccumulator(VARIABLES).update(data.iloc[150:])
+    pd.testing.assert_frame_equal(first.merge(second).corr(), expected)
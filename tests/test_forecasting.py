@@ -0,0 +1,95 @@
+"""
+Testes do motor de previsão em lote (``forecasting.py``).
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecasting import MODELS, bootstrap_intervals, forecast_by_state, forecast_cube
+
+YEARS = np.arange(1990, 2021)
+VALUES = 500 + 12 * (YEARS - 1990) + 40 * np.sin(YEARS / 3.0)
+
+
+def test_forecast_cube_matches_polyfit():
+    windows = [2, 3, 4, 5, 10, len(YEARS)]
+    models = [name for name, (family, _) in MODELS.items() if family == "poly"]
+    cube = forecast_cube(YEARS, VALUES, 5, windows=windows, models=models)
+
+    x = YEARS - YEARS[-1]
+    horizons = np.arange(1, 6)
+    for window in windows:
+        for model in models:
+            # Janelas curtas usam o maior grau que conseguem determinar
+            degree = min(MODELS[model][1]["degree"], window - 1)
+            coefs = np.polyfit(x[-window:], VALUES[-window:], degree)
+            expected = np.polyval(coefs, horizons)
+            result = cube.loc[(window, model)]
+            np.testing.assert_allclose(
+                result["prediction"].to_numpy(), expected, rtol=1e-8, atol=1e-6
+            )
+            np.testing.assert_array_equal(result["Ano"].to_numpy(), 2020 + horizons)
+
+
+def test_forecast_cube_sorts_years():
+    order = np.random.default_rng(0).permutation(len(YEARS))
+    shuffled = forecast_cube(YEARS[order], VALUES[order], 3)
+    expected = forecast_cube(YEARS, VALUES, 3)
+    np.testing.assert_allclose(shuffled["prediction"], expected["prediction"])
+
+
+def test_forecast_cube_rejects_short_series():
+    with pytest.raises(ValueError):
+        forecast_cube(YEARS[:1], VALUES[:1], 3)
+
+
+def _cotton_data():
+    rng = np.random.default_rng(1)
+    regions = ["BA", "GO", "MT", "MS", "NORDESTE"]
+    rows = [
+        (region, year, 100 * (k + 1) + 5 * (year - 2000) + rng.normal(0, 10))
+        for k, region in enumerate(regions)
+        for year in range(2000, 2021)
+    ]
+    data = pd.DataFrame(rows, columns=["Região/UF", "Ano", "Area_Plantada"])
+    # Lacunas e uma série curta demais para prever
+    data.loc[[3, 40], "Area_Plantada"] = np.nan
+    short = pd.DataFrame({"Região/UF": ["RR"], "Ano": [2020], "Area_Plantada": [1.0]})
+    return pd.concat([data, short], ignore_index=True)
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_forecast_by_state_independent_of_workers(workers):
+    data = _cotton_data()
+    serial = forecast_by_state(data, forecast_until=2025, windows=[3, 10], workers=1)
+    parallel = forecast_by_state(
+        data, forecast_until=2025, windows=[3, 10], workers=workers
+    )
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert "RR" not in set(serial["Região/UF"])
+    assert list(serial["Região/UF"].unique()) == ["BA", "GO", "MS", "MT", "NORDESTE"]
+
+
+@pytest.mark.parametrize("model", list(MODELS))
+def test_bootstrap_intervals_reproducible_with_seed(model):
+    first = bootstrap_intervals(YEARS, VALUES, 5, 10, model=model, seed=42)
+    again = bootstrap_intervals(YEARS, VALUES, 5, 10, model=model, seed=42)
+    other = bootstrap_intervals(YEARS, VALUES, 5, 10, model=model, seed=7)
+    pd.testing.assert_frame_equal(first, again)
+    assert not first.equals(other)
+
+    # Faixas aninhadas em torno da previsão pontual do cubo
+    assert (first["lower_95"] <= first["lower_80"]).all()
+    assert (first["lower_80"] <= first["upper_80"]).all()
+    assert (first["upper_80"] <= first["upper_95"]).all()
+    cube = forecast_cube(YEARS, VALUES, 5, windows=[10], models=[model])
+    np.testing.assert_allclose(first["prediction"], cube["prediction"])
+
+
+@pytest.mark.parametrize("model, window", [("poly3", 3), ("poly2", 3), ("holt", 2)])
+def test_bootstrap_intervals_nan_without_residual_dof(model, window):
+    result = bootstrap_intervals(YEARS, VALUES, 3, window, model=model, seed=0)
+    bands = result.drop(columns=["Ano", "prediction"])
+    assert bands.isna().all().all()
+    assert result["prediction"].notna().all()
@@ -0,0 +1,132 @@
+"""
+Contrato imutável da camada de análise: as funções de análise e de
+visualização não alteram os DataFrames compartilhados que recebem, e os
+resultados não dependem da ordem das chamadas (nem do cache de memoização).
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import analysis
+import visualization
+from climate_cube import build_climate_cube
+from memo import clear_cache, fingerprint
+
+REGIONS = ["BA", "GO", "MT", "NORDESTE", "CENTRO-OESTE"]
+UFS = ["BA", "GO", "MT"]
+
+# Chamadas: nome -> contexto -> (função, args)
+CALLS = {
+    "analyze_seasonal_trends": lambda c: (
+        analysis.analyze_seasonal_trends,
+        (c["cotton"], c["cube"]),
+    ),
+    "analyze_regional_potential": lambda c: (
+        analysis.analyze_regional_potential,
+        (c["cotton"], c["weather"]),
+    ),
+    "analyze_climatic_influences": lambda c: (
+        analysis.analyze_climatic_influences,
+        (c["cotton"], c["cube"]),
+    ),
+    "analyze_variable_correlations": lambda c: (
+        analysis.analyze_variable_correlations,
+        (c["cotton"], c["cube"]),
+    ),
+    "analyze_lagged_influences": lambda c: (
+        analysis.analyze_lagged_influences,
+        (c["cotton"], c["cube"]),
+    ),
+    "analyze_historical_trends": lambda c: (
+        analysis.analyze_historical_trends,
+        (c["cotton"],),
+    ),
+    "predict_planted_area": lambda c: (
+        analysis.predict_planted_area,
+        (c["cotton"],),
+    ),
+    "predict_all_windows": lambda c: (
+        analysis.predict_all_windows,
+        (c["cotton"],),
+    ),
+    "predict_planted_area_by_state": lambda c: (
+        analysis.predict_planted_area_by_state,
+        (c["cotton"],),
+    ),
+    "prepare_combined_data": lambda c: (
+        visualization.prepare_combined_data,
+        (c["cotton"], c["weather"]),
+    ),
+    "add_coordinates_to_regions": lambda c: (
+        visualization.add_coordinates_to_regions,
+        (c["regional"],),
+    ),
+}
+
+
+@pytest.fixture(scope="module")
+def context():
+    rng = np.random.default_rng(3)
+    years = np.arange(2000, 2021)
+    cotton = pd.DataFrame(
+        {
+            "Região/UF": np.repeat(REGIONS, len(years)),
+            "Ano": np.tile(years, len(REGIONS)),
+            "Area_Plantada": rng.uniform(50, 500, len(REGIONS) * len(years)),
+        }
+    )
+
+    dates = pd.date_range("2000-01-01", "2020-12-31", freq="3D")
+    stations = [f"A{k:03d}" for k in range(len(UFS))]
+    month = np.tile(dates.month, len(stations))
+    seasons = np.array(["Verão", "Outono", "Inverno", "Primavera"])
+    weather = pd.DataFrame(
+        {
+            "ESTACAO": pd.Categorical(np.repeat(stations, len(dates))),
+            "temp_avg": rng.normal(25, 3, len(dates) * len(stations)),
+            "rain_max": rng.gamma(2, 2, len(dates) * len(stations)),
+            "Ano": np.tile(dates.year, len(stations)).astype("int16"),
+            "Mes": month.astype("int8"),
+            "Estacao": pd.Categorical(seasons[(month % 12) // 3]),
+            "Região/UF": pd.Categorical(np.repeat(UFS, len(dates))),
+        }
+    )
+    for col in ("temp_avg", "rain_max"):
+        weather[col] = weather[col].astype("float32")
+
+    shared = {
+        "cotton": cotton,
+        "weather": weather,
+        "cube": build_climate_cube(weather),
+        "regional": analysis.analyze_regional_potential(cotton, weather),
+    }
+    clear_cache()
+    return shared
+
+
+def test_functions_do_not_mutate_shared_frames(context):
+    before = {name: fingerprint(frame) for name, frame in context.items()}
+    for name, recipe in CALLS.items():
+        func, args = recipe(context)
+        clear_cache()
+        func(*args)
+        mutated = [
+            key for key, frame in context.items() if fingerprint(frame) != before[key]
+        ]
+        assert not mutated, f"{name} alterou {mutated}"
+
+
+def test_results_do_not_depend_on_call_order(context):
+    expected = {}
+    for name, recipe in CALLS.items():
+        func, args = recipe(context)
+        clear_cache()
+        expected[name] = fingerprint(func(*args))
+
+    # Ordem inversa, com o cache quente (duas passadas)
+    clear_cache()
+    for _ in range(2):
+        for name in reversed(CALLS):
+            func, args = CALLS[name](context)
+            assert fingerprint(func(*args)) == expected[name], name
@@ -0,0 +1,29 @@
+"""
+Testes do índice de estações do INMET (``stations.py``).
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from stations import BASE_DIR, load_station_index, lookup_station_uf
+
+WEATHER_PATH = os.path.join(BASE_DIR, "data", "raw", "weather_sum_all.csv")
+
+
+def test_index_has_uf_and_region():
+    index = load_station_index()
+    assert index["UF"].notna().all()
+    assert index["REGIAO"].notna().all()
+    # Coordenadas em branco são aceitas e lidas como NaN
+    assert index["LATITUDE"].dtype == "float32"
+
+
+def test_weather_stations_resolve_to_uf():
+    if not os.path.exists(WEATHER_PATH):
+        pytest.skip("Arquivo de dados climáticos ausente")
+    stations = pd.read_csv(WEATHER_PATH, usecols=["ESTACAO"], dtype="category")
+    ufs = lookup_station_uf(stations["ESTACAO"], load_station_index())
+    missing = sorted(stations["ESTACAO"][pd.isna(ufs)].unique())
+    assert not missing, f"Estações sem UF no índice: {missing}"